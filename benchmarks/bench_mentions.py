@@ -0,0 +1,126 @@
+###############################################################################
+##  `bench_mentions.py`                                                      ##
+##                                                                           ##
+##  Purpose: Mention parsing cost (interned or not) & hostile-input scaling  ##
+###############################################################################
+
+
+import sys
+import os
+import json
+import time
+from typing import Callable, Dict, List
+
+import click
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import MessageSpec, generate_messages
+from src.mentions import MENTION_PATTERN, NameTag, get_mentions, clear_interned_tags, intern_stats
+
+
+def regex_mentions(content: str) -> List[NameTag]:
+    # Previous `get_mentions`: regex scan, every tag parsed from scratch
+    return list(set(NameTag.from_match(m) for m in MENTION_PATTERN.finditer(content)))
+
+
+def uncached_mentions(content: str) -> List[NameTag]:
+    clear_interned_tags()
+    return get_mentions(content)
+
+
+# Adversarial shapes, each about `size` characters
+HOSTILE_INPUTS: Dict[str, Callable[[int], str]] = {
+    "open_fragments": lambda size: "@**x " * (size // 5),
+    "open_fragment_lines": lambda size: "@**x\n" * (size // 5),
+    "unterminated_tag": lambda size: "@**" + "a" * size,
+    "huge_tag": lambda size: "@**" + "a" * size + "**",
+    "fragments_then_tag": lambda size: "@** " * (size // 4) + "@**Alice Smith (she/her)**",
+}
+
+
+def best_of(fn: Callable, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_typical(messages: int, mentions: int, seed: int, repeat: int) -> Dict:
+    texts = generate_messages(MessageSpec(sentences=5, mentions=mentions), messages, seed)
+
+    def run_all(fn):
+        return lambda _: [fn(text) for text in texts]
+
+    clear_interned_tags()
+    get_mentions(texts[0]) # Warm functions, not cache
+
+    timings = {
+        "regex": best_of(run_all(regex_mentions), None, repeat),
+        "scan_uncached": best_of(run_all(uncached_mentions), None, repeat),
+        "scan_interned": best_of(run_all(get_mentions), None, repeat),
+    }
+    info = intern_stats()
+    return {
+        "messages": len(texts),
+        "mentions_per_message": mentions,
+        "us_per_message": {name: seconds / len(texts) * 1e6 for name, seconds in timings.items()},
+        "interned_tags": info.currsize,
+    }
+
+
+def bench_hostile(sizes: List[int], repeat: int, with_regex: bool) -> Dict:
+    # Linear scan: time grows no faster than size; mention counts show junk
+    # tags regex would have handed to rest of pipeline
+    report = {}
+    for shape, build in HOSTILE_INPUTS.items():
+        rows = []
+        for size in sizes:
+            text = build(size)
+            row = {
+                "chars": len(text),
+                "scan_ms": best_of(get_mentions, text, repeat) * 1000,
+                "scan_mentions": len(get_mentions(text)),
+            }
+            if with_regex:
+                row["regex_ms"] = best_of(regex_mentions, text, 1) * 1000
+                row["regex_mentions"] = len(regex_mentions(text))
+            rows.append(row)
+
+        first, last = rows[0], rows[-1]
+        growth = last["chars"] / first["chars"]
+        report[shape] = {
+            "rows": rows,
+            "size_growth": growth,
+            "scan_time_growth": last["scan_ms"] / first["scan_ms"] if first["scan_ms"] else 0.0,
+        }
+        if with_regex:
+            report[shape]["regex_time_growth"] = last["regex_ms"] / first["regex_ms"] if first["regex_ms"] else 0.0
+    return report
+
+
+@click.command()
+@click.option("--sizes", multiple=True, type=int, default=[2000, 4000, 8000, 16000], help="Hostile input size(s) in characters")
+@click.option("--messages", default=500, help="Typical messages parsed per timing")
+@click.option("--mentions", default=3, help="Mentions per typical message")
+@click.option("--repeat", default=5, help="Timings per measurement (best kept)")
+@click.option("--seed", default=0, help="Seed for synthetic messages")
+@click.option("--skip-regex", is_flag=True, help="Don't time regex on hostile input (slow at large sizes)")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON report here instead of stdout")
+def main(sizes, messages, mentions, repeat, seed, skip_regex, output):
+    report = {
+        "typical": bench_typical(messages, mentions, seed, repeat),
+        "hostile": bench_hostile(sorted(sizes), repeat, not skip_regex),
+    }
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Wrote mention benchmark to {output}")
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
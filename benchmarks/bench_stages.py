@@ -0,0 +1,185 @@
+###############################################################################
+##  `bench_stages.py`                                                        ##
+##                                                                           ##
+##  Purpose: Per-stage latency & throughput of validation pipeline           ##
+###############################################################################
+
+
+import sys
+import os
+import json
+import time
+import itertools
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+import click
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import MessageSpec, generate_messages
+from src.mentions import get_mentions
+from src.parser import sanitize_content, results_from_mappings
+from src.context import check_previous_messages
+from processing import backends
+from processing.backends import BaseBackend, register_backend
+
+
+# In pipeline order
+STAGES = [
+    "get_mentions",
+    "sanitize_content",
+    "coref",
+    "map_names_to_pronouns",
+    "mismatches",
+    "context_check",
+]
+
+# Messages per topic served to context check (same as `check_previous_messages`)
+HISTORY_SIZE = 5
+
+
+@register_backend
+class NoCorefBackend(BaseBackend):
+    # `--no-coref`: clusters nothing, so everything downstream of model is timed
+    name = "none"
+    relative_cost = 0.0
+
+    def _analyze(self, text, mentions):
+        return {}, {}
+
+
+class FakeClient:
+    # Stands in for Zulip client: `get_messages` returns canned topic history
+    def __init__(self, history: List[str]):
+        self.history = history
+
+    def get_messages(self, request):
+        count = request.get("num_before", HISTORY_SIZE)
+        return {
+            "result": "success",
+            "messages": [{"content": content} for content in self.history[-count:]],
+        }
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # Nearest-rank percentile (values already sorted)
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(seconds: List[float]) -> Dict[str, float]:
+    ordered = sorted(seconds)
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": total / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "throughput_per_s": len(ordered) / total if total else 0.0,
+    }
+
+
+def timed(timings: Dict[str, List[float]], stage: str, fn: Callable, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    timings[stage].append(time.perf_counter() - start)
+    return result
+
+
+def make_coref_stage(coref: bool) -> Callable:
+    # Straight to model (no result cache), so every call pays real inference
+    if not coref:
+        return lambda text: []
+
+    from processing.nlp import apply_nlp, extract_clusters, get_nlp
+    get_nlp()
+    return lambda text: extract_clusters(apply_nlp(text))
+
+
+def bench_message(content: str, client: FakeClient, coref_stage: Callable, timings: Dict[str, List[float]]) -> None:
+    from processing.nlp import COREF_CACHE, build_pronoun_mappings
+
+    start = time.perf_counter()
+
+    mentions = timed(timings, "get_mentions", get_mentions, content)
+    sanitized = timed(timings, "sanitize_content", sanitize_content, content, mentions)
+    clusters = timed(timings, "coref", coref_stage, sanitized)
+    mappings = timed(timings, "map_names_to_pronouns", build_pronoun_mappings, clusters, mentions)
+    timed(timings, "mismatches", results_from_mappings, mentions, mappings)
+
+    # Topic history is new text each time, so don't let cache hide coref cost
+    COREF_CACHE.clear()
+    timed(timings, "context_check", check_previous_messages, client, 1, "benchmark", mentions)
+
+    timings["end_to_end"].append(time.perf_counter() - start)
+
+
+def run_benchmark(spec: MessageSpec, messages: int, coref: bool = True, seed: int = 0, warmup: int = 1) -> Dict:
+    texts = generate_messages(spec, messages + warmup + HISTORY_SIZE, seed)
+    history, warmup_texts, texts = texts[:HISTORY_SIZE], texts[HISTORY_SIZE:HISTORY_SIZE + warmup], texts[HISTORY_SIZE + warmup:]
+
+    client = FakeClient(history)
+    coref_stage = make_coref_stage(coref)
+
+    # Pipeline logs go to stdout, so keep them out of JSON report
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for text in warmup_texts:
+            bench_message(text, client, coref_stage, {stage: [] for stage in STAGES + ["end_to_end"]})
+
+        timings = {stage: [] for stage in STAGES + ["end_to_end"]}
+        for text in texts:
+            bench_message(text, client, coref_stage, timings)
+
+    return {
+        "spec": spec.as_dict(),
+        "messages": len(texts),
+        "mean_chars": sum(len(t) for t in texts) / len(texts) if texts else 0.0,
+        "stages": {stage: summarize(timings[stage]) for stage in STAGES},
+        "end_to_end": summarize(timings["end_to_end"]),
+    }
+
+
+@click.command()
+@click.option("--sentences", multiple=True, type=int, default=[5, 20, 80], help="Message length(s) in sentences")
+@click.option("--mentions", multiple=True, type=int, default=[1, 3], help="Mention count(s) per message")
+@click.option("--pronoun-density", multiple=True, type=float, default=[0.4], help="Fraction(s) of sentences with a pronoun")
+@click.option("--mismatch-rate", default=0.2, help="Fraction of pronoun references that are wrong")
+@click.option("--messages", default=20, help="Timed messages per configuration")
+@click.option("--seed", default=0, help="Seed for synthetic messages")
+@click.option("--no-coref", is_flag=True, help="Skip model (time everything else)")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON report here instead of stdout")
+def main(sentences, mentions, pronoun_density, mismatch_rate, messages, seed, no_coref, output):
+    coref = not no_coref
+    if not coref:
+        # Context check goes through backend registry, so route it to no-op backend
+        backends.DEFAULT_BACKEND = NoCorefBackend.name
+
+    runs = [
+        run_benchmark(
+            MessageSpec(sentences=s, mentions=m, pronoun_density=d, mismatch_rate=mismatch_rate),
+            messages, coref=coref, seed=seed,
+        )
+        for s, m, d in itertools.product(sentences, mentions, pronoun_density)
+    ]
+
+    report = {
+        "coref": coref,
+        "backend": backends.DEFAULT_BACKEND,
+        "messages_per_config": messages,
+        "seed": seed,
+        "runs": runs,
+    }
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Wrote {len(runs)} run(s) to {output}")
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+###############################################################################
+##  `bench_startup.py`                                                       ##
+##                                                                           ##
+##  Purpose: Cold-start import time of bot modules (fresh interpreter each)  ##
+###############################################################################
+
+
+import sys
+import os
+import json
+import time
+import statistics
+import subprocess
+from typing import Dict, List
+
+import click
+
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Smallest to largest slice of bot a caller might import
+TARGETS = {
+    "mentions": "src.mentions",
+    "parser": "src.parser",
+    "reader": "src.reader",
+    "bot": "bot",
+}
+
+# Should only load once a model is actually needed (never at import)
+HEAVY_MODULES = ["spacy", "thinc", "torch", "transformers", "fastcoref", "zulip"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    # Prepend repo, keeping any existing path (e.g. where dependencies live)
+    python_path = os.pathsep.join([ROOT_DIR, os.environ.get("PYTHONPATH", "")])
+    env = {**os.environ, "PYTHONPATH": python_path, "PYTHONDONTWRITEBYTECODE": "1"}
+    return subprocess.run([sys.executable, *args], cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True)
+
+
+def measure_import(module: str, repeat: int = 5) -> Dict:
+    # Import alone (timed inside child) & whole process (interpreter startup too)
+    imports, processes, heavy = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run_python(["-c", PROBE.format(module=module, heavy=HEAVY_MODULES)])
+        processes.append(time.perf_counter() - start)
+
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        imports.append(probe["seconds"])
+        heavy = probe["heavy"]
+
+    return {
+        "module": module,
+        "import_seconds": statistics.median(imports),
+        "process_seconds": statistics.median(processes),
+        "heavy_modules": heavy,
+    }
+
+
+def measure_cli(args: List[str], repeat: int = 5) -> float:
+    # e.g. `bot.py --help`: what every Makefile target & systemd restart pays
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_python(args)
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def slowest_imports(module: str, top: int) -> List[Dict]:
+    # `-X importtime` breakdown (cumulative microseconds per module)
+    result = run_python(["-X", "importtime", "-c", f"import {module}"])
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split("|"))
+        rows.append({"module": name, "cumulative_ms": int(cumulative) / 1000})
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+
+
+@click.command()
+@click.option("--repeat", default=5, help="Fresh interpreters per measurement (median kept)")
+@click.option("--top", default=15, help="Slowest imports listed for `bot`")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON report here instead of stdout")
+def main(repeat, top, output):
+    report = {
+        "python": sys.version.split()[0],
+        "imports": {name: measure_import(module, repeat) for name, module in TARGETS.items()},
+        "bot_help_seconds": measure_cli(["bot.py", "--help"], repeat),
+        "slowest_bot_imports": slowest_imports("bot", top),
+    }
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        click.echo(f"Wrote startup benchmark to {output}")
+    else:
+        click.echo(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+###############################################################################
+##  `synthetic.py`                                                           ##
+##                                                                           ##
+##  Purpose: Generates Zulip-style messages of tunable size for benchmarks   ##
+###############################################################################
+
+
+import random
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Tuple
+
+
+# (first, last, pronouns as written in Zulip name tag)
+PEOPLE = [
+    ("Adrien", "Lynch", "he/they"),
+    ("Sarah", "Okafor", "she/her"),
+    ("Riley", "Moss", "xe/xem"),
+    ("Jordan", "Park", "they/them"),
+    ("Maya", "Ortiz", "she/they"),
+    ("Sam", "Chen", "ze/zir"),
+    ("Lee", "Grant", "he/him"),
+    ("Noor", "Haddad", "fae/faer"),
+    ("Quinn", "Adler", "ey/em"),
+    ("Priya", "Raman", "any"),
+]
+
+BATCHES = ["S1'25", "S2'25", "W1'24", "F2'23", "SP1'22"]
+
+# Subject, object & possessive forms (first pronoun in tag decides which)
+PRONOUN_FORMS: Dict[str, Tuple[str, str, str]] = {
+    "he": ("he", "him", "his"),
+    "she": ("she", "her", "her"),
+    "they": ("they", "them", "their"),
+    "xe": ("xe", "xem", "xir"),
+    "ze": ("ze", "zir", "zir"),
+    "fae": ("fae", "faer", "faer"),
+    "ey": ("ey", "em", "eir"),
+    "any": ("they", "them", "their"),
+}
+
+# Sentences about a person ({name} or pronoun forms {subj} / {obj} / {poss})
+NAME_SENTENCES = [
+    "{name} paired on the parser refactor this morning.",
+    "I spent the afternoon debugging the scheduler with {name}.",
+    "{name} gave a great talk about compilers at presentations.",
+    "Huge thanks to {name} for reviewing the pull request so quickly.",
+]
+PRONOUN_SENTENCES = [
+    "{subj} said {poss} tests were finally passing.",
+    "I asked {obj} to walk me through the allocator.",
+    "Later {subj} showed me how {poss} ray tracer handles shadows.",
+    "Everyone thanked {obj} for the careful write-up.",
+]
+
+# Sentences with no person in them (padding for message length)
+FILLER_SENTENCES = [
+    "The build cache cut CI time in half.",
+    "We still need to decide on a storage format.",
+    "Pairing sessions are open to everyone on the second floor.",
+    "The benchmark numbers looked noisy on the shared machine.",
+    "Coffee chats are moving to Thursday afternoons.",
+    "Someone left a great book about type systems in the library.",
+]
+
+
+@dataclass(frozen=True)
+class MessageSpec:
+    sentences: int = 5
+    mentions: int = 1
+    # Fraction of sentences that refer back to someone with a pronoun
+    pronoun_density: float = 0.4
+    # Fraction of pronoun references that use wrong pronouns for that person
+    mismatch_rate: float = 0.2
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def name_tag(person, rng) -> str:
+    first, last, pronouns = person
+    return f"@**{first} {last} ({pronouns}) ({rng.choice(BATCHES)})**"
+
+
+def pronoun_forms(person) -> Tuple[str, str, str]:
+    return PRONOUN_FORMS[person[2].split("/")[0]]
+
+
+def generate_message(spec: MessageSpec, rng: random.Random) -> str:
+    people = rng.sample(PEOPLE, min(spec.mentions, len(PEOPLE)))
+    sentences = []
+
+    # Every mentioned person is introduced by name tag first
+    for person in people:
+        template = rng.choice(NAME_SENTENCES)
+        sentences.append(template.format(name=name_tag(person, rng)))
+
+    while len(sentences) < max(spec.sentences, len(people)):
+        if people and rng.random() < spec.pronoun_density:
+            person = rng.choice(people)
+            forms = pronoun_forms(person)
+            if rng.random() < spec.mismatch_rate:
+                forms = pronoun_forms(rng.choice([p for p in PEOPLE if pronoun_forms(p) != forms]))
+
+            subj, obj, poss = forms
+            sentence = rng.choice(PRONOUN_SENTENCES).format(subj=subj, obj=obj, poss=poss)
+            sentences.append(sentence[0].upper() + sentence[1:])
+
+        elif people and rng.random() < 0.2:
+            # Plain first name later in message (as people actually write)
+            sentences.append(rng.choice(NAME_SENTENCES).format(name=rng.choice(people)[0]))
+
+        else:
+            sentences.append(rng.choice(FILLER_SENTENCES))
+
+    return " ".join(sentences)
+
+
+def generate_messages(spec: MessageSpec, count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [generate_message(spec, rng) for _ in range(count)]
@@ -8,20 +8,64 @@
 import warnings
 warnings.filterwarnings("ignore")
 
+import signal
+import asyncio
 import click # for args via CLI 
+from concurrent.futures import ThreadPoolExecutor
 
-from src.setup import create_client
 from src.utils import subscribe_to_all_public_streams
 from src.reader import scan_for_mentions
-from src.logger import log_info, log_section_start, log_section_end, log_blank_line, force_flush
-    
-from examples.real_world_test import run_real_world_test
+from src.events import EVENT_TYPES, event_to_msg, record_event
+from src.history import HISTORY_ENABLED, HISTORY_EVENT_TYPES, enable_topic_history
+from src.directory import USER_DIRECTORY_ENABLED, DIRECTORY_EVENT_TYPES, enable_user_directory
+from src.metrics import METRICS_PORT, start_metrics_server
+from src.workers import WORKER_COUNT, WorkerPool
+from src.listener import LISTENER_MODE, AsyncEventListener
+from src.tuner import tune, save_topology, load_topology, apply_worker_threads, available_cpus, cpu_slices
+from processing.nlp import get_nlp
+from processing.backends import get_backend
+from processing.batching import BATCHING_ENABLED, BATCH_MAX_SIZE
+from processing.models import get_model_stats
+from src.logger import log_info, log_error, log_section_start, log_section_end, log_blank_line, force_flush
+from src.logger import LOG_ASYNC, start_async_logging, shutdown_logging
+from src.logsink import LOG_DIR, start_log_sink
+
+
+def log_scan_failure(future):
+    # Surface errors from background scans (executor would otherwise hide them)
+    error = future.exception()
+    if error is not None:
+        log_error(f"Message scan failed: {error}")
 
 
 class PronounBot:
     def __init__(self):
         log_section_start("PRONOUN BOT INITIALIZATION")
 
+        # Explicit `BOT_WORKERS` wins, otherwise use layout saved by `--tune`
+        self.topology = load_topology()
+        self.worker_count = WORKER_COUNT
+        if self.topology and not WORKER_COUNT:
+            log_info(f"Using tuned topology: {self.topology.processes} process(es) x {self.topology.threads} thread(s)")
+            if self.topology.processes > 1:
+                self.worker_count = self.topology.processes
+            else:
+                threads = self.topology.threads
+                cpus = cpu_slices(available_cpus(), 1, threads)[0] if self.topology.pin_cpus else None
+                apply_worker_threads(threads, cpus)
+
+        if METRICS_PORT:
+            start_metrics_server()
+
+        # Only a process that sees every event can serve context from memory
+        # (workers each see a slice, so they keep using `get_messages`)
+        self.history = enable_topic_history() if HISTORY_ENABLED and not self.worker_count else None
+        self.event_types = EVENT_TYPES + HISTORY_EVENT_TYPES if self.history else EVENT_TYPES
+
+        # Zulip client library imported here, so `--help` / `--tune` / tests
+        # importing this module don't pay for it
+        from src.setup import create_client
+
         log_info("Creating Zulip client...")
         self.client = create_client()
 
@@ -29,6 +73,22 @@ class PronounBot:
         self.subscribed_streams = subscribe_to_all_public_streams(self.client)
         log_info(f"Subscribed to {len(self.subscribed_streams)} streams")
 
+        # Members & pronouns fetched once, then kept current from `realm_user`
+        # events (worker processes load & refresh their own copy)
+        self.directory = None
+        if USER_DIRECTORY_ENABLED and not self.worker_count:
+            log_info("Loading user directory...")
+            self.directory = enable_user_directory(self.client)
+            self.event_types = self.event_types + DIRECTORY_EVENT_TYPES
+
+        # Pay model load once up front, rather than on first mention
+        # (worker processes load their own copy instead)
+        if not self.worker_count:
+            log_info("Loading NLP model...")
+            get_nlp()
+            for key, stats in get_model_stats().items():
+                log_info(f"Model {key}: {stats['load_seconds']:.2f}s load, {stats['rss_total_mb']:.0f} MB resident")
+
         log_section_end("PRONOUN BOT INITIALIZATION")
         log_blank_line()
         force_flush()
@@ -37,86 +97,157 @@ class PronounBot:
         log_info("Starting message monitoring...")
         log_info("Bot is now listening for messages with mentions (@)")
         force_flush()
-        
-        self.client.call_on_each_event(
-            lambda event: scan_for_mentions(self.event_to_msg(event), self.client), 
-            event_types=["message", "update_message"]
-        )
-
-
-    def event_to_msg(self, event):
-        if not event["type"] in ["message", "update_message"]:
-            raise ValueError("ERROR: Invalid event type")
-        
-        match event["type"]:
-
-            # Construct message object from new `message` event
-            case "message":
-                msg_obj = event["message"]
-
-                return {
-                    "event_type": event.get("type", ""),
-                    "message_type": msg_obj.get("type", ""), # `type` == `stream`
 
-                    "stream_id": msg_obj.get("stream_id", ""),
-                    "subject": msg_obj.get("subject", ""),
-                    "id": msg_obj.get("id", ""),
+        if self.worker_count:
+            self.run_with_workers()
+            return
 
-                    "sender_id": msg_obj.get("sender_id", ""),
+        if LISTENER_MODE == "async":
+            self.run_async()
+            return
 
-                    "sender_email": msg_obj.get("sender_email", ""),
-                    "sender_full_name": msg_obj.get("sender_full_name", ""),
-
-                    "content": msg_obj.get("content", ""),
-                }
-            
-            # Construct message object from `message_update` event (edited existing message)
-            case "update_message":
-                original_msg = self.client.get_raw_message(event["message_id"])
-                msg_obj = original_msg["message"]
-
-                return {
-                    "event_type": event.get("type", ""),
-                    "message_type": msg_obj.get("type", ""), # `type` == `stream`
-
-                    "stream_id": msg_obj.get("stream_id", ""),
-                    "subject": msg_obj.get("subject", ""),
-                    "id": event.get("message_id", ""),
+        if BATCHING_ENABLED:
+            self.run_batched()
+            return
+        
+        def handle_event(event):
+            if self.observe_event(event):
+                scan_for_mentions(self.event_to_msg(event), self.client)
 
-                    "sender_id": event.get("user_id", ""),
+        self.client.call_on_each_event(
+            handle_event, 
+            event_types=self.event_types
+        )
 
-                    "sender_email": msg_obj.get("sender_email", ""),
-                    "sender_full_name": msg_obj.get("sender_full_name", ""),
+    def run_batched(self):
+        # Scan messages on a thread pool so bursts reach coref together,
+        # where the batcher groups them into shared `nlp.pipe` (or fastcoref
+        # `predict`) runs
+        get_backend().start_batching()
+        executor = ThreadPoolExecutor(max_workers=BATCH_MAX_SIZE, thread_name_prefix="scan")
+
+        def handle_event(event):
+            if not self.observe_event(event):
+                return
+            message = self.event_to_msg(event)
+            future = executor.submit(scan_for_mentions, message, self.client)
+            future.add_done_callback(log_scan_failure)
+
+        try:
+            self.client.call_on_each_event(
+                handle_event,
+                event_types=self.event_types
+            )
+        finally:
+            executor.shutdown(wait=True)
+            get_backend().stop_batching()
+
+    def run_async(self):
+        # Long-poll & Zulip API calls (incl. context fetch & DMs) on asyncio,
+        # coref stages on a scan executor, so network waits for one message
+        # never delay the next
+        if BATCHING_ENABLED:
+            get_backend().start_batching()
+        try:
+            listener = AsyncEventListener(
+                self.client, event_types=self.event_types,
+                history=self.history, directory=self.directory,
+            )
+            asyncio.run(listener.run())
+        finally:
+            get_backend().stop_batching()
+
+    def run_with_workers(self):
+        # Listener only forwards raw events; worker processes (each with own
+        # client & pipeline) convert them, run coref + context check, & notify
+        threads, cpu_sets = None, None
+        if self.topology and self.worker_count == self.topology.processes:
+            threads = self.topology.threads
+            if self.topology.pin_cpus:
+                cpu_sets = cpu_slices(available_cpus(), self.topology.processes, threads)
+
+        pool = WorkerPool(self.worker_count, threads=threads, cpu_sets=cpu_sets)
+        pool.start()
+
+        try:
+            if LISTENER_MODE == "async":
+                asyncio.run(AsyncEventListener(self.client, forward=pool.submit).run())
+            else:
+                def forward_event(event):
+                    record_event(event)
+                    pool.submit(event)
+
+                self.client.call_on_each_event(
+                    forward_event,
+                    event_types=EVENT_TYPES
+                )
+        finally:
+            pool.shutdown()
+
+
+    def observe_event(self, event):
+        # Count event & keep topic history / user directory current; True if
+        # it should be scanned
+        record_event(event)
+        if self.history is not None:
+            self.history.observe_event(event)
+        if self.directory is not None:
+            self.directory.observe_event(event)
+        return event["type"] in EVENT_TYPES
 
-                    "content": event.get("content", ""),
-                }
+    def event_to_msg(self, event):
+        return event_to_msg(event, self.client)
 
 
-# Instantiate bot just once as a global so Click can access it 
-bot = PronounBot()
+def stop_on_sigterm(signum, frame):
+    # systemd stops service with SIGTERM; exit normally so cleanup runs
+    raise SystemExit(0)
 
 
 @click.command()
 @click.option("--prod", is_flag=True, help="Run in service mode (24/7 live bot)")
 @click.option("--dev", is_flag=True, help="Run in dev mode (one-off test)")
-def launch_program(prod, dev):
+@click.option("--tune", "tune_topology", is_flag=True, help="Benchmark worker layouts & save best one")
+def launch_program(prod, dev, tune_topology):
     # Ensure only 1 mode specified
-    flags = [prod, dev]
+    flags = [prod, dev, tune_topology]
     if sum(flags) != 1:
-        raise click.UsageError("ERROR: You must provide exactly one of --prod or --dev")
+        raise click.UsageError("ERROR: You must provide exactly one of --prod, --dev or --tune")
 
     # Bot acts as a live service running 24/7 to listen for messages
     if prod:
         click.echo("Running in prod (service) mode...")
-        bot.run()
+        signal.signal(signal.SIGTERM, stop_on_sigterm)
+
+        # Compressed, indexed segments on disk (read back with `src/logsink.py`)
+        if LOG_DIR:
+            start_log_sink()
+
+        # Scans hand log records to writer thread instead of blocking on journald
+        if LOG_ASYNC:
+            start_async_logging()
+
+        # Built here (not at import) so worker processes importing this module
+        # don't each create a client & resubscribe
+        try:
+            bot = PronounBot()
+            bot.run()
+        finally:
+            shutdown_logging()
 
     # Bot acts as a one-off script (real world Zulip message example) to test locally
     elif dev:
         click.echo(f"Running in dev (test) mode...")
+        from examples.real_world_test import run_real_world_test
         run_real_world_test(use_recent_message=False)
 
+    # Pick (processes x threads) layout for this machine, used by next `--prod`
+    elif tune_topology:
+        click.echo("Tuning worker topology...")
+        save_topology(tune())
+
     else:
-        raise click.UsageError("ERROR: Please specify --prod or --dev")
+        raise click.UsageError("ERROR: Please specify --prod, --dev or --tune")
 
 
 if __name__ == "__main__":
@@ -124,9 +255,11 @@ if __name__ == "__main__":
     # For example,
     #   `python3 bot.py --prod`
     #   `python3 bot.py --dev`
+    #   `python3 bot.py --tune`
     # Or alternativey, with Makefile rules
     #   `make run-prod`
     #   `make run-dev`
+    #   `make tune`
 
     launch_program()
 
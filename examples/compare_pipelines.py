@@ -0,0 +1,167 @@
+###############################################################################
+##  `compare_pipelines.py`                                                   ##
+##                                                                           ##
+##  Purpose: Parity & latency check of coref serving modes vs full pipeline  ##
+###############################################################################
+
+
+import sys
+import os
+import json
+import time
+import statistics
+from pathlib import Path
+
+import click
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.mentions import get_mentions
+from src.parser import sanitize_content
+from src.logger import log_info, log_section_start, log_section_end, log_divider
+from processing.models import get_rss_mb
+from processing.nlp import get_nlp, extract_clusters, build_pronoun_mappings
+
+
+SCENARIOS_PATH = Path(__file__).parent / "test_scenarios.json"
+TRAINING_DATA_DIR = Path(__file__).parent.parent / "train-model" / "training-data"
+
+
+def spacy_variant(heads_only, quantized):
+    def load():
+        nlp = get_nlp(heads_only=heads_only, quantized=quantized)
+
+        def analyze(text, mentions):
+            clusters = extract_clusters(nlp(text), heads_only)
+            return build_pronoun_mappings(clusters, mentions)
+
+        return analyze
+    return load
+
+
+def load_fastcoref_variant():
+    from processing.nlp_coref import get_fcoref, get_pronoun_mappings
+    get_fcoref()
+    return get_pronoun_mappings
+
+
+# Variant name -> loader returning `analyze(text, mentions) -> pronoun mappings`
+VARIANTS = {
+    "full": spacy_variant(heads_only=False, quantized=False),
+    "heads": spacy_variant(heads_only=True, quantized=False),
+    "int8": spacy_variant(heads_only=False, quantized=True),
+    "heads-int8": spacy_variant(heads_only=True, quantized=True),
+    "fastcoref": load_fastcoref_variant,
+}
+
+
+def load_scenarios():
+    # Flatten {category: {name: text}} into (label, text) pairs
+    with open(SCENARIOS_PATH) as f:
+        scenarios = json.load(f)
+
+    return [
+        (f"{category}/{name}", text)
+        for category, entries in scenarios.items()
+        for name, text in entries.items()
+    ]
+
+
+def load_training_texts():
+    # Every `text` in training data files (their annotations aren't needed here)
+    samples = []
+    for path in sorted(TRAINING_DATA_DIR.glob("*.json")):
+        with open(path) as f:
+            items = json.load(f)
+        samples.extend((f"{path.stem}/{i}", item["text"]) for i, item in enumerate(items))
+    return samples
+
+
+def normalize_mappings(mappings):
+    # Order of pronouns within a cluster isn't meaningful, so compare as sets
+    return {name: sorted(set(pronouns)) for name, pronouns in mappings.items()}
+
+
+def run_variant(name, samples, repeat=1):
+    rss_before = get_rss_mb()
+    analyze = VARIANTS[name]()
+    rss_after = get_rss_mb()
+
+    outputs, latencies = [], []
+    for label, text in samples:
+        mentions = get_mentions(text)
+        sanitized = sanitize_content(text, mentions)
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            mappings = analyze(sanitized, mentions)
+            latencies.append(time.perf_counter() - start)
+
+        outputs.append(normalize_mappings(mappings))
+
+    latencies.sort()
+    return {
+        "variant": name,
+        "outputs": outputs,
+        "load_rss_mb": rss_after - rss_before,
+        "latency_p50_ms": statistics.median(latencies) * 1000,
+        "latency_p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "latency_total_s": sum(latencies),
+    }
+
+
+def compare_variants(reference, candidate, samples):
+    mismatched = [
+        label for (label, _), ref, cand in zip(samples, reference["outputs"], candidate["outputs"])
+        if ref != cand
+    ]
+    return {
+        "variant": candidate["variant"],
+        "agreement": 1 - len(mismatched) / len(samples) if samples else 1.0,
+        "mismatched": mismatched,
+        "speedup": reference["latency_total_s"] / candidate["latency_total_s"]
+            if candidate["latency_total_s"] else 0.0,
+    }
+
+
+@click.command()
+@click.option("--reference", default="full", type=click.Choice(list(VARIANTS)), help="Baseline variant")
+@click.option("--variant", "variants", multiple=True, default=["heads"], type=click.Choice(list(VARIANTS)))
+@click.option("--repeat", default=3, help="Timed runs per sample")
+@click.option("--training-data", is_flag=True, help="Also compare on train-model/training-data texts")
+@click.option("--json-output", is_flag=True, help="Print machine-readable report only")
+def main(reference, variants, repeat, training_data, json_output):
+    samples = load_scenarios()
+    if training_data:
+        samples += load_training_texts()
+
+    ref_result = run_variant(reference, samples, repeat)
+    results = [run_variant(v, samples, repeat) for v in variants if v != reference]
+    comparisons = [compare_variants(ref_result, r, samples) for r in results]
+
+    if json_output:
+        report = {
+            "samples": len(samples),
+            "results": [{k: v for k, v in r.items() if k != "outputs"} for r in [ref_result] + results],
+            "comparisons": comparisons,
+        }
+        click.echo(json.dumps(report, indent=2))
+        return
+
+    log_section_start("PIPELINE COMPARISON")
+    log_info(f"{len(samples)} samples, {repeat} timed run(s) each, reference = {reference}")
+    for r in [ref_result] + results:
+        log_divider()
+        log_info(
+            f"{r['variant']}: p50 {r['latency_p50_ms']:.1f} ms, p95 {r['latency_p95_ms']:.1f} ms, "
+            f"load +{r['load_rss_mb']:.0f} MB"
+        )
+    for c in comparisons:
+        log_divider()
+        log_info(f"{c['variant']} vs {reference}: {c['agreement']:.1%} agreement, {c['speedup']:.2f}x speed")
+        for label in c["mismatched"]:
+            log_info(f"  mismatch: {label}")
+    log_section_end("PIPELINE COMPARISON")
+
+
+if __name__ == "__main__":
+    main()
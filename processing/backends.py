@@ -0,0 +1,211 @@
+###############################################################################
+##  `backends.py`                                                            ##
+##                                                                           ##
+##  Purpose: Common interface & registry for coref / validation backends     ##
+###############################################################################
+
+
+import os
+import sys
+import time
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Type
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import env_str
+from src.logger import log_info
+
+
+# Backend used by parser unless told otherwise
+DEFAULT_BACKEND = env_str("COREF_BACKEND", "spacy")
+
+
+# One result shape for every backend:
+#   - cluster backends fill `mappings` (name -> pronouns clustered with it)
+#   - verdict backends fill `verdicts` (mention name -> pronouns correct?)
+@dataclass(frozen=True)
+class CorefResult:
+    backend: str
+    mappings: Dict[str, List[str]] = field(default_factory=dict)
+    verdicts: Dict[str, bool] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def has_verdicts(self) -> bool:
+        return bool(self.verdicts)
+
+
+class BaseBackend(ABC):
+    name = "base"
+    # Rough cost per message relative to spaCy transformer (= 1.0)
+    relative_cost = 1.0
+
+    def __init__(self):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def analyze(self, text, mentions) -> CorefResult:
+        start = time.perf_counter()
+        mappings, verdicts = self._analyze(text, mentions)
+        seconds = time.perf_counter() - start
+
+        self._record(1, seconds)
+        return CorefResult(backend=self.name, mappings=mappings, verdicts=verdicts, seconds=seconds)
+
+    @abstractmethod
+    def _analyze(self, text, mentions):
+        # (mappings, verdicts) for text; either may be empty
+        ...
+
+    def analyze_batch(self, texts, mentions_per_text) -> List[CorefResult]:
+        # Backends that can batch natively override this
+        return [self.analyze(text, mentions) for text, mentions in zip(texts, mentions_per_text)]
+
+    def start_batching(self, **options) -> None:
+        # Micro-batch concurrent `analyze` calls (`COREF_BATCHING`); backends
+        # without a batched model call ignore this
+        pass
+
+    def stop_batching(self) -> None:
+        pass
+
+    def _record(self, calls: int, seconds: float) -> None:
+        with self._lock:
+            self.calls += calls
+            self.total_seconds += seconds
+
+    def cost(self) -> Dict[str, float]:
+        # Static estimate plus what this process has actually measured
+        return {
+            "relative_cost": self.relative_cost,
+            "calls": self.calls,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+        }
+
+
+_BACKENDS: Dict[str, Type[BaseBackend]] = {}
+_INSTANCES: Dict[str, BaseBackend] = {}
+_INSTANCES_LOCK = threading.Lock()
+
+
+def register_backend(cls: Type[BaseBackend]) -> Type[BaseBackend]:
+    _BACKENDS[cls.name] = cls
+    return cls
+
+
+def unregister_backend(name: str) -> None:
+    # Drops backend class & its shared instance (e.g. test-only backends)
+    _BACKENDS.pop(name, None)
+    with _INSTANCES_LOCK:
+        _INSTANCES.pop(name, None)
+
+
+def available_backends() -> List[str]:
+    return sorted(_BACKENDS)
+
+
+def get_backend(name: Optional[str] = None) -> BaseBackend:
+    # Shared backend instance by name (default from `COREF_BACKEND`)
+    name = name or DEFAULT_BACKEND
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown coref backend {name!r} (choose from {', '.join(available_backends())})")
+
+    with _INSTANCES_LOCK:
+        if name not in _INSTANCES:
+            _INSTANCES[name] = _BACKENDS[name]()
+            log_info(f"Using coref backend '{name}'")
+        return _INSTANCES[name]
+
+
+def backend_costs() -> Dict[str, Dict[str, float]]:
+    # Cost of every backend used so far, for picking cheapest adequate one
+    return {name: backend.cost() for name, backend in _INSTANCES.items()}
+
+
+# Backend modules pull in heavy deps (spaCy, fastcoref, ...), so each one is
+# only imported once its backend actually runs
+
+@register_backend
+class SpacyBackend(BaseBackend):
+    # Production path: `en_coreference_web_trf` with cache, batching, etc.
+    name = "spacy"
+    relative_cost = 1.0
+
+    def _analyze(self, text, mentions):
+        from processing.nlp import get_pronoun_mappings
+        return get_pronoun_mappings(text, mentions), {}
+
+    def start_batching(self, **options) -> None:
+        from processing.nlp import start_batching
+        start_batching(**options)
+
+    def stop_batching(self) -> None:
+        from processing.nlp import stop_batching
+        stop_batching()
+
+
+@register_backend
+class SpacyFinetunedBackend(BaseBackend):
+    # Experimental fine-tuned spaCy pipeline from `nlp_spacy.py`
+    name = "spacy-finetuned"
+    relative_cost = 1.0
+
+    def _analyze(self, text, mentions):
+        from processing.nlp_spacy import apply_nlp
+        from processing.nlp import extract_clusters, build_pronoun_mappings
+
+        doc = apply_nlp(text)
+        clusters = extract_clusters(doc, heads_only=False)
+        return build_pronoun_mappings(clusters, mentions), {}
+
+
+@register_backend
+class FastcorefBackend(BaseBackend):
+    # FCoref (distilled LingMess) from `nlp_coref.py`, much cheaper on CPU
+    name = "fastcoref"
+    relative_cost = 0.3
+
+    def _analyze(self, text, mentions):
+        from processing.nlp_coref import get_pronoun_mappings
+        return get_pronoun_mappings(text, mentions), {}
+
+    def start_batching(self, **options) -> None:
+        # Concurrent `analyze` calls share one `predict` (see `analyze_batch`)
+        from processing.nlp_coref import start_batching
+        start_batching(**options)
+
+    def stop_batching(self) -> None:
+        from processing.nlp_coref import stop_batching
+        stop_batching()
+
+    def analyze_batch(self, texts, mentions_per_text) -> List[CorefResult]:
+        # One `predict` call for whole batch (FCoref length-sorts internally)
+        from processing.nlp_coref import get_pronoun_mappings_batch
+
+        texts = list(texts)
+        start = time.perf_counter()
+        all_mappings = get_pronoun_mappings_batch(texts, mentions_per_text)
+        seconds = time.perf_counter() - start
+
+        self._record(len(texts), seconds)
+        per_text = seconds / len(texts) if texts else 0.0
+        return [
+            CorefResult(backend=self.name, mappings=mappings, seconds=per_text)
+            for mappings in all_mappings
+        ]
+
+
+@register_backend
+class LLMBackend(BaseBackend):
+    # Remote LLM prompt per mention; returns verdicts rather than clusters
+    name = "llm"
+    relative_cost = 5.0
+
+    def _analyze(self, text, mentions):
+        from processing.llm import validate_pronouns_with_llm
+
+        results = validate_pronouns_with_llm(text, mentions)
+        return {}, {r["name"]: r["pronouns_match"] for r in results}
@@ -0,0 +1,152 @@
+###############################################################################
+##  `batching.py`                                                            ##
+##                                                                           ##
+##  Purpose: Micro-batches concurrent coref requests through `nlp.pipe`      ##
+###############################################################################
+
+
+import os
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import env_bool, env_int, env_float
+from src.logger import log_info, log_error
+
+
+# Batching is opt-in, since it only pays off when messages arrive concurrently
+BATCHING_ENABLED = env_bool("COREF_BATCHING", False)
+
+# Collect at most this many texts, waiting at most this long after first one
+BATCH_MAX_SIZE = env_int("COREF_BATCH_MAX_SIZE", 16)
+BATCH_WINDOW_MS = env_float("COREF_BATCH_WINDOW_MS", 50.0)
+
+# Docs per forward pass inside `nlp.pipe` (trf models peak around 4-8 on CPU)
+PIPE_BATCH_SIZE = env_int("COREF_PIPE_BATCH_SIZE", 8)
+
+
+# Sentinel put on queue to wake worker thread for shutdown
+_STOP = object()
+
+
+class CorefBatcher:
+    def __init__(
+        self,
+        get_nlp: Callable[[], Any],
+        max_batch_size: int = BATCH_MAX_SIZE,
+        window_ms: float = BATCH_WINDOW_MS,
+        pipe_batch_size: int = PIPE_BATCH_SIZE,
+        process_batch: Optional[Callable[[List[str]], List[Any]]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+
+        self.get_nlp = get_nlp
+        self.max_batch_size = max_batch_size
+        self.window_seconds = max(window_ms, 0.0) / 1000
+        self.pipe_batch_size = pipe_batch_size
+        # Models without `nlp.pipe` (e.g. FCoref) pass texts -> results instead
+        self.process_batch = process_batch or self._pipe
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+        self.batches_run = 0
+        self.docs_processed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name="coref-batcher", daemon=True)
+        self._thread.start()
+        log_info(
+            f"Coref batching on (max {self.max_batch_size} texts / "
+            f"{self.window_seconds * 1000:.0f}ms window, pipe batch size {self.pipe_batch_size})"
+        )
+
+    def stop(self, timeout: float = 5.0) -> None:
+        # Finish whatever is already queued, then let worker thread exit
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, text: str) -> Future:
+        # Queue text for next batch; future resolves to its spaCy Doc (or
+        # whatever `process_batch` returns for it)
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _collect_batch(self, first) -> Tuple[List[Tuple[str, Future]], bool]:
+        # Gather more requests until batch is full or window closes
+        batch = [first]
+        deadline = time.monotonic() + self.window_seconds
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+    def _pipe(self, texts: List[str]) -> List[Any]:
+        nlp = self.get_nlp()
+        return list(nlp.pipe(texts, batch_size=self.pipe_batch_size))
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = [text for text, _ in batch]
+        try:
+            docs = self.process_batch(texts)
+        except Exception as e:
+            log_error(f"Coref batch of {len(batch)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        # Fan each doc back out to the request that asked for it
+        for (_, future), doc in zip(batch, docs):
+            future.set_result(doc)
+
+        self.batches_run += 1
+        self.docs_processed += len(batch)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+            batch, stopping = self._collect_batch(first)
+            self._run_batch(batch)
+
+        # Drain anything submitted after stop was requested
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        for i in range(0, len(leftovers), self.max_batch_size):
+            self._run_batch(leftovers[i : i + self.max_batch_size])
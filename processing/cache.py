@@ -0,0 +1,191 @@
+###############################################################################
+##  `cache.py`                                                               ##
+##                                                                           ##
+##  Purpose: Content-addressed result cache (in-memory LRU + SQLite tier)    ##
+###############################################################################
+
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.logger import log_info
+from src.metrics import gauge
+
+
+# Separator that can't appear in normal message text, so parts can't collide
+KEY_SEPARATOR = "\x1f"
+
+CACHE_STATS = gauge("pronoun_bot_cache", "Result cache entries, lookups & hit rate", ["cache", "stat"])
+
+
+def make_cache_key(*parts: Any) -> str:
+    # Hash all parts (e.g. text + model version) into one fixed-size key
+    joined = KEY_SEPARATOR.join(str(part) for part in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: Optional[float] = 3600,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        table: str = "results",
+    ):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.table = table
+
+        # key -> (value, stored_at), oldest access first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str) -> None:
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Shared across scan threads, so all access goes through `self._lock`
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)"
+        )
+        self._db.commit()
+        log_info(f"Result cache '{self.table}' persisted at {db_path}")
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if not self._expired(stored_at, now):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            value = self._get_from_disk(key, now)
+            if value is not None:
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[Any]:
+        if self._db is None:
+            return None
+
+        row = self._db.execute(
+            f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        raw_value, stored_at = row
+        if self._expired(stored_at, now):
+            self._db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+
+        self._db.execute(
+            f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self._db.commit()
+
+        # Promote into memory tier so next lookup skips SQLite
+        value = json.loads(raw_value)
+        self._store_in_memory(key, value, stored_at)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._store_in_memory(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, now),
+                )
+                self._evict_from_disk()
+                self._db.commit()
+
+    def _store_in_memory(self, key: str, value: Any, stored_at: float) -> None:
+        self._entries[key] = (value, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_from_disk(self) -> None:
+        # Drop least recently accessed rows beyond disk limit
+        self._db.execute(
+            f"DELETE FROM {self.table} WHERE key IN ("
+            f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table}")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+
+def export_cache_metrics(cache: ResultCache, name: str) -> None:
+    # Read at scrape time, so lookups themselves pay nothing extra
+    for stat in ["entries", "hits", "disk_hits", "misses", "evictions", "hit_rate"]:
+        CACHE_STATS.set_function(lambda stat=stat: cache.stats()[stat], cache=name, stat=stat)
@@ -5,11 +5,22 @@
 ###############################################################################
 
 
-import requests
+import os
+import sys
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import env_float, env_int, env_str
+from src.logger import log_debug, log_warning, log_error
+from processing.cache import ResultCache, make_cache_key, export_cache_metrics
 
-BASE_URL = "https://text.pollinations.ai/"
+
+BASE_URL = env_str("LLM_BASE_URL", "https://text.pollinations.ai/")
 
 PARAMS = {
     "model": "openai",
@@ -17,21 +28,113 @@ PARAMS = {
     "private": "true",
 }
 
+# Per attempt (an attempt never outlives caller's deadline either)
+LLM_TIMEOUT_SECONDS = env_float("LLM_TIMEOUT_SECONDS", 45.0)
+
+# Prompts in flight at once across all messages (also keep-alive pool size)
+LLM_MAX_CONCURRENCY = env_int("LLM_MAX_CONCURRENCY", 4)
+
+# Whole message (all mentions, incl. retries) must finish within this
+LLM_DEADLINE_SECONDS = env_float("LLM_DEADLINE_SECONDS", 60.0)
+
+# Bump whenever prompt wording changes, so old verdicts aren't reused
+PROMPT_VERSION = 1
+
+# Verdicts persist across restarts by default (each one is a remote round trip)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM_CACHE_PATH = env_str("LLM_CACHE_PATH", os.path.join(ROOT_DIR, "cache", "llm_verdicts.sqlite3"))
+LLM_CACHE_SIZE = env_int("LLM_CACHE_SIZE", 1024)
+LLM_CACHE_DISK_SIZE = env_int("LLM_CACHE_DISK_SIZE", 50000)
+LLM_CACHE_TTL_SECONDS = env_float("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600)
+
+
+_session = None
+_executor = None
+_cache = None
+_setup_lock = threading.Lock()
+
+
+def get_llm_cache():
+    # Opened on first use, so importing this module never touches disk
+    global _cache
+    with _setup_lock:
+        if _cache is None:
+            _cache = ResultCache(
+                max_entries=LLM_CACHE_SIZE,
+                ttl_seconds=LLM_CACHE_TTL_SECONDS,
+                db_path=LLM_CACHE_PATH or None,
+                max_disk_entries=LLM_CACHE_DISK_SIZE,
+                table="llm_verdicts",
+            )
+            export_cache_metrics(_cache, "llm")
+        return _cache
+
+
+def llm_cache_key(content, first_name, pronouns):
+    return make_cache_key(
+        "llm", PROMPT_VERSION, PARAMS["model"],
+        make_cache_key(content), first_name, "/".join(pronouns),
+    )
+
+
+def get_session():
+    # One keep-alive connection pool per process, instead of a new TCP/TLS
+    # handshake per prompt
+    global _session
+    with _setup_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_MAX_CONCURRENCY)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get_executor():
+    # Bounded fan-out: at most `LLM_MAX_CONCURRENCY` prompts run at once,
+    # however many messages are being validated
+    global _executor
+    with _setup_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+        return _executor
+
+
+def close_session():
+    global _session, _executor
+    with _setup_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
 
-def prompt_llm_via_api(prompt, max_retries=3):
+def remaining_seconds(deadline):
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def prompt_llm_via_api(prompt, max_retries=3, deadline=None):
     # Call LLM API with retry logic for resilience
+    # (`deadline` is a `time.monotonic()` value shared by a message's prompts)
     for attempt in range(max_retries):
+        remaining = remaining_seconds(deadline)
+        if remaining is not None and remaining <= 0:
+            raise RuntimeError("LLM API deadline exceeded")
+        timeout = LLM_TIMEOUT_SECONDS if remaining is None else min(LLM_TIMEOUT_SECONDS, remaining)
+
         try:
             # Use POST instead of GET for more reliability & security
-            response = requests.post(
-                BASE_URL, 
+            response = get_session().post(
+                BASE_URL,
                 json={
                     "messages": [
                         {"role": "user", "content": prompt}
-                    ], 
+                    ],
                     **PARAMS
-                }, 
-                timeout=45
+                },
+                timeout=timeout
             )
             response.raise_for_status()
             return response.text.strip()
@@ -39,73 +142,118 @@ def prompt_llm_via_api(prompt, max_retries=3):
         except requests.exceptions.Timeout as e:
             if attempt == max_retries - 1:
                 raise RuntimeError(f"LLM API timeout after {max_retries} attempts: {e}")
-            time.sleep(2 ** attempt)  # Exponential backoff
+            backoff(attempt, deadline)
             continue
-            
+
         except requests.exceptions.ConnectionError as e:
             if attempt == max_retries - 1:
                 raise RuntimeError(f"LLM API connection failed after {max_retries} attempts: {e}")
-            time.sleep(2 ** attempt)
+            backoff(attempt, deadline)
             continue
-            
+
         except requests.exceptions.HTTPError as e:
             # Don't retry HTTP errors (4xx/5xx)
             raise RuntimeError(f"LLM API HTTP error {response.status_code}: {e}")
-            
+
         except requests.RequestException as e:
             if attempt == max_retries - 1:
                 raise RuntimeError(f"LLM API request failed after {max_retries} attempts: {e}")
-            time.sleep(2 ** attempt)
+            backoff(attempt, deadline)
             continue
 
 
-def validate_pronouns_with_llm(content, mentions):
-    results = []
+def backoff(attempt, deadline=None):
+    # Exponential backoff, but never sleep past deadline
+    delay = 2 ** attempt
+    remaining = remaining_seconds(deadline)
+    if remaining is not None:
+        delay = max(min(delay, remaining), 0)
+    time.sleep(delay)
 
-    for mention in mentions:
-        first_name, pronouns = mention.first_name, mention.pronouns
 
-        if not pronouns: 
-            break
-        
-        # Format pronouns clearly for model to understand
-        pronoun_options = ", ".join(pronouns)
+def build_prompt(first_name, pronouns, content):
+    # Format pronouns clearly for model to understand
+    pronoun_options = ", ".join(pronouns)
 
-        PROMPT = (f"""
-            {first_name} uses the following pronouns: {pronoun_options}. 
-            Any of these pronouns are valid for {first_name}.
+    return (f"""
+        {first_name} uses the following pronouns: {pronoun_options}.
+        Any of these pronouns are valid for {first_name}.
 
-            Check the text below. ONLY validate pronouns referring to {first_name}. 
-            Ignore pronouns that refer to anyone else.
+        Check the text below. ONLY validate pronouns referring to {first_name}.
+        Ignore pronouns that refer to anyone else.
 
-            If no pronouns referring to {first_name} appear in the text, that is acceptable. 
-            In this case, you should return 'true'.
+        If no pronouns referring to {first_name} appear in the text, that is acceptable.
+        In this case, you should return 'true'.
 
-            Text:
-            \"\"\"
-            {content}
-            \"\"\"
+        Text:
+        \"\"\"
+        {content}
+        \"\"\"
 
-            Return 'true' if all pronouns referring to {first_name} are correct. 
-            Return 'false' if any pronoun referring to {first_name} is incorrect. 
-            Only return true or false.
-            """
-        )
+        Return 'true' if all pronouns referring to {first_name} are correct.
+        Return 'false' if any pronoun referring to {first_name} is incorrect.
+        Only return true or false.
+        """
+    )
 
-        response = prompt_llm_via_api(PROMPT)
 
-        if "true" in response:
-            match = True
-        elif "false" in response:
-            match = False 
+def parse_verdict(response):
+    if "true" in response:
+        return True
+    if "false" in response:
+        return False
+    return None
 
-        pronouns_display = "/".join(pronouns) if pronouns else "None"
-        results.append({
-            "name": mention.name,
-            "pronouns": pronouns_display,
-            "pronouns_match": match
-        })
 
-    return results
+def validate_pronouns_with_llm(content, mentions, deadline_seconds=LLM_DEADLINE_SECONDS):
+    # Cached verdicts first; remaining prompts run concurrently. Mentions
+    # without a verdict by deadline (or whose call failed) are left out,
+    # i.e. not flagged
+    deadline = time.monotonic() + deadline_seconds
+    cache = get_llm_cache()
+
+    verdicts, keys, futures = {}, {}, {}
+    for mention in mentions:
+        if not mention.pronouns:
+            continue
+
+        keys[mention] = llm_cache_key(content, mention.first_name, mention.pronouns)
+        cached = cache.get(keys[mention])
+        if cached is not None:
+            verdicts[mention] = cached
+            continue
+
+        prompt = build_prompt(mention.first_name, mention.pronouns, content)
+        futures[mention] = get_executor().submit(prompt_llm_via_api, prompt, deadline=deadline)
 
+    if verdicts:
+        log_debug(f"LLM verdict cache hit for {len(verdicts)} of {len(keys)} mention(s)")
 
+    done, not_done = wait(futures.values(), timeout=max(deadline_seconds, 0)) if futures else (set(), set())
+    for future in not_done:
+        future.cancel()
+    if not_done:
+        log_warning(f"LLM validation deadline hit, {len(not_done)} of {len(futures)} mention(s) unanswered")
+
+    for mention, future in futures.items():
+        if future not in done:
+            continue
+        try:
+            match = parse_verdict(future.result())
+        except RuntimeError as e:
+            log_error(f"LLM validation failed for {mention.name}: {e}")
+            continue
+        if match is None:
+            continue
+
+        cache.set(keys[mention], match)
+        verdicts[mention] = match
+
+    return [
+        {
+            "name": mention.name,
+            "pronouns": "/".join(mention.pronouns),
+            "pronouns_match": verdicts[mention]
+        }
+        for mention in keys if mention in verdicts
+    ]
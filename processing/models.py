@@ -0,0 +1,105 @@
+###############################################################################
+##  `models.py`                                                              ##
+##                                                                           ##
+##  Purpose: Process-wide registry so each NLP pipeline is loaded only once  ##
+###############################################################################
+
+
+import os
+import sys
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.logger import log_info
+
+
+# Loaded models keyed by (name, options), shared by every caller in process
+_MODELS: Dict[Hashable, Any] = {}
+_MODEL_STATS: Dict[Hashable, Dict[str, float]] = {}
+
+# One lock per key so unrelated loads don't wait on each other
+_REGISTRY_LOCK = threading.Lock()
+_KEY_LOCKS: Dict[Hashable, threading.Lock] = {}
+
+
+def get_rss_mb() -> float:
+    # Current resident set size of this process (in MB)
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Non-Linux fallback: peak RSS is the best we can get cheaply
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux reports kilobytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _key_lock(key: Hashable) -> threading.Lock:
+    with _REGISTRY_LOCK:
+        if key not in _KEY_LOCKS:
+            _KEY_LOCKS[key] = threading.Lock()
+        return _KEY_LOCKS[key]
+
+
+def _timed_load(key: Hashable, loader: Callable[[], Any]) -> Any:
+    # Run loader while recording wall time & resident memory it added
+    rss_before = get_rss_mb()
+    start = time.perf_counter()
+
+    model = loader()
+
+    load_seconds = time.perf_counter() - start
+    rss_delta = get_rss_mb() - rss_before
+
+    _MODEL_STATS[key] = {
+        "load_seconds": load_seconds,
+        "rss_delta_mb": rss_delta,
+        "rss_total_mb": get_rss_mb(),
+    }
+    log_info(f"Loaded model {key} in {load_seconds:.2f}s (+{rss_delta:.1f} MB resident)")
+
+    return model
+
+
+def get_model(key: Hashable, loader: Callable[[], Any]) -> Any:
+    # Return shared instance for key, calling loader only on first request
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+
+    with _key_lock(key):
+        # Another thread may have finished loading while we waited
+        if key not in _MODELS:
+            _MODELS[key] = _timed_load(key, loader)
+        return _MODELS[key]
+
+
+def load_pipeline(name: str, **options) -> Any:
+    # Load a fresh (unshared) spaCy pipeline, e.g. for training that mutates it
+    import spacy
+    return _timed_load((name, "fresh"), lambda: spacy.load(name, **options))
+
+
+def get_pipeline(name: str, **options) -> Any:
+    # Load a spaCy pipeline once per process & hand out the shared instance
+    # Options (e.g. `exclude`) are part of key, since they change the pipeline
+    import spacy
+    key = (name, tuple(sorted((k, repr(v)) for k, v in options.items())))
+    return get_model(key, lambda: spacy.load(name, **options))
+
+
+def get_model_stats() -> Dict[Hashable, Dict[str, float]]:
+    # Load time & memory footprint for every model loaded so far
+    return {key: dict(stats) for key, stats in _MODEL_STATS.items()}
+
+
+def clear_models() -> None:
+    # Drop all shared instances (next request reloads from scratch)
+    with _REGISTRY_LOCK:
+        _MODELS.clear()
+        _MODEL_STATS.clear()
+        _KEY_LOCKS.clear()
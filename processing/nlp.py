@@ -5,12 +5,20 @@
 ###############################################################################
 
 
-import spacy
 import sys
 import os
+import re
+import string
+from functools import lru_cache
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.logger import log_original_text, log_debug, log_nlp_clusters, log_section_start
+from src.logger import log_original_text, log_debug, log_nlp_clusters, log_section_start, debug_enabled
+from processing.models import get_model, get_pipeline
+from processing.quantize import load_quantized_pipeline
+from processing.batching import CorefBatcher
+from processing.cache import ResultCache, make_cache_key, export_cache_metrics
+from src.config import env_bool, env_int, env_float, env_str
+from src.metrics import QUEUE_DEPTH
 
 
 PRONOUN_GROUPS = {
@@ -25,33 +33,132 @@ PRONOUN_GROUPS = {
 }
 PRONOUNS = sorted({p for forms in PRONOUN_GROUPS.values() for p in forms})
 
+# Whole-word match on any known pronoun form (longest first, so "hers" beats "her")
+PRONOUN_LEXICON_PATTERN = re.compile(
+    r"\b(?:" + "|".join(sorted(PRONOUNS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
 # Use installed spaCy coreference model
 MODEL_NAME = "en_coreference_web_trf"
 
+# Pronoun checks only need single-token head clusters, so serving can drop
+# span resolver (& its cleaner) that expand heads into full mention spans
+HEADS_ONLY = env_bool("COREF_HEADS_ONLY", False)
+SPAN_RESOLVER_COMPONENTS = ["span_resolver", "span_cleaner"]
+HEAD_CLUSTER_PREFIX = "coref_head_clusters"
+
+# Serve int8 dynamically quantized weights (check parity with `make compare_pipelines`)
+QUANTIZED = env_bool("COREF_QUANTIZED", False)
+
+# Bump whenever cluster extraction changes shape, so stale entries aren't reused
+CLUSTER_FORMAT_VERSION = 1
+
+# Coref results keyed by sanitized text (identical edits & context re-checks)
+COREF_CACHE = ResultCache(
+    max_entries=env_int("COREF_CACHE_SIZE", 512),
+    ttl_seconds=env_float("COREF_CACHE_TTL_SECONDS", 3600),
+    db_path=env_str("COREF_CACHE_PATH") or None,
+    max_disk_entries=env_int("COREF_CACHE_DISK_SIZE", 10000),
+    table="coref_clusters",
+)
+export_cache_metrics(COREF_CACHE, "coref")
+
+
+@lru_cache(maxsize=None)
+def get_model_version(name=MODEL_NAME):
+    # Installed package version (cheap, doesn't load the model)
+    from importlib.metadata import version, PackageNotFoundError
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def get_nlp(heads_only=HEADS_ONLY, quantized=QUANTIZED):
+    # Shared pipeline instance (loaded on first use, then reused per process)
+    options = {"exclude": SPAN_RESOLVER_COMPONENTS} if heads_only else {}
+
+    if quantized:
+        key = (MODEL_NAME, "int8", heads_only)
+        return get_model(key, lambda: load_quantized_pipeline(MODEL_NAME, **options))
+    return get_pipeline(MODEL_NAME, **options)
+
 
-def apply_nlp(text):
-    nlp = spacy.load(MODEL_NAME)
+# Set while micro-batching is on, so concurrent callers share `nlp.pipe` runs
+_batcher = None
+
+
+def start_batching(**options):
+    global _batcher
+    if _batcher is None:
+        _batcher = CorefBatcher(get_nlp, **options)
+        QUEUE_DEPTH.set_function(_batcher.pending, queue="coref_batch")
+    _batcher.start()
+    return _batcher
+
+
+def stop_batching():
+    global _batcher
+    if _batcher is not None:
+        _batcher.stop()
+        _batcher = None
+
+
+def apply_nlp(text, heads_only=HEADS_ONLY):
+    # Join current batch if batching is running, otherwise run text directly
+    # (batcher always serves configured pipeline)
+    if _batcher is not None and _batcher.running and heads_only == HEADS_ONLY:
+        return _batcher.submit(text).result()
+
+    nlp = get_nlp(heads_only)
 
     doc = nlp(text)
     return doc
 
 
-def get_clusters_from_text(text):
-    doc = apply_nlp(text)
-    
+def coref_cache_key(text, heads_only=HEADS_ONLY):
+    return make_cache_key(
+        MODEL_NAME, get_model_version(), CLUSTER_FORMAT_VERSION, heads_only, QUANTIZED, text
+    )
+
+
+def get_clusters_from_text(text, heads_only=HEADS_ONLY):
     log_original_text(text)
     log_section_start("NLP ANALYSIS")
-    
-    log_debug("Running coreference model...")
-    # Debug: show raw spaCy clusters
-    log_debug("Raw spaCy clusters detected:")
-    for cluster in doc.spans:
-        log_debug(f"  {cluster}: {doc.spans[cluster]}")
+
+    # Repeated text (e.g. edit that didn't touch content) skips the transformer
+    key = coref_cache_key(text, heads_only)
+    cached = COREF_CACHE.get(key)
+    if cached is not None:
+        log_debug("Coref cache hit, reusing clusters")
+        return [list(cluster) for cluster in cached]
+
+    doc = apply_nlp(text, heads_only)
+    clusters = extract_clusters(doc, heads_only)
+
+    COREF_CACHE.set(key, clusters)
+    return [list(cluster) for cluster in clusters]
+
+
+def extract_clusters(doc, heads_only=HEADS_ONLY):
+    # Full pipeline writes both `coref_head_clusters_*` & `coref_clusters_*`,
+    # heads-only pipeline writes (& reads) just the former
+    span_keys = [
+        key for key in doc.spans
+        if not heads_only or key.startswith(HEAD_CLUSTER_PREFIX)
+    ]
+
+    # Debug: show raw spaCy clusters (formatting spans is skipped unless shown)
+    if debug_enabled():
+        log_debug("Raw spaCy clusters detected:")
+        for cluster in span_keys:
+            log_debug(f"  {cluster}: {doc.spans[cluster]}")
 
     # Build cluster strings
     clusters = []
     
-    for cluster in doc.spans:
+    for cluster in span_keys:
         cluster_strings = []
 
         for span in doc.spans[cluster]:
@@ -64,44 +171,86 @@ def get_clusters_from_text(text):
     return clusters
 
 
+POSSESSIVE_SUFFIXES = ("'s", "\u2019s")
+NAME_PUNCTUATION = string.punctuation + "\u2018\u2019\u201c\u201d"
+
+
+def normalize_name_token(word):
+    # "Adrien's" / "ADRIEN," / "Adrien" -> "adrien"
+    word = word.strip().casefold()
+    for suffix in POSSESSIVE_SUFFIXES:
+        if word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    return word.strip(NAME_PUNCTUATION)
+
+
+def normalize_name_span(span):
+    # Whole span as 1 key; possessive only stripped from single-token spans,
+    # so "Alice's mom" stays "alice's mom" (a different person)
+    words = span.split()
+    if len(words) == 1:
+        return normalize_name_token(words[0])
+    return " ".join(words).casefold().strip(NAME_PUNCTUATION)
+
+
+def build_name_index(mentions):
+    # Normalized first / other / full name -> ids of mentions it could mean
+    index = {}
+    for mention in mentions:
+        for name in (mention.first_name, *mention.other_names, mention.name):
+            key = normalize_name_span(name)
+            if key:
+                index.setdefault(key, set()).add(mention.mention_id)
+    return index
+
+
+def match_cluster(cluster_tokens, name_index):
+    # First span in cluster that is (as a whole) a name of exactly 1 mention;
+    # "Alice and Bob" / "Alice's mom" never match, & a name shared by several
+    # (2 mentioned "Alex"es) can't attribute cluster on its own
+    for token in cluster_tokens:
+        mention_ids = name_index.get(normalize_name_span(token))
+        if mention_ids is not None and len(mention_ids) == 1:
+            return next(iter(mention_ids))
+    return None
+
+
 def map_names_to_pronouns(clusters, mentions):
-    # Build lookup: first name -> NameTag
-    first_name_to_mention = {m.first_name: m for m in mentions}
+    # Mention id -> everything clustered with that mention (unmatched
+    # clusters are keyed by their first token, as before)
+    name_index = build_name_index(mentions)
 
     name_to_cluster = {}
 
     for cluster in clusters:
         cluster_tokens = [t.strip() for t in cluster]
+        if not cluster_tokens:
+            continue
 
-        # Try to match a first name in cluster, then try any others
-        matched_first_name = None
-        for first_name, mention in first_name_to_mention.items():
-            if any(
-                token == mention.first_name or token in mention.other_names 
-                for token in cluster_tokens
-            ):
-                matched_first_name = first_name
-                break
+        main_name = match_cluster(cluster_tokens, name_index) or cluster_tokens[0]
 
-        main_name = matched_first_name if matched_first_name else cluster_tokens[0]
+        # Map main name to everything in cluster (deduplicated, in order)
+        existing = name_to_cluster.setdefault(main_name, {})
+        existing.update(dict.fromkeys(cluster_tokens))
 
-        # Map main name to everything in cluster (deduplicated)
-        existing = set(name_to_cluster.get(main_name, []))
-        name_to_cluster[main_name] = list(existing.union(cluster_tokens))
+    return {name: list(tokens) for name, tokens in name_to_cluster.items()}
 
-    return name_to_cluster
 
+def get_pronoun_mappings(text, mentions, heads_only=HEADS_ONLY):
+    clusters = get_clusters_from_text(text, heads_only)
+    return build_pronoun_mappings(clusters, mentions)
 
-def get_pronoun_mappings(text, mentions):
-    clusters = get_clusters_from_text(text)
-    
+
+def build_pronoun_mappings(clusters, mentions):
     mappings = map_names_to_pronouns(clusters, mentions)
     
     log_debug("Building pronoun mappings from clusters...")
     pronoun_mappings = {}
 
     for name, pronouns in mappings.items():
-        log_debug(f"  Processing cluster for '{name}': {pronouns}")
+        if debug_enabled():
+            log_debug(f"  Processing cluster for '{name}': {pronouns}")
 
         pronoun_mappings[name] = [
             pronoun.lower() for pronoun in pronouns 
@@ -5,56 +5,97 @@
 ###############################################################################
 
 
-import re
-from fastcoref import FCoref
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import env_int, env_str
 from src.logger import log_info
+from processing.models import get_model
+from processing.batching import CorefBatcher
+from processing.nlp import build_pronoun_mappings
+from src.metrics import QUEUE_DEPTH
 
 
-def apply_nlp(text):
-    model = FCoref(device='cpu')  # can use 'cuda:0' for GPU
+# Can use 'cuda:0' for GPU
+FASTCOREF_DEVICE = env_str("FASTCOREF_DEVICE", "cpu")
+
+# FCoref sorts texts by length & packs them into batches up to this many tokens
+FASTCOREF_MAX_TOKENS_IN_BATCH = env_int("FASTCOREF_MAX_TOKENS_IN_BATCH", 10000)
+
+
+def get_fcoref():
+    # One resident FCoref model per process (shared via model registry)
+    def load():
+        from fastcoref import FCoref
+        return FCoref(device=FASTCOREF_DEVICE)
+
+    return get_model(("fastcoref", FASTCOREF_DEVICE), load)
+
+
+def predict_clusters(texts):
+    # Many texts in one call, so FCoref can batch them by length
+    texts = list(texts)
+    if not texts:
+        return []
+
+    model = get_fcoref()
+    preds = model.predict(texts=texts, max_tokens_in_batch=FASTCOREF_MAX_TOKENS_IN_BATCH)
 
-    preds = model.predict(texts=[text])
-    clusters = preds[0].get_clusters()
+    return [[list(cluster) for cluster in pred.get_clusters()] for pred in preds]
 
-    return clusters
 
+# Set while micro-batching is on, so concurrent callers share `predict` runs
+_batcher = None
 
-def extract_name_pronoun_mapping(clusters):
-    pronouns = {"he", "him", "his", "she", "her", "hers", "they", "them", "their", "theirs"}
-    name_to_pronouns = {}
 
-    for cluster in clusters:
-        # Prefer proper name over pronouns
-        name_candidates = [m for m in cluster if re.match(r"^[A-Z][a-z]+$", m) and m.lower() not in pronouns]
-        if name_candidates:
-            # Choose longest name candidate
-            main_name = max(name_candidates, key=len)
-        else:
-            # Fall back to first mention in cluster
-            main_name = cluster[0]
+def start_batching(**options):
+    global _batcher
+    if _batcher is None:
+        _batcher = CorefBatcher(get_fcoref, process_batch=predict_clusters, **options)
+        QUEUE_DEPTH.set_function(_batcher.pending, queue="fastcoref_batch")
+    _batcher.start()
+    return _batcher
 
-        cluster_pronouns = [m for m in cluster if m.lower() in pronouns]
-        if cluster_pronouns:
-            name_to_pronouns[main_name] = cluster_pronouns
 
-    return name_to_pronouns
+def stop_batching():
+    global _batcher
+    if _batcher is not None:
+        _batcher.stop()
+        _batcher = None
+
+
+def apply_nlp(text):
+    # Join current batch if batching is running, otherwise predict directly
+    if _batcher is not None and _batcher.running:
+        return _batcher.submit(text).result()
+    return predict_clusters([text])[0]
+
+
+def get_pronoun_mappings(text, mentions):
+    # Same shape as `processing.nlp.get_pronoun_mappings` (name -> pronouns)
+    return build_pronoun_mappings(apply_nlp(text), mentions)
+
+
+def get_pronoun_mappings_batch(texts, mentions_per_text):
+    all_clusters = predict_clusters(texts)
+    return [
+        build_pronoun_mappings(clusters, mentions)
+        for clusters, mentions in zip(all_clusters, mentions_per_text)
+    ]
 
 
 if __name__ == "__main__":
-    text = (
+    texts = [
         "John met Sarah at the cafe. He ordered coffee, and she chose tea. "
         "Sarah thanked him. Later, John waved at her as he left."
-        "The two of them had a good time together."
-    )
-
-    clusters = apply_nlp(text)
-    mappings = extract_name_pronoun_mapping(clusters)
+        "The two of them had a good time together.",
+        "Riley finished xir homework early. Xe was proud of the work xe had done.",
+    ]
 
-    log_info("Name -> Pronouns Mapping:")
+    for text, mappings in zip(texts, get_pronoun_mappings_batch(texts, [[], []])):
+        log_info(f"Text: {text}")
+        log_info("Name -> Pronouns Mapping:")
 
-    for name, pronouns in mappings.items():
-        log_info(f"  {name}: {pronouns}")
+        for name, pronouns in mappings.items():
+            log_info(f"  {name}: {pronouns}")
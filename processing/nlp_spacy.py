@@ -6,7 +6,6 @@
 
 
 import re
-import spacy
 import json
 from pathlib import Path
 import sys
@@ -14,17 +13,18 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.logger import log_info, log_original_text
+from processing.models import get_pipeline
 
 
 def apply_nlp(text):
     # Use fine-tuned model that recognizes neopronouns!
     base = Path(__file__).resolve().parent.parent   # project root
-    # nlp = spacy.load(base / "coref" / "training" / "coref")
+    # nlp = get_pipeline(str(base / "coref" / "training" / "coref"))
 
-    # nlp = spacy.load(base / "coref" / "training" / "finetune_cluster" / "model-best")
+    # nlp = get_pipeline(str(base / "coref" / "training" / "finetune_cluster" / "model-best"))
     
     # Fallback to original model if fine-tuned model not found
-    nlp = spacy.load("en_coreference_web_trf")
+    nlp = get_pipeline("en_coreference_web_trf")
 
     doc = nlp(text)
 
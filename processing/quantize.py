@@ -0,0 +1,49 @@
+###############################################################################
+##  `quantize.py`                                                            ##
+##                                                                           ##
+##  Purpose: Int8 dynamic quantization of coref pipeline for CPU serving     ##
+###############################################################################
+
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.logger import log_info
+
+
+def quantize_pipeline(nlp):
+    # Swap every PyTorch model inside pipeline (transformer + coref scorer)
+    # for one whose Linear layers use int8 weights; activations stay fp32,
+    # so no calibration data is needed
+    import torch
+    from thinc.shims import PyTorchShim
+
+    quantize_dynamic = getattr(torch, "ao", torch).quantization.quantize_dynamic
+
+    seen = set()
+    quantized = 0
+
+    for name, pipe in nlp.pipeline:
+        model = getattr(pipe, "model", None)
+        if model is None:
+            continue
+
+        for node in model.walk():
+            for shim in node.shims:
+                # Listeners share their upstream shim, so only convert once
+                if not isinstance(shim, PyTorchShim) or id(shim) in seen:
+                    continue
+                seen.add(id(shim))
+
+                shim._model.eval()
+                shim._model = quantize_dynamic(shim._model, {torch.nn.Linear}, dtype=torch.qint8)
+                quantized += 1
+
+    log_info(f"Quantized {quantized} PyTorch model(s) to int8")
+    return nlp
+
+
+def load_quantized_pipeline(name, **options):
+    import spacy
+    return quantize_pipeline(spacy.load(name, **options))
@@ -0,0 +1,191 @@
+###############################################################################
+##  `cascade.py`                                                             ##
+##                                                                           ##
+##  Purpose: Cheapest-first validation tiers (heuristic, coref, LLM)         ##
+###############################################################################
+
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from src.config import env_bool, env_float, env_int
+from src.metrics import counter
+from src.logger import log_info, log_debug
+from src.parser import PRONOUN_LEXICON_PATTERN, get_valid_pronouns, validate_pronouns_with_nlp
+from processing.backends import get_backend
+
+
+# Off keeps original path (coref for every message that passes pre-filter)
+CASCADE_ENABLED = env_bool("BOT_CASCADE", False)
+
+# Per-message budget, in backend cost units (spaCy coref = 1.0, LLM = 5.0
+# per mention) & wall-clock seconds; tier that doesn't fit isn't run.
+# Default covers coref plus 1 LLM prompt
+CASCADE_COST_BUDGET = env_float("BOT_CASCADE_BUDGET", 8.0)
+CASCADE_TIME_BUDGET_SECONDS = env_float("BOT_CASCADE_TIME_BUDGET_SECONDS", 30.0)
+
+# LLM only confirms coref mismatches (skip tier entirely when off)
+CASCADE_LLM_ENABLED = env_bool("BOT_CASCADE_LLM", True)
+
+# Pronoun belongs to closest name before it, if that name is at most this far back
+HEURISTIC_WINDOW_CHARS = env_int("BOT_CASCADE_WINDOW_CHARS", 200)
+HEURISTIC_COST = 0.01
+
+TIERS = ["heuristic", "coref", "llm"]
+
+CASCADE_FINISHED = counter("pronoun_bot_cascade_finished_total", "Messages by deepest tier run", ["tier"])
+CASCADE_ESCALATIONS = counter("pronoun_bot_cascade_escalations_total", "Mentions passed to next tier", ["tier"])
+CASCADE_BUDGET_STOPS = counter("pronoun_bot_cascade_budget_stops_total", "Tiers skipped for lack of budget", ["tier"])
+
+
+@dataclass
+class Budget:
+    cost_limit: float = CASCADE_COST_BUDGET
+    seconds_limit: float = CASCADE_TIME_BUDGET_SECONDS
+    spent: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def allows(self, cost: float) -> bool:
+        return self.spent + cost <= self.cost_limit and self.elapsed() < self.seconds_limit
+
+    def charge(self, cost: float) -> None:
+        self.spent += cost
+
+
+@dataclass
+class CascadeResult:
+    results: List[Dict]
+    # Deepest tier that ran, & tiers skipped for lack of budget
+    tier: str
+    cost: float
+    seconds: float
+    budget_stops: List[str] = field(default_factory=list)
+
+
+def make_result(mention, mismatches=()) -> Dict:
+    return {
+        "name": mention.name,
+        "pronouns": "/".join(mention.pronouns) if mention.pronouns else "None",
+        "pronouns_match": not mismatches,
+        "mismatches": list(mismatches),
+    }
+
+
+def name_positions(content, mentions) -> List[Tuple[int, object]]:
+    # Every place a mentioned person's first / other name appears, in order
+    positions = []
+    for mention in mentions:
+        names = [mention.first_name, *mention.other_names]
+        pattern = r"\b(?:" + "|".join(re.escape(n) for n in names) + r")\b"
+        positions.extend((m.start(), mention) for m in re.finditer(pattern, content))
+    return sorted(positions, key=lambda p: p[0])
+
+
+def nearest_name_before(positions, offset, window=HEURISTIC_WINDOW_CHARS):
+    owner = None
+    for position, mention in positions:
+        if position >= offset:
+            break
+        owner = mention if offset - position <= window else None
+    return owner
+
+
+def heuristic_tier(content, mentions) -> Tuple[Dict[str, Dict], List]:
+    # Proximity rule: pronoun refers to nearest preceding mentioned name.
+    # Mention is cleared if no pronoun that's wrong for them could be theirs;
+    # anything doubtful (wrong pronoun near them, or with no name nearby) escalates
+    settled, ambiguous = {}, []
+    positions = name_positions(content, mentions)
+    occurrences = [
+        (m.group(0).lower(), nearest_name_before(positions, m.start()))
+        for m in PRONOUN_LEXICON_PATTERN.finditer(content)
+    ]
+
+    for mention in mentions:
+        if mention.pronouns == () or mention.any_pronouns:
+            settled[mention.name] = make_result(mention)
+            continue
+
+        valid = get_valid_pronouns(mention)
+        suspicious = [
+            pronoun for pronoun, owner in occurrences
+            if pronoun not in valid and (owner is None or owner == mention)
+        ]
+        if suspicious:
+            ambiguous.append(mention)
+        else:
+            settled[mention.name] = make_result(mention)
+
+    return settled, ambiguous
+
+
+def coref_tier(content, mentions, backend=None) -> Dict[str, Dict]:
+    # Names coref found no cluster for have no pronouns to check, so pass
+    results = {r["name"]: r for r in validate_pronouns_with_nlp(content, mentions, backend=backend)}
+    return {
+        mention.name: make_result(mention, results.get(mention.name, {}).get("mismatches") or ())
+        for mention in mentions
+    }
+
+
+def llm_tier(content, mentions, backend="llm") -> Dict[str, bool]:
+    return get_backend(backend).analyze(content, mentions).verdicts
+
+
+def run_cascade(content, mentions, budget: Optional[Budget] = None, coref_backend=None, llm_backend="llm") -> CascadeResult:
+    budget = budget or Budget()
+    results, stops, tier = {}, [], "heuristic"
+
+    budget.charge(HEURISTIC_COST)
+    settled, pending = heuristic_tier(content, mentions)
+    results.update(settled)
+
+    if pending:
+        coref_cost = get_backend(coref_backend).relative_cost
+        if budget.allows(coref_cost):
+            CASCADE_ESCALATIONS.inc(len(pending), tier="coref")
+            budget.charge(coref_cost)
+            tier = "coref"
+
+            coref_results = coref_tier(content, pending, coref_backend)
+            results.update(coref_results)
+            pending = [m for m in pending if not coref_results[m.name]["pronouns_match"]]
+        else:
+            # Without coref there's no evidence to flag anyone
+            stops.append("coref")
+            results.update({m.name: make_result(m) for m in pending})
+            pending = []
+
+    # Residual: coref mismatches heuristic couldn't clear; LLM can overrule
+    if pending and CASCADE_LLM_ENABLED:
+        llm_cost = get_backend(llm_backend).relative_cost * len(pending)
+        if budget.allows(llm_cost):
+            CASCADE_ESCALATIONS.inc(len(pending), tier="llm")
+            budget.charge(llm_cost)
+            tier = "llm"
+
+            verdicts = llm_tier(content, pending, llm_backend)
+            for mention in pending:
+                if verdicts.get(mention.name) is True:
+                    log_debug(f"LLM overruled coref mismatch for {mention.name}")
+                    results[mention.name] = make_result(mention)
+        else:
+            stops.append("llm") # Coref verdict stands
+
+    for skipped in stops:
+        CASCADE_BUDGET_STOPS.inc(tier=skipped)
+    CASCADE_FINISHED.inc(tier=tier)
+    log_info(f"Cascade finished at '{tier}' tier (cost {budget.spent:.2f}, {budget.elapsed():.3f}s)")
+
+    return CascadeResult(
+        results=[results[m.name] for m in mentions],
+        tier=tier,
+        cost=budget.spent,
+        seconds=budget.elapsed(),
+        budget_stops=stops,
+    )
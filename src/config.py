@@ -0,0 +1,46 @@
+###############################################################################
+##  `config.py`                                                              ##
+##                                                                           ##
+##  Purpose: Reads tunable bot settings from environment (or `.env` file)    ##
+###############################################################################
+
+
+import os
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+TRUTHY_VALUES = {"1", "true", "yes", "on"}
+
+
+def env_str(name: str, default: str = "") -> str:
+    value = os.getenv(name)
+    return value.strip() if value is not None and value.strip() else default
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer (got {value!r})")
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number (got {value!r})")
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in TRUTHY_VALUES
@@ -7,16 +7,45 @@
 
 from src.utils import fetch_latest_messages
 from src.parser import validate_mentions_in_text
-from src.logger import log_validation_results
+from src.history import get_topic_history
+from src.metrics import counter
+from src.logger import log_validation_results, log_debug
 
 
-def check_previous_messages(client, channel_stream_id, topic_subject_id, mentions):
+# Previous messages (incl. one being scanned) read for context
+CONTEXT_MESSAGE_COUNT = 5
+
+CONTEXT_SOURCE = counter("pronoun_bot_context_source_total", "Where context window came from", ["source"])
+
+
+def get_previous_messages(client, channel_stream_id, topic_subject_id, count=CONTEXT_MESSAGE_COUNT):
+    # Topic history (fed by event stream) when warm, otherwise API round trip
+    history = get_topic_history()
+    if history is not None:
+        cached = history.recent(channel_stream_id, topic_subject_id, count)
+        if cached is not None:
+            CONTEXT_SOURCE.inc(source="history")
+            log_debug(f"Context window served from topic history ({len(cached)} message(s))")
+            return cached
+
     previous_msgs = fetch_latest_messages(
         client, 
         channel_stream_id, topic_subject_id, 
-        count=5
+        count=count
     )
+    CONTEXT_SOURCE.inc(source="api")
+
+    if history is not None:
+        history.seed(channel_stream_id, topic_subject_id, previous_msgs)
+    return previous_msgs
+
+
+def check_previous_messages(client, channel_stream_id, topic_subject_id, mentions):
+    previous_msgs = get_previous_messages(client, channel_stream_id, topic_subject_id)
+    return check_context_messages(previous_msgs, mentions)
+
 
+def check_context_messages(previous_msgs, mentions):
     msgs_content = [msg_obj["content"] for msg_obj in previous_msgs]
     full_str = "\n".join(msgs_content)
 
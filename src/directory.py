@@ -0,0 +1,278 @@
+###############################################################################
+##  `directory.py`                                                           ##
+##                                                                           ##
+##  Purpose: Realm members & their pronouns field, indexed by id & name      ##
+###############################################################################
+
+
+import re
+import time
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.config import env_bool, env_float, env_str
+from src.mentions import PRONOUNS_ANY, PRONOUNS_BANK, PAREN_PATTERN
+from src.metrics import counter
+from src.logger import log_info, log_debug, log_warning
+
+
+# Pronouns from members' profile field (loaded once, kept current by events)
+# rather than only what's written in their display name
+USER_DIRECTORY_ENABLED = env_bool("BOT_USER_DIRECTORY", True)
+
+# Custom profile field holding pronouns (otherwise first field of Zulip's
+# pronouns type is used)
+PRONOUNS_FIELD_NAME = env_str("BOT_PRONOUNS_FIELD", "Pronouns")
+PRONOUNS_FIELD_TYPE = 8
+
+# Worker processes don't see `realm_user` events, so they reload this often
+# (on a background thread, never inside a message scan)
+DIRECTORY_REFRESH_SECONDS = env_float("BOT_USER_DIRECTORY_REFRESH_SECONDS", 3600.0)
+
+# Extra event type needed to keep directory current
+DIRECTORY_EVENT_TYPES = ["realm_user"]
+
+MENTIONS_RESOLVED = counter("pronoun_bot_mentions_resolved_total", "Mention lookups in user directory", ["by", "outcome"])
+
+
+@dataclass(frozen=True, slots=True)
+class DirectoryUser:
+    user_id: int
+    full_name: str
+    pronouns: Tuple[str, ...] = ()
+    any_pronouns: bool = False
+
+
+def normalize_name(name: str) -> str:
+    # "Alice  Smith (she/her) (S1'25)" -> "alice smith"
+    return " ".join(PAREN_PATTERN.sub(" ", name).split()).casefold()
+
+
+def parse_pronouns(value: Optional[str]) -> Tuple[Tuple[str, ...], bool]:
+    # Free-text profile value, e.g. "She/Her", "they/them, he/him", "any"
+    words = re.findall(r"[a-z]+", (value or "").lower())
+    known = tuple(dict.fromkeys(w for w in words if w in PRONOUNS_BANK or w in PRONOUNS_ANY))
+    return known, any(w in PRONOUNS_ANY for w in known)
+
+
+class UserDirectory:
+    def __init__(self, field_name: str = PRONOUNS_FIELD_NAME):
+        self.field_name = field_name
+        self.field_id: Optional[int] = None
+
+        self._by_id: Dict[int, DirectoryUser] = {}
+        self._by_name: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+        self.loaded_at = 0.0
+        self._stop_refresh = threading.Event()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def load(self, client) -> int:
+        # 2 API calls for whole realm: field definitions, then every member
+        self.field_id = self._find_field_id(client)
+
+        response = client.get_members({"include_custom_profile_fields": True})
+        if response.get("result") != "success":
+            raise RuntimeError(f"Failed to fetch members: {response.get('msg')}")
+
+        users = [
+            self._user_from_person(person)
+            for person in response["members"]
+            if person.get("is_active", True) and not person.get("is_bot", False)
+        ]
+        with self._lock:
+            self._by_id, self._by_name = {}, {}
+            for user in users:
+                self._index(user)
+            self.loaded_at = time.monotonic()
+
+        log_info(f"User directory loaded {len(users)} member(s)")
+        return len(users)
+
+    def refresh_if_stale(self, client, max_age: float = DIRECTORY_REFRESH_SECONDS) -> None:
+        if time.monotonic() - self.loaded_at < max_age:
+            return
+        try:
+            self.load(client)
+        except RuntimeError as e:
+            log_warning(f"User directory refresh failed: {e}")
+
+    def start_refresh(self, client, interval: float = DIRECTORY_REFRESH_SECONDS) -> threading.Thread:
+        # Periodic reload on own thread, so a full `get_members` call never
+        # holds up whichever message happens to find directory stale
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return self._refresh_thread
+
+        def refresh_loop():
+            while not self._stop_refresh.wait(interval):
+                self.refresh_if_stale(client, interval)
+
+        self._stop_refresh.clear()
+        self._refresh_thread = threading.Thread(target=refresh_loop, name="directory-refresh", daemon=True)
+        self._refresh_thread.start()
+        return self._refresh_thread
+
+    def stop_refresh(self) -> None:
+        self._stop_refresh.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join(timeout=5)
+            self._refresh_thread = None
+
+    def observe_event(self, event) -> None:
+        if event.get("type") != "realm_user":
+            return
+
+        person = event.get("person", {})
+        user_id = person.get("user_id")
+        if user_id is None:
+            return
+
+        with self._lock:
+            match event.get("op"):
+                case "add":
+                    if not person.get("is_bot", False):
+                        self._index(self._user_from_person(person))
+                case "remove":
+                    self._unindex(user_id)
+                case "update":
+                    self._update(user_id, person)
+
+    def get(self, user_id: int) -> Optional[DirectoryUser]:
+        return self._by_id.get(user_id)
+
+    def find(self, name: str) -> Optional[DirectoryUser]:
+        # Only when name is unique (2 "Alice Smith"s tell us nothing)
+        user_ids = self._by_name.get(normalize_name(name), ())
+        if len(user_ids) != 1:
+            return None
+        return self._by_id.get(next(iter(user_ids)))
+
+    def resolve(self, mention):
+        # Pronouns written in name tag win (directory may lag a profile edit);
+        # profile field only fills in mentions without any
+        by = "id" if mention.user_id is not None else "name"
+        user = self.get(mention.user_id) if by == "id" else self.find(mention.name)
+
+        if user is None:
+            MENTIONS_RESOLVED.inc(by=by, outcome="unknown")
+            return mention
+        if mention.pronouns or mention.any_pronouns:
+            MENTIONS_RESOLVED.inc(by=by, outcome="tag_pronouns")
+            return replace(mention, user_id=user.user_id)
+        if not user.pronouns:
+            MENTIONS_RESOLVED.inc(by=by, outcome="no_pronouns")
+            return replace(mention, user_id=user.user_id)
+
+        MENTIONS_RESOLVED.inc(by=by, outcome="resolved")
+        return replace(mention, user_id=user.user_id, pronouns=user.pronouns, any_pronouns=user.any_pronouns)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "members": len(self._by_id),
+            "with_pronouns": sum(1 for user in self._by_id.values() if user.pronouns),
+            "names": len(self._by_name),
+            "ambiguous_names": sum(1 for ids in self._by_name.values() if len(ids) > 1),
+        }
+
+    def _find_field_id(self, client) -> Optional[int]:
+        response = client.call_endpoint(url="realm/profile_fields", method="GET")
+        if response.get("result") != "success":
+            raise RuntimeError(f"Failed to fetch profile fields: {response.get('msg')}")
+
+        fields = response.get("custom_fields", [])
+        for matches in (
+            lambda f: f.get("name", "").casefold() == self.field_name.casefold(),
+            lambda f: f.get("type") == PRONOUNS_FIELD_TYPE,
+        ):
+            for field in fields:
+                if matches(field):
+                    return field["id"]
+
+        log_warning(f"No '{self.field_name}' profile field, pronouns come from display names only")
+        return None
+
+    def _user_from_person(self, person) -> DirectoryUser:
+        profile = person.get("profile_data") or {}
+        value = profile.get(str(self.field_id), {}).get("value") if self.field_id is not None else None
+        pronouns, any_pronouns = parse_pronouns(value)
+        return DirectoryUser(
+            user_id=person["user_id"],
+            full_name=person.get("full_name", ""),
+            pronouns=pronouns,
+            any_pronouns=any_pronouns,
+        )
+
+    def _update(self, user_id: int, person) -> None:
+        # Update events carry only what changed
+        if person.get("is_active") is False:
+            self._unindex(user_id)
+            return
+
+        user = self._by_id.get(user_id)
+        if user is None:
+            return
+
+        if "full_name" in person:
+            user = replace(user, full_name=person["full_name"])
+
+        changed_field = person.get("custom_profile_field")
+        if changed_field and self.field_id is not None and changed_field.get("id") == self.field_id:
+            pronouns, any_pronouns = parse_pronouns(changed_field.get("value"))
+            user = replace(user, pronouns=pronouns, any_pronouns=any_pronouns)
+            log_debug(f"Pronouns updated for user {user_id}")
+
+        self._unindex(user_id)
+        self._index(user)
+
+    def _index(self, user: DirectoryUser) -> None:
+        self._unindex(user.user_id)
+        self._by_id[user.user_id] = user
+        self._by_name.setdefault(normalize_name(user.full_name), set()).add(user.user_id)
+
+    def _unindex(self, user_id: int) -> None:
+        user = self._by_id.pop(user_id, None)
+        if user is None:
+            return
+        key = normalize_name(user.full_name)
+        ids = self._by_name.get(key)
+        if ids is not None:
+            ids.discard(user_id)
+            if not ids:
+                del self._by_name[key]
+
+
+# Set by bot / workers once members are loaded (see `enable_user_directory`)
+_directory: Optional[UserDirectory] = None
+
+
+def enable_user_directory(client, **options) -> UserDirectory:
+    # Startup without directory is fine (display-name pronouns still work);
+    # empty one retries on next `refresh_if_stale`
+    global _directory
+    if _directory is None:
+        _directory = UserDirectory(**options)
+        try:
+            _directory.load(client)
+        except RuntimeError as e:
+            log_warning(f"User directory unavailable: {e}")
+    return _directory
+
+
+def get_user_directory() -> Optional[UserDirectory]:
+    return _directory
+
+
+def disable_user_directory() -> None:
+    global _directory
+    _directory = None
+
+
+def resolve_mentions(mentions) -> List:
+    # No-op unless a directory is loaded in this process
+    if _directory is None:
+        return mentions
+    return list(dict.fromkeys(_directory.resolve(mention) for mention in mentions))
@@ -0,0 +1,63 @@
+###############################################################################
+##  `events.py`                                                              ##
+##                                                                           ##
+##  Purpose: Converts raw Zulip events into message objects for scanning     ##
+###############################################################################
+
+
+from src.metrics import EVENTS_RECEIVED
+
+
+EVENT_TYPES = ["message", "update_message"]
+
+
+def record_event(event):
+    EVENTS_RECEIVED.inc(type=event.get("type", "unknown"))
+
+
+def event_to_msg(event, client):
+    if not event["type"] in EVENT_TYPES:
+        raise ValueError("ERROR: Invalid event type")
+    
+    match event["type"]:
+
+        # Construct message object from new `message` event
+        case "message":
+            msg_obj = event["message"]
+
+            return {
+                "event_type": event.get("type", ""),
+                "message_type": msg_obj.get("type", ""), # `type` == `stream`
+
+                "stream_id": msg_obj.get("stream_id", ""),
+                "subject": msg_obj.get("subject", ""),
+                "id": msg_obj.get("id", ""),
+
+                "sender_id": msg_obj.get("sender_id", ""),
+
+                "sender_email": msg_obj.get("sender_email", ""),
+                "sender_full_name": msg_obj.get("sender_full_name", ""),
+
+                "content": msg_obj.get("content", ""),
+            }
+        
+        # Construct message object from `message_update` event (edited existing message)
+        case "update_message":
+            original_msg = client.get_raw_message(event["message_id"])
+            msg_obj = original_msg["message"]
+
+            return {
+                "event_type": event.get("type", ""),
+                "message_type": msg_obj.get("type", ""), # `type` == `stream`
+
+                "stream_id": msg_obj.get("stream_id", ""),
+                "subject": msg_obj.get("subject", ""),
+                "id": event.get("message_id", ""),
+
+                "sender_id": event.get("user_id", ""),
+
+                "sender_email": msg_obj.get("sender_email", ""),
+                "sender_full_name": msg_obj.get("sender_full_name", ""),
+
+                "content": event.get("content", ""),
+            }
@@ -0,0 +1,233 @@
+###############################################################################
+##  `history.py`                                                             ##
+##                                                                           ##
+##  Purpose: Recent messages per topic (from event stream) for context check ##
+###############################################################################
+
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+from src.config import env_bool, env_int
+from src.logger import log_debug
+
+
+# Serve context window from event stream instead of `get_messages`
+# (only in processes that see every event, i.e. not worker mode)
+HISTORY_ENABLED = env_bool("BOT_TOPIC_HISTORY", True)
+
+# Messages kept per topic (context check reads last 5)
+HISTORY_SIZE = env_int("BOT_TOPIC_HISTORY_SIZE", 20)
+
+# Bounds across all topics (least recently active topic dropped first)
+HISTORY_MAX_TOPICS = env_int("BOT_TOPIC_HISTORY_MAX_TOPICS", 2000)
+HISTORY_MAX_BYTES = env_int("BOT_TOPIC_HISTORY_MAX_MB", 32) * 1024 * 1024
+
+# Extra event type needed to keep history correct
+HISTORY_EVENT_TYPES = ["delete_message"]
+
+
+TopicKey = Tuple[int, str]
+
+
+def topic_key(stream_id, topic) -> TopicKey:
+    # Zulip topic names are case-insensitive
+    return (int(stream_id), str(topic).lower())
+
+
+def compact_message(message) -> Dict:
+    # Only what context check (& its callers) read
+    return {
+        "id": message["id"],
+        "sender_id": message.get("sender_id"),
+        "sender_full_name": message.get("sender_full_name", ""),
+        "content": message.get("content", ""),
+    }
+
+
+class TopicBuffer:
+    def __init__(self, size: int):
+        self.messages = deque(maxlen=size)
+        # Seeded from API, so holds everything up to now (not just what we saw)
+        self.complete = False
+
+    def nbytes(self) -> int:
+        return sum(len(m["content"]) for m in self.messages)
+
+
+class TopicHistory:
+    def __init__(
+        self,
+        size: int = HISTORY_SIZE,
+        max_topics: int = HISTORY_MAX_TOPICS,
+        max_bytes: int = HISTORY_MAX_BYTES,
+    ):
+        self.size = size
+        self.max_topics = max_topics
+        self.max_bytes = max_bytes
+
+        self._topics: "OrderedDict[TopicKey, TopicBuffer]" = OrderedDict()
+        self._where: Dict[int, TopicKey] = {} # message id -> topic
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def observe_event(self, event) -> None:
+        match event.get("type"):
+            case "message":
+                self.add(event["message"])
+            case "update_message":
+                self.update(event)
+            case "delete_message":
+                message_ids = event.get("message_ids") or [event.get("message_id")]
+                self.delete([i for i in message_ids if i is not None])
+
+    def add(self, message) -> None:
+        if message.get("type") != "stream":
+            return
+
+        with self._lock:
+            key = topic_key(message["stream_id"], message["subject"])
+            buffer = self._buffer(key)
+            self._append(key, buffer, compact_message(message))
+            self._enforce_bounds()
+
+    def update(self, event) -> None:
+        message_ids = event.get("message_ids") or [event.get("message_id")]
+
+        with self._lock:
+            # Edited content (raw markdown, like `apply_markdown=False` fetch)
+            if "content" in event and event.get("message_id") in self._where:
+                key = self._where[event["message_id"]]
+                for message in self._topics[key].messages:
+                    if message["id"] == event["message_id"]:
+                        self._bytes += len(event["content"]) - len(message["content"])
+                        message["content"] = event["content"]
+
+            # Moved to another topic / stream: gone from old one, & new one's
+            # order is unknown, so it goes cold until refetched
+            moved_topic = "subject" in event and "orig_subject" in event
+            moved_stream = "new_stream_id" in event
+            if moved_topic or moved_stream:
+                self._remove(message_ids)
+                new_key = topic_key(
+                    event.get("new_stream_id", event.get("stream_id", 0)),
+                    event.get("subject", event.get("orig_subject", "")),
+                )
+                self._drop_topic(new_key)
+
+    def delete(self, message_ids) -> None:
+        with self._lock:
+            self._remove(message_ids)
+
+    def recent(self, stream_id, topic, count: int) -> Optional[List[Dict]]:
+        # Last `count` messages, or None if we can't vouch for them (cold topic)
+        with self._lock:
+            key = topic_key(stream_id, topic)
+            buffer = self._topics.get(key)
+
+            if buffer is None or not (buffer.complete or len(buffer.messages) >= count):
+                self.misses += 1
+                return None
+
+            self._topics.move_to_end(key)
+            self.hits += 1
+            return [dict(m) for m in list(buffer.messages)[-count:]]
+
+    def seed(self, stream_id, topic, messages) -> None:
+        # Merge API fetch with anything seen meanwhile (ids are chronological)
+        with self._lock:
+            key = topic_key(stream_id, topic)
+            buffer = self._buffer(key)
+
+            known = {m["id"] for m in buffer.messages}
+            merged = list(buffer.messages) + [compact_message(m) for m in messages if m["id"] not in known]
+            merged.sort(key=lambda m: m["id"])
+
+            self._remove([m["id"] for m in buffer.messages])
+            buffer = self._buffer(key)
+            for message in merged:
+                self._append(key, buffer, message)
+            buffer.complete = True
+            self._enforce_bounds()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "topics": len(self._topics),
+            "messages": len(self._where),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _buffer(self, key: TopicKey) -> TopicBuffer:
+        buffer = self._topics.get(key)
+        if buffer is None:
+            buffer = self._topics[key] = TopicBuffer(self.size)
+        self._topics.move_to_end(key)
+        return buffer
+
+    def _append(self, key: TopicKey, buffer: TopicBuffer, message: Dict) -> None:
+        if message["id"] in self._where:
+            return
+        if len(buffer.messages) == buffer.messages.maxlen:
+            evicted = buffer.messages[0]
+            self._where.pop(evicted["id"], None)
+            self._bytes -= len(evicted["content"])
+
+        buffer.messages.append(message)
+        self._where[message["id"]] = key
+        self._bytes += len(message["content"])
+
+    def _remove(self, message_ids) -> None:
+        for message_id in message_ids:
+            key = self._where.pop(message_id, None)
+            if key is None:
+                continue
+            buffer = self._topics[key]
+            for message in list(buffer.messages):
+                if message["id"] == message_id:
+                    buffer.messages.remove(message)
+                    self._bytes -= len(message["content"])
+
+    def _drop_topic(self, key: TopicKey) -> None:
+        buffer = self._topics.pop(key, None)
+        if buffer is None:
+            return
+        for message in buffer.messages:
+            self._where.pop(message["id"], None)
+            self._bytes -= len(message["content"])
+
+    def _enforce_bounds(self) -> None:
+        while self._topics and (len(self._topics) > self.max_topics or self._bytes > self.max_bytes):
+            key = next(iter(self._topics))
+            log_debug(f"Topic history full, dropping {key}")
+            self._drop_topic(key)
+
+
+# Set by bot when this process sees every event (see `enable_topic_history`)
+_history: Optional[TopicHistory] = None
+
+
+def enable_topic_history(**options) -> TopicHistory:
+    global _history
+    if _history is None:
+        _history = TopicHistory(**options)
+    return _history
+
+
+def get_topic_history() -> Optional[TopicHistory]:
+    return _history
+
+
+def disable_topic_history() -> None:
+    global _history
+    _history = None
@@ -0,0 +1,242 @@
+###############################################################################
+##  `listener.py`                                                            ##
+##                                                                           ##
+##  Purpose: Asyncio event listener (long-poll + concurrent API calls)       ##
+###############################################################################
+
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from src.config import env_int, env_str
+from src.events import EVENT_TYPES, event_to_msg, record_event
+from src.metrics import QUEUE_DEPTH, MESSAGES_SCANNED, STAGE_SECONDS
+from src.reader import (
+    contents_are_valid, start_message_scan, end_message_scan,
+    find_mismatches, get_context_messages, reconcile_with_context, notify_mismatch,
+)
+from src.logger import log_info, log_error, log_warning, bind_message_id
+
+
+# "sync" keeps `call_on_each_event`, "async" uses `AsyncEventListener`
+LISTENER_MODE = env_str("BOT_LISTENER", "sync")
+
+# Zulip API calls (other than long-poll) allowed in flight at once
+MAX_CONCURRENT_REQUESTS = env_int("BOT_MAX_CONCURRENT_REQUESTS", 8)
+
+# Threads running CPU stages of a scan (mention parsing, coref); API calls
+# a scan needs (context fetch, DMs) go through bounded I/O pool instead
+SCAN_THREADS = env_int("BOT_SCAN_THREADS", 4)
+
+# Threads handing raw events to `forward` (may block, e.g. full worker queue)
+FORWARD_THREADS = env_int("BOT_FORWARD_THREADS", 2)
+
+# Events being handled at once; beyond this, long-poll waits (backpressure)
+MAX_PENDING_EVENTS = env_int("BOT_MAX_PENDING_EVENTS", 64)
+
+# Pause between failed long-polls (doubles each failure, up to max)
+RETRY_SECONDS = 1.0
+MAX_RETRY_SECONDS = 30.0
+
+
+class AsyncEventListener:
+    def __init__(
+        self,
+        client,
+        scan: Optional[Callable[[Dict[str, Any], Any], None]] = None,
+        forward: Optional[Callable[[Dict[str, Any]], None]] = None,
+        event_types=EVENT_TYPES,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        scan_threads: int = SCAN_THREADS,
+        forward_threads: int = FORWARD_THREADS,
+        max_pending: int = MAX_PENDING_EVENTS,
+        history=None,
+        directory=None,
+    ):
+        # `forward` hands raw event elsewhere (e.g. worker pool), `scan` runs a
+        # whole blocking scan on scan pool; with neither, events are scanned
+        # in stages (CPU on scan pool, API calls awaited via `call_api`)
+        self.client = client
+        self.scan = scan
+        self.forward = forward
+        self.event_types = list(event_types)
+        # Topic history sees every event in arrival order (incl. deletes),
+        # user directory sees `realm_user` changes
+        self.history = history
+        self.directory = directory
+
+        self.max_concurrency = max_concurrency
+        # One extra thread so long-poll never waits behind other API calls
+        self._io_executor = ThreadPoolExecutor(max_workers=max_concurrency + 1, thread_name_prefix="zulip-io")
+        self._scan_executor = ThreadPoolExecutor(max_workers=scan_threads, thread_name_prefix="scan")
+        # Own pool, so blocked forwards can't starve long-poll of I/O threads
+        self._forward_executor = (
+            ThreadPoolExecutor(max_workers=forward_threads, thread_name_prefix="forward")
+            if forward is not None else None
+        )
+        self._api_slots: Optional[asyncio.Semaphore] = None
+        self.max_pending = max_pending
+        self._event_slots: Optional[asyncio.Semaphore] = None
+
+        self.queue_id = None
+        self.last_event_id = -1
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+        self.events_received = 0
+        self.events_failed = 0
+
+    async def _run_in(self, executor, fn, *args, **kwargs):
+        # Copy context, so logs from executor threads keep bound message id
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(executor, lambda: context.run(fn, *args, **kwargs))
+
+    async def _run_io(self, fn, *args, **kwargs):
+        return await self._run_in(self._io_executor, fn, *args, **kwargs)
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        # CPU-bound stage (coref) on scan pool
+        return await self._run_in(self._scan_executor, fn, *args, **kwargs)
+
+    async def call_api(self, fn, *args, **kwargs):
+        # Blocking Zulip call on I/O pool, bounded by concurrency limit
+        async with self._api_slots:
+            return await self._run_io(fn, *args, **kwargs)
+
+    async def register(self) -> None:
+        retry = RETRY_SECONDS
+        while not self._stopping:
+            response = await self.call_api(self.client.register, event_types=self.event_types)
+            if response.get("result") == "success":
+                self.queue_id = response["queue_id"]
+                self.last_event_id = response["last_event_id"]
+                log_info(f"Registered event queue {self.queue_id}")
+                return
+
+            log_error(f"Failed to register event queue: {response.get('msg')}")
+            await asyncio.sleep(retry)
+            retry = min(retry * 2, MAX_RETRY_SECONDS)
+
+    async def poll_once(self) -> bool:
+        # One long-poll; returns False on error so caller can back off
+        try:
+            response = await self._run_io(
+                self.client.get_events,
+                queue_id=self.queue_id,
+                last_event_id=self.last_event_id,
+            )
+        except Exception as e:
+            log_warning(f"Error fetching events: {e}")
+            return False
+
+        if response.get("result") != "success":
+            if response.get("code") == "BAD_EVENT_QUEUE_ID":
+                # Queue expired (e.g. server restart), so start a new one
+                log_warning("Event queue expired, re-registering")
+                self.queue_id = None
+            else:
+                log_warning(f"Error fetching events: {response.get('msg')}")
+            return False
+
+        for event in response.get("events", []):
+            self.last_event_id = max(self.last_event_id, int(event["id"]))
+            if event["type"] == "heartbeat":
+                continue
+            await self.dispatch(event)
+        return True
+
+    async def dispatch(self, event) -> Optional[asyncio.Task]:
+        # Each event handled in own task, so slow ones don't hold up the next;
+        # waits for a free slot once `max_pending` events are in flight
+        self.events_received += 1
+        record_event(event)
+
+        if self.history is not None:
+            self.history.observe_event(event)
+        if self.directory is not None:
+            self.directory.observe_event(event)
+        if event["type"] not in EVENT_TYPES:
+            return None # e.g. `delete_message` / `realm_user`, only observed
+
+        await self._event_slots.acquire()
+        task = asyncio.create_task(self.handle_event(event))
+        self._tasks.add(task)
+        task.add_done_callback(self._event_done)
+        return task
+
+    def _event_done(self, task) -> None:
+        self._tasks.discard(task)
+        self._event_slots.release()
+
+    async def handle_event(self, event) -> None:
+        try:
+            if self.forward is not None:
+                await self._run_in(self._forward_executor, self.forward, event)
+                return
+
+            # Edits need `get_raw_message`, so conversion counts as an API call
+            message = await self.call_api(event_to_msg, event, self.client)
+
+            if self.scan is not None:
+                await self.run_cpu(self.scan, message, self.client)
+            else:
+                await self.scan_message(message)
+        except Exception as e:
+            self.events_failed += 1
+            log_error(f"Failed to handle event {event.get('id')}: {e}")
+
+    async def scan_message(self, message) -> None:
+        # Same stages as `scan_for_mentions`, but scan threads only ever run
+        # coref; context fetch & DMs wait on I/O pool without holding one
+        if not contents_are_valid(message):
+            return
+
+        MESSAGES_SCANNED.inc()
+        with bind_message_id(message["id"]), STAGE_SECONDS.time(stage="total"):
+            start_message_scan()
+
+            mentions, mismatches = await self.run_cpu(find_mismatches, message)
+            if mismatches:
+                previous_msgs = await self.call_api(get_context_messages, self.client, message)
+                reconciled = await self.run_cpu(reconcile_with_context, mentions, mismatches, previous_msgs)
+                await asyncio.gather(*(
+                    self.call_api(notify_mismatch, message, r, self.client) for r in reconciled
+                ))
+
+            end_message_scan()
+
+    async def run(self) -> None:
+        self._api_slots = asyncio.Semaphore(self.max_concurrency)
+        self._event_slots = asyncio.Semaphore(self.max_pending)
+        QUEUE_DEPTH.set_function(self.pending, queue="listener")
+        retry = RETRY_SECONDS
+        try:
+            while not self._stopping:
+                if self.queue_id is None:
+                    await self.register()
+
+                if await self.poll_once():
+                    retry = RETRY_SECONDS
+                else:
+                    await asyncio.sleep(retry)
+                    retry = min(retry * 2, MAX_RETRY_SECONDS)
+        finally:
+            await self.drain()
+
+    async def drain(self) -> None:
+        # Let in-flight events finish before executors go away
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._scan_executor.shutdown(wait=True)
+        if self._forward_executor is not None:
+            self._forward_executor.shutdown(wait=True)
+        self._io_executor.shutdown(wait=False)
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def pending(self) -> int:
+        return len(self._tasks)
@@ -6,20 +6,214 @@
 
 
 import sys
+import json
+import time
+import queue
+import atexit
+import threading
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+from src.config import env_bool, env_int, env_str
 
 
 # Consistent separator length for all dividers
 SEPARATOR_LENGTH = 80
 
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARN": 30, "ERROR": 40}
+
+# Records below this level are dropped before any formatting happens
+LOG_LEVEL = env_str("BOT_LOG_LEVEL", "DEBUG").upper()
+
+# `text` (timestamped lines, as journald has always seen) or `json` (1 record / line)
+LOG_FORMAT = env_str("BOT_LOG_FORMAT", "text").lower()
+
+# Hand records to a background writer, so scans never wait on stdout / journald
+LOG_ASYNC = env_bool("BOT_LOG_ASYNC", False)
+LOG_QUEUE_SIZE = env_int("BOT_LOG_QUEUE_SIZE", 10000)
+
+# Turn off once an on-disk sink (`logsink.py`) replaces journald
+LOG_STDOUT = env_bool("BOT_LOG_STDOUT", True)
+
+
+# Zulip message id being scanned in this thread / task (correlates records)
+_message_id = contextvars.ContextVar("message_id", default=None)
+
+_min_level = LEVELS.get(LOG_LEVEL, LEVELS["DEBUG"])
+_json_output = LOG_FORMAT == "json"
+_writer = None
+_sinks = []
+
+
+def set_log_level(level: str) -> None:
+    global _min_level
+    level = level.upper()
+    if level not in LEVELS:
+        raise ValueError(f"Unknown log level {level!r} (choose from {', '.join(LEVELS)})")
+    _min_level = LEVELS[level]
+
+
+def set_log_format(fmt: str) -> None:
+    global _json_output
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown log format {fmt!r} (choose from text, json)")
+    _json_output = fmt == "json"
+
+
+def is_enabled(level: str) -> bool:
+    return LEVELS[level] >= _min_level
+
+
+def debug_enabled() -> bool:
+    # Guard for callers that would otherwise build big debug strings
+    return is_enabled("DEBUG")
+
+
+def add_sink(sink) -> None:
+    # Sink gets every leveled record via `write(record)`, & `flush()` on shutdown
+    _sinks.append(sink)
+
+
+def remove_sink(sink) -> None:
+    if sink in _sinks:
+        _sinks.remove(sink)
+    sink.flush()
+
+
+@contextmanager
+def bind_message_id(message_id):
+    # Every record logged inside block carries this message id
+    token = _message_id.set(message_id)
+    try:
+        yield
+    finally:
+        _message_id.reset(token)
+
+
+def format_record(record) -> Optional[str]:
+    # record = (unix time, level or None for layout lines, text, message id)
+    created, level, text, message_id = record
+
+    if _json_output:
+        # Layout lines (separators, blanks) carry no information in JSON
+        if level is None:
+            return None
+        entry = {
+            "ts": datetime.fromtimestamp(created).isoformat(timespec="milliseconds"),
+            "level": level,
+            "msg": text,
+        }
+        if message_id is not None:
+            entry["message_id"] = message_id
+        return json.dumps(entry, ensure_ascii=False)
+
+    if level is None:
+        return text
+
+    timestamp = datetime.fromtimestamp(created).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    # Add padding before brackets to align consistently (DEBUG is 5 chars)
+    return f"[{timestamp}] [{level}] {text}" if len(level) == 5 else f"[{timestamp}]  [{level}] {text}"
+
+
+class LogWriter:
+    # Background thread draining queued records to stdout in batches
+    def __init__(self, max_queue: int = LOG_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def put(self, record) -> None:
+        # Never blocks: if writer falls behind, newest records are dropped
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _write(self, records) -> None:
+        for sink in _sinks:
+            for record in records:
+                sink.write(record)
+
+        if not LOG_STDOUT:
+            return
+        lines = [line for line in map(format_record, records) if line is not None]
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            # Take everything already queued, so 1 write + flush covers it
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            done = batch[-1] is None
+            self._write([r for r in batch if r is not None])
+            if done:
+                return
+
+
+def start_async_logging(max_queue: int = LOG_QUEUE_SIZE) -> LogWriter:
+    global _writer
+    if _writer is None:
+        _writer = LogWriter(max_queue)
+        _writer.start()
+        atexit.register(stop_async_logging)
+    return _writer
+
+
+def stop_async_logging() -> None:
+    # Flushes everything queued so far
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+        if writer.dropped:
+            print(format_record((time.time(), "WARN", f"Log writer dropped {writer.dropped} record(s)", None)), flush=True)
+
+
+def shutdown_logging() -> None:
+    # Drain writer, then push any partial blocks out of sinks (worker
+    # processes exit without running `atexit`, so they call this directly)
+    stop_async_logging()
+    for sink in list(_sinks):
+        sink.flush()
+
+
+def _emit(level: Optional[str], text: str, flush: bool) -> None:
+    record = (time.time(), level, text, _message_id.get())
+    if _writer is not None:
+        _writer.put(record)
+        return
+
+    for sink in _sinks:
+        sink.write(record)
+
+    if not LOG_STDOUT:
+        return
+    line = format_record(record)
+    if line is not None:
+        print(line, flush=flush)
+
 
 def log_with_timestamp(message: str, level: str = "INFO", flush: bool = True) -> None:
     # Log a message with timestamp & level
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-    # Add padding before brackets to align consistently (DEBUG is 5 chars)
-    formatted_message = f"[{timestamp}] [{level}] {message}" if len(level) == 5 else f"[{timestamp}]  [{level}] {message}"
-    print(formatted_message, flush=flush)
+    if LEVELS.get(level, LEVELS["INFO"]) < _min_level:
+        return
+    _emit(level, message, flush)
 
 
 def log_info(message: str, flush: bool = True) -> None:
@@ -49,21 +243,27 @@ def log_separator(title: str = None, flush: bool = True) -> None:
         title_line = f" {title} "
         padding = (SEPARATOR_LENGTH - len(title_line)) // 2
         separator = "=" * padding + title_line + "=" * (SEPARATOR_LENGTH - padding - len(title_line))
-    print(separator, flush=flush)
+    _emit(None, separator, flush)
 
 
 def log_section_start(title: str, flush: bool = True) -> None:
     # Log start of a processing section
-    print("=" * SEPARATOR_LENGTH, flush=flush)
+    if _json_output:
+        log_info(f"START: {title}", flush)
+        return
+    _emit(None, "=" * SEPARATOR_LENGTH, flush)
     log_separator(f"START: {title}", flush)
-    print("=" * SEPARATOR_LENGTH, flush=flush)
+    _emit(None, "=" * SEPARATOR_LENGTH, flush)
 
 
 def log_section_end(title: str, flush: bool = True) -> None:
     # Log end of a processing section
-    print("=" * SEPARATOR_LENGTH, flush=flush)
+    if _json_output:
+        log_info(f"END: {title}", flush)
+        return
+    _emit(None, "=" * SEPARATOR_LENGTH, flush)
     log_separator(f"END: {title}", flush)
-    print("=" * SEPARATOR_LENGTH, flush=flush)
+    _emit(None, "=" * SEPARATOR_LENGTH, flush)
 
 
 def log_mention_info(mention, flush: bool = True) -> None:
@@ -89,37 +289,41 @@ def log_cluster_mapping(mappings: Dict[str, List[str]], flush: bool = True) -> N
 
 
 def log_nlp_clusters(clusters: List[List[str]], flush: bool = True) -> None:
-    # Log NLP clusters in a clean format
-    log_info("Detected Coreference Clusters:", flush)
+    # Log NLP clusters in a clean format (whole clusters, so debug only)
+    if not debug_enabled():
+        return
+    log_debug("Detected Coreference Clusters:", flush)
     for i, cluster in enumerate(clusters, 1):
         cluster_str = " -> ".join(cluster)
-        log_info(f"  Cluster {i}: {cluster_str}", flush)
+        log_debug(f"  Cluster {i}: {cluster_str}", flush)
 
 
 def log_original_text(text: str, flush: bool = True) -> None:
-    # Log original text input
+    # Log original text input (text itself is debug only)
     log_section_start("PROCESSING TEXT INPUT")
-    # Truncate very long text for readability
-    display_text = text[:500] + "..." if len(text) > 500 else text
-    log_info(f"Text: {display_text}", flush)
-    log_divider("-", flush)
+    if debug_enabled():
+        # Truncate very long text for readability
+        display_text = text[:500] + "..." if len(text) > 500 else text
+        log_debug(f"Text: {display_text}", flush)
+        log_divider("-", flush)
     log_info(f"Length: {len(text)} characters", flush)
 
 
 def log_blank_line(flush: bool = True) -> None:
     # Log a blank line for spacing
-    print("", flush=flush)
+    _emit(None, "", flush)
 
 
 def log_divider(char: str = "-", flush: bool = True) -> None:
     # Log a divider line (matches separator length)
-    print(char * SEPARATOR_LENGTH, flush=flush)
+    _emit(None, char * SEPARATOR_LENGTH, flush)
 
 
 def force_flush() -> None:
-    # Force flush stdout & stderr buffers
+    # Force flush stdout & stderr buffers (background writer flushes itself)
+    if _writer is not None:
+        return
     sys.stdout.flush()
     sys.stderr.flush()
 
 
-    
\ No newline at end of file
@@ -0,0 +1,302 @@
+###############################################################################
+##  `logsink.py`                                                             ##
+##                                                                           ##
+##  Purpose: Compressed, rotated, indexed on-disk log segments (+ reader)    ##
+###############################################################################
+
+
+import os
+import sys
+import json
+import gzip
+import atexit
+import time
+import heapq
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import click
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.config import env_float, env_int, env_str
+from src.logger import add_sink, remove_sink
+
+
+# Unset keeps logs on stdout only (journald)
+LOG_DIR = env_str("BOT_LOG_DIR", "")
+
+# Segment rolls over at whichever limit comes first
+SEGMENT_MAX_BYTES = env_int("BOT_LOG_SEGMENT_MB", 16) * 1024 * 1024
+SEGMENT_MAX_SECONDS = env_float("BOT_LOG_SEGMENT_HOURS", 24.0) * 3600
+
+# Records are compressed in blocks (1 gzip member each) of about this size,
+# or sooner if block has been open this long
+BLOCK_MAX_BYTES = env_int("BOT_LOG_BLOCK_KB", 64) * 1024
+BLOCK_MAX_SECONDS = env_float("BOT_LOG_FLUSH_SECONDS", 5.0)
+
+# Segments older than this are deleted on rotation (as nightly job did)
+RETENTION_DAYS = env_float("BOT_LOG_RETENTION_DAYS", 180.0)
+
+SEGMENT_PREFIX = "pronoun-proofer"
+SEGMENT_SUFFIX = ".log.gz"
+INDEX_SUFFIX = ".idx"
+
+
+@dataclass(frozen=True)
+class BlockIndex:
+    # Location of 1 gzip member in segment, & what's inside it
+    offset: int
+    length: int
+    start: float
+    end: float
+    count: int
+    message_ids: tuple = ()
+
+    def overlaps(self, since: Optional[float], until: Optional[float]) -> bool:
+        return (since is None or self.end >= since) and (until is None or self.start <= until)
+
+
+def index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name + INDEX_SUFFIX)
+
+
+class SegmentSink:
+    # Receives logger records `(unix time, level, text, message id)`
+    def __init__(
+        self,
+        directory: str = LOG_DIR,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        segment_max_seconds: float = SEGMENT_MAX_SECONDS,
+        block_max_bytes: int = BLOCK_MAX_BYTES,
+        block_max_seconds: float = BLOCK_MAX_SECONDS,
+        retention_days: float = RETENTION_DAYS,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_seconds = segment_max_seconds
+        self.block_max_bytes = block_max_bytes
+        self.block_max_seconds = block_max_seconds
+        self.retention_days = retention_days
+
+        self._lock = threading.Lock()
+        self._segment: Optional[Path] = None
+        self._segment_opened = 0.0
+        self._segment_bytes = 0
+
+        self._lines: List[bytes] = []
+        self._block_bytes = 0
+        self._block_start = 0.0
+        self._block_end = 0.0
+        self._block_ids = set()
+        self._block_opened = 0.0
+        # Flushes an open block once it's `block_max_seconds` old, even if
+        # no further record arrives (quiet bot)
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, record) -> None:
+        created, level, text, message_id = record
+        if level is None:
+            return # Layout lines (separators, blanks) aren't worth keeping
+
+        entry = {"ts": created, "level": level, "msg": text}
+        if message_id is not None:
+            entry["message_id"] = message_id
+        line = json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+
+        with self._lock:
+            if not self._lines:
+                self._block_start = created
+                self._block_opened = time.monotonic()
+                if self._timer is None:
+                    self._schedule_flush(self.block_max_seconds)
+
+            self._lines.append(line)
+            self._block_bytes += len(line)
+            self._block_end = max(self._block_end, created)
+            if message_id is not None:
+                self._block_ids.add(message_id)
+
+            if (self._block_bytes >= self.block_max_bytes
+                    or time.monotonic() - self._block_opened >= self.block_max_seconds):
+                self._flush_block()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_block()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+
+    def _schedule_flush(self, delay: float) -> None:
+        timer = threading.Timer(delay, self._flush_if_due)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _flush_if_due(self) -> None:
+        with self._lock:
+            self._timer = None
+            if not self._lines:
+                return
+
+            # Block flushed by size since timer was set may have reopened
+            age = time.monotonic() - self._block_opened
+            if age >= self.block_max_seconds:
+                self._flush_block()
+            else:
+                self._schedule_flush(self.block_max_seconds - age)
+
+    def _flush_block(self) -> None:
+        if not self._lines:
+            return
+
+        if self._segment is None or self._segment_due():
+            self._rotate()
+
+        member = gzip.compress(b"".join(self._lines))
+        entry = BlockIndex(
+            offset=self._segment_bytes,
+            length=len(member),
+            start=self._block_start,
+            end=self._block_end,
+            count=len(self._lines),
+            message_ids=tuple(sorted(self._block_ids, key=str)),
+        )
+
+        # Member first, then index line, so index never points past data
+        with open(self._segment, "ab") as f:
+            f.write(member)
+        with open(index_path(self._segment), "a") as f:
+            f.write(json.dumps(entry.__dict__) + "\n")
+
+        self._segment_bytes += len(member)
+        self._lines, self._block_bytes, self._block_ids = [], 0, set()
+        self._block_end = 0.0
+
+    def _segment_due(self) -> bool:
+        return (self._segment_bytes >= self.segment_max_bytes
+                or time.time() - self._segment_opened >= self.segment_max_seconds)
+
+    def _rotate(self) -> None:
+        # New segment per rotation & process (workers each write their own)
+        now = time.time()
+        stamp = datetime.fromtimestamp(now).strftime("%Y%m%d-%H%M%S")
+        name = f"{SEGMENT_PREFIX}-{stamp}-{os.getpid()}"
+
+        segment = self.directory / f"{name}{SEGMENT_SUFFIX}"
+        suffix = 1
+        while segment.exists():
+            segment = self.directory / f"{name}.{suffix}{SEGMENT_SUFFIX}"
+            suffix += 1
+
+        self._segment, self._segment_opened, self._segment_bytes = segment, now, 0
+        self._delete_expired(now)
+
+    def _delete_expired(self, now: float) -> None:
+        cutoff = now - self.retention_days * 86400
+        for segment in list_segments(self.directory):
+            if segment != self._segment and segment.stat().st_mtime < cutoff:
+                segment.unlink(missing_ok=True)
+                index_path(segment).unlink(missing_ok=True)
+
+
+def start_log_sink(directory: str = LOG_DIR) -> SegmentSink:
+    # Every record this process logs also goes to compressed segments
+    sink = SegmentSink(directory)
+    add_sink(sink)
+    atexit.register(remove_sink, sink)
+    return sink
+
+
+def list_segments(directory) -> List[Path]:
+    return sorted(Path(directory).glob(f"{SEGMENT_PREFIX}-*{SEGMENT_SUFFIX}"))
+
+
+def read_index(segment: Path) -> List[BlockIndex]:
+    path = index_path(segment)
+    if not path.exists():
+        return []
+
+    blocks = []
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Partially written last line (crash mid-append)
+            entry["message_ids"] = tuple(entry.get("message_ids", ()))
+            blocks.append(BlockIndex(**entry))
+    return blocks
+
+
+def read_block(segment: Path, block: BlockIndex) -> List[dict]:
+    # Decompresses just this member
+    with open(segment, "rb") as f:
+        f.seek(block.offset)
+        data = gzip.decompress(f.read(block.length))
+    return [json.loads(line) for line in data.splitlines() if line]
+
+
+def query_segment(segment: Path, since=None, until=None, message_id=None) -> Iterator[dict]:
+    for block in read_index(segment):
+        if not block.overlaps(since, until):
+            continue
+        if message_id is not None and str(message_id) not in map(str, block.message_ids):
+            continue
+
+        for record in read_block(segment, block):
+            if since is not None and record["ts"] < since:
+                continue
+            if until is not None and record["ts"] > until:
+                continue
+            if message_id is not None and str(record.get("message_id")) != str(message_id):
+                continue
+            yield record
+
+
+def query_logs(directory, since=None, until=None, message_id=None) -> Iterator[dict]:
+    # Records from every segment (e.g. one per worker), merged by time
+    streams = [
+        query_segment(segment, since, until, message_id)
+        for segment in list_segments(directory)
+    ]
+    return heapq.merge(*streams, key=lambda record: record["ts"])
+
+
+def format_text(record) -> str:
+    timestamp = datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+    level = record["level"]
+    padding = " " if len(level) == 5 else "  "
+    message_id = f" [msg {record['message_id']}]" if "message_id" in record else ""
+    return f"[{timestamp}]{padding}[{level}]{message_id} {record['msg']}"
+
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+@click.command()
+@click.option("--dir", "directory", default=LOG_DIR, required=not LOG_DIR, help="Segment directory (default BOT_LOG_DIR)")
+@click.option("--since", help="Start time, e.g. 2025-06-01 or '2025-06-01 14:30'")
+@click.option("--until", help="End time (same format)")
+@click.option("--message-id", help="Only records logged while scanning this Zulip message")
+@click.option("--json-output", is_flag=True, help="Print stored JSON records instead of text lines")
+def main(directory, since, until, message_id, json_output):
+    for record in query_logs(directory, parse_time(since), parse_time(until), message_id):
+        click.echo(json.dumps(record, ensure_ascii=False) if json_output else format_text(record))
+
+
+if __name__ == "__main__":
+    # From top-level directory:
+    #   `python src/logsink.py --since "2025-06-01 09:00" --until "2025-06-01 10:00"`
+    #   `python src/logsink.py --message-id 4512345`
+    main()
@@ -7,16 +7,31 @@
 
 import re
 from dataclasses import dataclass, field
-from typing import Tuple
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+from src.config import env_int
 
 
 # @**First Last (pronoun/pronoun) (batch'year)**
 # e.g. @**Adrien Lynch (he/they) (S2'25)**
+# (reference only: `scan_mentions` finds same tags, minus junk from stray `@**`)
 MENTION_PATTERN = re.compile(
     r"@"
     r"\*\*(?P<content>.*?)\*\*"
 )
 
+# Also `@_**Name**` (silent) & `@**Name|user id**` (disambiguated) forms
+MENTION_OPEN = "@**"
+SILENT_MENTION_OPEN = "@_**"
+MENTION_CLOSE = "**"
+
+# Same few hundred people are mentioned all day, so parsed tags are reused
+MENTION_INTERN_SIZE = env_int("BOT_MENTION_INTERN_SIZE", 4096)
+
+# Inside of a tag (name, pronouns, batch); anything longer isn't a mention
+MENTION_MAX_CHARS = 200
+
 PAREN_PATTERN = re.compile(r"\(([^)]+)\)")
 
 
@@ -40,7 +55,8 @@ PRONOUNS_ANY = {
 
 # Frozen dataclass since fields are immutable
 # Note: without specifying `frozen=True`, unhashable type error
-@dataclass(frozen=True)
+# (slots: interned tags live for whole process, so keep them small)
+@dataclass(frozen=True, slots=True)
 class NameTag:
     full_match: str
 
@@ -54,12 +70,28 @@ class NameTag:
     
     batch_info: Tuple[str, ...] = field(default_factory=tuple)
 
+    # From `|id` suffix (or user directory), & whether mention was silent
+    user_id: Optional[int] = None
+    silent: bool = False
+
+    @property
+    def mention_id(self) -> str:
+        # Stable key for this person within a message (coref mappings use it,
+        # so 2 mentions sharing a first name never collide)
+        if self.user_id is not None:
+            return f"{self.name_identifier}#{self.user_id}"
+        return self.name_identifier
+
 
     @classmethod
     def from_match(cls, match: re.Match) -> "NameTag":
         # Parse full_match @**mention** match into a NameTag instance
-        full_match = match.group(0)
-        content = match.group("content").strip()
+        return cls.from_text(match.group(0), match.group("content"))
+
+    @classmethod
+    def from_text(cls, full_match: str, content: str) -> "NameTag":
+        content, user_id = split_user_id(content)
+        content = content.strip()
 
         # Split out parenthetical parts
         parts = PAREN_PATTERN.findall(content)
@@ -94,7 +126,9 @@ class NameTag:
             other_names=other_names,
             pronouns=pronouns,
             any_pronouns=any_pronouns,
-            batch_info=batch_info
+            batch_info=batch_info,
+            user_id=user_id,
+            silent=full_match.startswith(SILENT_MENTION_OPEN),
         )
 
 
@@ -113,10 +147,98 @@ class NameTag:
         return all(part in PRONOUNS_BANK for part in parts)
 
 
-def get_mentions(content: str):
-    all_mentions = [NameTag.from_match(m) for m in MENTION_PATTERN.finditer(content)]
-    unique_mentions = set(all_mentions)
-    
+def split_user_id(content: str) -> Tuple[str, Optional[int]]:
+    # "Alice Smith|1234" -> ("Alice Smith", 1234)
+    name, bar, suffix = content.rpartition("|")
+    if bar and suffix.strip().isdigit():
+        return name, int(suffix)
+    return content, None
+
+
+def opener_before(content: str, star: int, floor: int) -> int:
+    # Start of `@**` / `@_**` whose `**` is at `star` (-1 if those stars
+    # don't open a tag, or opener would begin before `floor`)
+    if star - 1 >= floor and content[star - 1] == "@":
+        return star - 1
+    if star - 2 >= floor and content.startswith("@_", star - 2):
+        return star - 2
+    return -1
+
+
+def find_opener(content: str, position: int) -> int:
+    star = content.find(MENTION_CLOSE, position)
+    while star != -1:
+        start = opener_before(content, star, position)
+        if start != -1:
+            return start
+        star = content.find(MENTION_CLOSE, star + 1)
+    return -1
+
+
+def scan_mention_spans(content: str) -> Iterator[Tuple[int, int, str]]:
+    # (start, end, inner text) for each tag. Single forward pass with
+    # `str.find`, so time is linear however hostile the text:
+    #   - tags never span lines, so each search stops at line end
+    #   - `**` right after `@` (or `@_`) opens a tag rather than closing one,
+    #     so `@**x @**x ... @**Name**` yields only `Name` (regex would make
+    #     junk tags like "x @" out of every fragment)
+    #   - tags longer than any real name are skipped, not parsed
+    position = 0
+    while True:
+        start = find_opener(content, position)
+        if start == -1:
+            return
+
+        opener = SILENT_MENTION_OPEN if content.startswith(SILENT_MENTION_OPEN, start) else MENTION_OPEN
+        inner = start + len(opener)
+        line_end = content.find("\n", inner)
+        if line_end == -1:
+            line_end = len(content)
+
+        end = content.find(MENTION_CLOSE, inner, line_end)
+        if end == -1:
+            # No other opener can close before this line ends either
+            position = line_end + 1
+            continue
+
+        nested = opener_before(content, end, inner)
+        if nested != -1:
+            position = nested # Start over from inner opener
+            continue
+
+        position = end + len(MENTION_CLOSE)
+        if end - inner <= MENTION_MAX_CHARS:
+            yield start, position, content[inner:end]
+
+
+def scan_mentions(content: str) -> Iterator[Tuple[str, str]]:
+    # (full match, inner text) for each tag
+    for start, end, inner in scan_mention_spans(content):
+        yield content[start:end], inner
+
+
+@lru_cache(maxsize=MENTION_INTERN_SIZE)
+def intern_tag(full_match: str, content: str) -> Optional[NameTag]:
+    # Same raw tag -> same (immutable) NameTag; bounded, least recent dropped.
+    # Empty tags (`@****`, `@**|12**`) name nobody
+    if not split_user_id(content)[0].strip():
+        return None
+    return NameTag.from_text(full_match, content)
+
+
+def intern_stats():
+    return intern_tag.cache_info()
+
+
+def clear_interned_tags() -> None:
+    intern_tag.cache_clear()
+
+
+def get_mentions(content: str) -> List[NameTag]:
+    # Unique tags, in order of first appearance
+    all_mentions = (intern_tag(full_match, inner) for full_match, inner in scan_mentions(content))
+    unique_mentions = dict.fromkeys(m for m in all_mentions if m is not None)
+
     return list(unique_mentions)
 
 
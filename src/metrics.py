@@ -0,0 +1,283 @@
+###############################################################################
+##  `metrics.py`                                                             ##
+##                                                                           ##
+##  Purpose: In-process counters, gauges & latency histograms over HTTP      ##
+###############################################################################
+
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config import env_int, env_str
+from src.logger import log_info
+
+
+# 0 disables endpoint (worker `i` serves on port + 1 + i)
+METRICS_PORT = env_int("BOT_METRICS_PORT", 0)
+METRICS_HOST = env_str("BOT_METRICS_HOST", "127.0.0.1")
+
+# Seconds; spans fast string stages up to slow coref / API calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+LabelValues = Tuple[str, ...]
+
+
+def format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str = "", labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"Metric {self.name} takes labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text="", labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{format_labels(self.label_names, key)} {value}" for key, value in items]
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(key) or "": value for key, value in self._values.items()}
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name, help_text="", labels=()):
+        super().__init__(name, help_text, labels)
+        # Read at scrape time (e.g. queue depth owned by another object)
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = fn
+
+    def _collect(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, fn in functions.items():
+            try:
+                values[key] = fn()
+            except Exception:
+                continue # Source went away (e.g. pool shut down)
+        return values
+
+    def value(self, **labels) -> float:
+        return self._collect().get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.label_names, key)} {value}"
+            for key, value in sorted(self._collect().items())
+        ]
+
+    def snapshot(self):
+        return {",".join(key) or "": value for key, value in self._collect().items()}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text="", labels=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        return sum(self._counts.get(self._key(labels), []))
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), self._sums[key]) for key, counts in self._counts.items())
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = format_labels(self.label_names, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                ",".join(key) or "": {"count": sum(counts), "sum": self._sums[key]}
+                for key, counts in self._counts.items()
+            }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, labels, **kwargs):
+        # Same name always returns same metric (modules can declare freely)
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text="", labels=()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def render(self) -> str:
+        # Prometheus text exposition format
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+# Process-wide registry (each worker process has its own)
+REGISTRY = MetricsRegistry()
+
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+
+
+# Hot-path metrics shared across modules
+EVENTS_RECEIVED = counter("pronoun_bot_events_received_total", "Zulip events received", ["type"])
+MESSAGES_SCANNED = counter("pronoun_bot_messages_scanned_total", "Messages that passed validation & were scanned")
+MENTIONS_FOUND = counter("pronoun_bot_mentions_found_total", "Name tag mentions parsed from scanned messages")
+COREF_RUNS = counter("pronoun_bot_coref_runs_total", "Validations that ran coref backend", ["backend"])
+COREF_SKIPS = counter("pronoun_bot_coref_skips_total", "Validations where pre-filter skipped coref", ["reason"])
+CONTEXT_CHECKS = counter("pronoun_bot_context_checks_total", "Context window checks of previous topic messages")
+DMS_SENT = counter("pronoun_bot_dms_sent_total", "Mismatch notifications sent to writers")
+QUEUE_DEPTH = gauge("pronoun_bot_queue_depth", "Work waiting to be processed", ["queue"])
+STAGE_SECONDS = histogram("pronoun_bot_stage_seconds", "Latency of each message scan stage", ["stage"])
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body, content_type = self.registry.render(), "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body, content_type = json.dumps(self.registry.snapshot()), "application/json"
+        elif path == "/healthz":
+            body, content_type = "ok\n", "text/plain"
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass # Scrapes every few seconds would drown out bot logs
+
+
+def start_metrics_server(
+    port: int = METRICS_PORT,
+    host: str = METRICS_HOST,
+    registry: Optional[MetricsRegistry] = None,
+) -> ThreadingHTTPServer:
+    handler = MetricsHandler
+    if registry is not None:
+        handler = type("BoundMetricsHandler", (MetricsHandler,), {"registry": registry})
+
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+
+    log_info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
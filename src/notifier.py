@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from urllib.parse import quote_plus
 
 from src.logger import log_info, log_section_start, log_divider
+from src.metrics import DMS_SENT
 
 
 BOT_CREATOR_TAG = "@**Adrien Lynch (he/they) (S2'25)**"
@@ -67,6 +68,12 @@ def notify_writer_of_mismatch(content, result, client):
         f"NLP detected the following mismatches: {mismatches_str}"
     ]
 
+    # Phrase from original message where each (still flagged) pronoun appears
+    quotes = result.get("quotes") or {}
+    quoted_phrases = [quotes[m] for m in result["mismatches"] if m in quotes]
+    if quoted_phrases:
+        content_lines.append("\n".join(f"> {phrase}" for phrase in quoted_phrases))
+
     # Add link if message is from a stream
     zulip_message_link = get_message_link(content)
     content_lines.append(f"You can review your original message here: {zulip_message_link}")
@@ -84,6 +91,7 @@ def notify_writer_of_mismatch(content, result, client):
         "to": [sender_id],
         "content": "\n\n".join(content_lines)
     })
+    DMS_SENT.inc()
 
 
 
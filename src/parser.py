@@ -5,35 +5,232 @@
 ###############################################################################
 
 
-from processing.nlp import PRONOUN_GROUPS
-from processing.nlp import get_pronoun_mappings
-from processing.llm import validate_pronouns_with_llm
+from bisect import bisect_right
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Tuple
 
-from src.logger import log_debug, log_cluster_mapping, log_validation_results, log_divider
+from processing.nlp import PRONOUN_GROUPS, PRONOUN_LEXICON_PATTERN
+from processing.backends import get_backend
 
+from src.mentions import scan_mention_spans
+from src.metrics import COREF_RUNS, COREF_SKIPS
+from src.logger import log_info, log_debug, log_cluster_mapping, log_validation_results, log_divider
+from src.windowing import WINDOWING_ENABLED, build_mention_window
 
-def sanitize_content(content, mentions):
-    sanitized = content
 
+# How often (and why) coref was skipped since startup
+COREF_SKIP_COUNTS = Counter()
+
+# Longest phrase quoted back to writer for a flagged pronoun
+QUOTE_MAX_CHARS = 160
+SENTENCE_BREAKS = ".!?\n"
+
+
+def get_valid_pronouns(mention):
+    # All pronoun forms (specific to that person) flattened
+    return {
+        form for pronoun in mention.pronouns 
+        for form in PRONOUN_GROUPS.get(pronoun, [])
+    }
+
+
+def check_coref_needed(content, mentions):
+    # Cheap pre-filter: coref can only flag pronouns that actually appear in
+    # text, & only for mentions with specific (non-"any") pronouns
+    constrained = [m for m in mentions if m.pronouns != () and not m.any_pronouns]
+    if not constrained:
+        return False, "no mention has specific pronouns"
+
+    text_pronouns = {p.lower() for p in PRONOUN_LEXICON_PATTERN.findall(content)}
+    if not text_pronouns:
+        return False, "no pronouns in text"
+
+    # If every pronoun in text is valid for every constrained mention,
+    # no cluster assignment could produce a mismatch
+    if all(text_pronouns <= get_valid_pronouns(m) for m in constrained):
+        return False, "all pronouns in text valid for every mention"
+
+    return True, None
+
+
+@dataclass
+class SanitizedText:
+    text: str
+    original: str
+    # Per replaced tag: (start in text, end in text, start in original, end in original)
+    replacements: List[Tuple[int, int, int, int]] = field(default_factory=list)
+    # Mention name for each replacement above (same order)
+    replaced_names: List[str] = field(default_factory=list)
+
+    def name_before(self, offset: int):
+        # Mention whose tag most recently precedes `offset` in text
+        i = bisect_right(self.replacements, offset - 1, key=lambda r: r[0]) - 1
+        return self.replaced_names[i] if i >= 0 else None
+
+    def to_original(self, start: int, end: int) -> Tuple[int, int]:
+        # Span in sanitized text -> span in original (a span touching a
+        # replaced name widens to cover whole tag)
+        return self._map(start, is_end=False), self._map(end, is_end=True)
+
+    def _map(self, offset: int, is_end: bool) -> int:
+        i = bisect_right(self.replacements, offset, key=lambda r: r[0]) - 1
+        if i < 0:
+            return offset
+
+        text_start, text_end, original_start, original_end = self.replacements[i]
+        if offset >= text_end:
+            return original_end + (offset - text_end)
+        if offset == text_start and not is_end:
+            return original_start
+        return original_end if is_end else original_start
+
+    def quote(self, start: int, end: int, max_chars: int = QUOTE_MAX_CHARS) -> str:
+        # Sentence around span, as writer typed it (pronoun bolded, mentions
+        # made silent so quoting doesn't ping anyone)
+        left = max(self.text.rfind(c, 0, start) for c in SENTENCE_BREAKS) + 1
+        rights = [i for i in (self.text.find(c, end) for c in SENTENCE_BREAKS) if i != -1]
+        right = min(rights) + 1 if rights else len(self.text)
+
+        half = max_chars // 2
+        clipped_left, clipped_right = left < start - half, right > end + half
+        left, right = max(left, start - half), min(right, end + half)
+
+        o_left, o_start = self.to_original(left, start)
+        o_end, o_right = self.to_original(end, right)
+        silence = lambda s: s.replace("@**", "@_**")
+
+        phrase = (
+            silence(self.original[o_left:o_start]) + "**" + self.original[o_start:o_end] + "**"
+            + silence(self.original[o_end:o_right])
+        ).strip()
+        return ("…" if clipped_left else "") + phrase + ("…" if clipped_right else "")
+
+
+def sanitize_with_offsets(content, mentions) -> SanitizedText:
+    # Single pass over tag spans: each known tag becomes mention's first
+    # name, & every replacement is recorded so positions map back
+    names = {m.full_match: m for m in mentions}
+
+    parts, replacements, replaced_names = [], [], []
+    position = length = 0
+    for start, end, _ in scan_mention_spans(content):
+        mention = names.get(content[start:end])
+        if mention is None:
+            continue
+
+        parts.append(content[position:start])
+        length += start - position
+        replacements.append((length, length + len(mention.first_name), start, end))
+        replaced_names.append(mention.name)
+
+        parts.append(mention.first_name)
+        length += len(mention.first_name)
+        position = end
+
+    parts.append(content[position:])
+    return SanitizedText("".join(parts), content, replacements, replaced_names)
+
+
+def sanitize_content(content, mentions):
     # Replace all name tag instances (full_match) with readable name
-    for m in mentions:
-        sanitized = sanitized.replace(m.full_match, m.first_name)
+    return sanitize_with_offsets(content, mentions).text
+
 
-    return sanitized
+def quote_mismatches(sanitized, results):
+    # 1 lexicon pass over text; each flagged pronoun is quoted from first
+    # place it follows that person's tag most closely (else first anywhere)
+    flagged = {p for r in results for p in (r["mismatches"] or [])}
+    if not flagged:
+        return results
 
+    occurrences = [
+        (m.group(0).lower(), m.start(), m.end(), sanitized.name_before(m.start()))
+        for m in PRONOUN_LEXICON_PATTERN.finditer(sanitized.text)
+        if m.group(0).lower() in flagged
+    ]
 
-def validate_pronouns_with_nlp(content, mentions):
-    pronoun_mappings = get_pronoun_mappings(content, mentions)
+    for result in results:
+        if not result["mismatches"]:
+            continue
+
+        quotes = {}
+        for pronoun in result["mismatches"]:
+            spans = [(s, e, name) for p, s, e, name in occurrences if p == pronoun]
+            if not spans:
+                continue
+            start, end, _ = next((span for span in spans if span[2] == result["name"]), spans[0])
+            quotes[pronoun] = sanitized.quote(start, end)
+        result["quotes"] = quotes
+
+    return results
+
+
+def results_from_verdicts(content, mentions, verdicts):
+    # Verdict backends (e.g. LLM) say pass/fail without clusters, so point at
+    # pronouns in text that aren't valid for that person as the mismatches
+    text_pronouns = {p.lower() for p in PRONOUN_LEXICON_PATTERN.findall(content)}
+
+    results = []
+    for mention in mentions:
+        if mention.name not in verdicts:
+            continue
+
+        mismatches = [] if verdicts[mention.name] else sorted(text_pronouns - get_valid_pronouns(mention))
+        results.append({
+            "name": mention.name,
+            "pronouns": "/".join(mention.pronouns) if mention.pronouns else "None",
+            "pronouns_match": not mismatches,
+            "mismatches": mismatches
+        })
+
+    return results
+
+
+def validate_pronouns_with_nlp(content, mentions, windowed=WINDOWING_ENABLED, backend=None):
+    # Long messages: only run coref on sentences around each mentioned name
+    if windowed:
+        window = build_mention_window(content, mentions)
+        if window is not None:
+            log_info(f"Windowed {len(content)} characters down to {len(window.text)} around mentions")
+            content = window.text
+
+    # Backend chosen by `COREF_BACKEND` unless caller names one
+    result = get_backend(backend).analyze(content, mentions)
+    COREF_RUNS.inc(backend=result.backend)
+    log_debug(f"Backend '{result.backend}' finished in {result.seconds:.3f}s")
+
+    if result.has_verdicts:
+        return results_from_verdicts(content, mentions, result.verdicts)
+
+    pronoun_mappings = result.mappings
     log_cluster_mapping(pronoun_mappings)
 
+    return results_from_mappings(mentions, pronoun_mappings)
+
+
+def clustered_pronouns_for(mention, pronoun_mappings, first_name_counts):
+    # Mappings are keyed by `mention_id`; backends still keying by name
+    # (e.g. experimental `nlp_spacy`) are read by full name, or by first
+    # name when no other mention shares it
+    for key in (mention.mention_id, mention.name):
+        if key in pronoun_mappings:
+            return pronoun_mappings[key]
+    if first_name_counts[mention.first_name] == 1:
+        return pronoun_mappings.get(mention.first_name)
+    return None
+
+
+def results_from_mappings(mentions, pronoun_mappings):
+    # Cluster backends: compare pronouns clustered with each name to theirs
     results = []
+    first_name_counts = Counter(m.first_name for m in mentions)
 
     for mention in mentions:
-        if mention.name not in pronoun_mappings and mention.first_name not in pronoun_mappings:
+        clustered_pronouns = clustered_pronouns_for(mention, pronoun_mappings, first_name_counts)
+        if clustered_pronouns is None:
             continue
         
-        clustered_pronouns = pronoun_mappings[mention.first_name]
-        
         pronouns = mention.pronouns
         any_allowed = pronouns == () or mention.any_pronouns
 
@@ -41,11 +238,7 @@ def validate_pronouns_with_nlp(content, mentions):
             pronouns_match = True
             mismatches = []
         else:
-            # All pronoun forms (specific that person) flattened
-            valid_pronouns = [
-                form for pronoun in pronouns 
-                for form in PRONOUN_GROUPS.get(pronoun, [])
-            ]
+            valid_pronouns = get_valid_pronouns(mention)
 
             # Check for complete match, & record any mismatches 
             pronouns_match = all(p in valid_pronouns for p in clustered_pronouns)
@@ -64,7 +257,30 @@ def validate_pronouns_with_nlp(content, mentions):
 
 def validate_mentions_in_text(original_content, mentions):
     # Remove name tags from content text, then apply NLP to extract clusters
-    content = sanitize_content(original_content, mentions)
+    sanitized = sanitize_with_offsets(original_content, mentions)
+    content = sanitized.text
+
+    coref_needed, skip_reason = check_coref_needed(content, mentions)
+    if not coref_needed:
+        COREF_SKIP_COUNTS[skip_reason] += 1
+        COREF_SKIPS.inc(reason=skip_reason)
+        log_info(f"Skipping NLP: {skip_reason} (skipped {sum(COREF_SKIP_COUNTS.values())} so far)")
+        return [
+            {
+                "name": mention.name,
+                "pronouns": "/".join(mention.pronouns) if mention.pronouns else "None",
+                "pronouns_match": True,
+                "mismatches": []
+            }
+            for mention in mentions
+        ]
+
+    # Cheapest tier that can settle each mention (imported here: cascade uses this module)
+    from src.cascade import CASCADE_ENABLED, run_cascade
+    if CASCADE_ENABLED:
+        cascade = run_cascade(content, mentions)
+        log_validation_results(cascade.results, f"Cascade ({cascade.tier})")
+        return quote_mismatches(sanitized, cascade.results)
 
     nlp_results = validate_pronouns_with_nlp(content, mentions)
     log_validation_results(nlp_results, "NLP")
@@ -101,7 +317,7 @@ def validate_mentions_in_text(original_content, mentions):
     log_divider()
     log_debug("Making final determination based on NLP results")
 
-    return final_results
+    return quote_mismatches(sanitized, final_results)
 
 
 
@@ -6,16 +6,18 @@
 
 
 from src.mentions import get_mentions
+from src.directory import resolve_mentions
 from src.parser import validate_mentions_in_text
-from src.context import check_previous_messages, reconcile_context_window
+from src.context import get_previous_messages, check_context_messages, reconcile_context_window
 from src.notifier import notify_writer_of_mismatch
+from src.metrics import MESSAGES_SCANNED, MENTIONS_FOUND, CONTEXT_CHECKS, STAGE_SECONDS
 from src.logger import (
     log_info, log_debug,
     log_section_start, log_section_end, 
     log_mention_info, 
     log_validation_results,
     log_blank_line, log_divider,
-    force_flush
+    force_flush, bind_message_id
 )
 
 
@@ -50,49 +52,94 @@ def scan_for_mentions(message, client):
     if not contents_are_valid(message):
         return
     
-    content = message["content"]
-    stream_id, subject = message["stream_id"], message["subject"]
-    
+    MESSAGES_SCANNED.inc()
+    with bind_message_id(message["id"]), STAGE_SECONDS.time(stage="total"):
+        scan_valid_message(message, client)
+
+
+def scan_valid_message(message, client):
+    # Stages run back to back here; async listener awaits API stages instead
+    start_message_scan()
+
+    mentions, mismatches = find_mismatches(message)
+    if mismatches:
+        previous_msgs = get_context_messages(client, message)
+        reconciled = reconcile_with_context(mentions, mismatches, previous_msgs)
+        for r in reconciled:
+            notify_mismatch(message, r, client)
+
+    end_message_scan()
+
+
+def start_message_scan():
     log_blank_line()
     log_section_start("MESSAGE SCAN")
-    
-    if "@" in content:
-        mentions = get_mentions(content)
-        
-        if mentions:
-            log_info(f"Found {len(mentions)} mention(s) to process")
-            log_divider()
-            for mention in mentions:
-                log_mention_info(mention)
-            
-            results = validate_mentions_in_text(content, mentions)
-            log_validation_results(results, "Final Validation")
-            
-            # Check for mismatches & notify
-            mismatches = [r for r in results if not r['pronouns_match']]
-            if mismatches:
-                log_info(f"Found {len(mismatches)} initial mismatch(es) - performing additional check")
-
-                log_section_start("CONTEXT WINDOW CHECK")
-                context_mismatches = check_previous_messages(client, stream_id, subject, mentions)
-                reconciled = reconcile_context_window(mismatches, context_mismatches)
-                log_section_end("CONTEXT WINDOW CHECK")
-
-                if reconciled:
-                    log_info(f"Found {len(reconciled)} pronoun mismatch(es) - sending notifications")
-                    for r in reconciled:
-                        notify_writer_of_mismatch(message, r, client)
-                        pass
-                else:
-                    log_info("All pronoun usage is correct!")
-            else:
-                log_info("All pronoun usage is correct!")
-        else:
-            log_info("No valid mentions found in message")
-    else:
-        log_info("No mentions (@) found in message")
-    
+
+
+def end_message_scan():
     log_section_end("MESSAGE SCAN")
     log_blank_line()
     force_flush()
 
+
+def find_mismatches(message):
+    # CPU stage: parse mentions & run coref over message itself; returns
+    # (mentions, mismatches) with mismatches still to be checked in context
+    content = message["content"]
+
+    if "@" not in content:
+        log_info("No mentions (@) found in message")
+        return [], []
+
+    # Pronouns from user directory (profile field) where it knows them
+    with STAGE_SECONDS.time(stage="get_mentions"):
+        mentions = resolve_mentions(get_mentions(content))
+
+    if not mentions:
+        log_info("No valid mentions found in message")
+        return [], []
+
+    MENTIONS_FOUND.inc(len(mentions))
+    log_info(f"Found {len(mentions)} mention(s) to process")
+    log_divider()
+    for mention in mentions:
+        log_mention_info(mention)
+
+    with STAGE_SECONDS.time(stage="validate"):
+        results = validate_mentions_in_text(content, mentions)
+    log_validation_results(results, "Final Validation")
+
+    mismatches = [r for r in results if not r['pronouns_match']]
+    if mismatches:
+        log_info(f"Found {len(mismatches)} initial mismatch(es) - performing additional check")
+    else:
+        log_info("All pronoun usage is correct!")
+    return mentions, mismatches
+
+
+def get_context_messages(client, message):
+    # API stage: previous messages in topic (topic history when warm)
+    with STAGE_SECONDS.time(stage="context_fetch"):
+        return get_previous_messages(client, message["stream_id"], message["subject"])
+
+
+def reconcile_with_context(mentions, mismatches, previous_msgs):
+    # CPU stage: keep only mismatches context window doesn't resolve
+    log_section_start("CONTEXT WINDOW CHECK")
+    CONTEXT_CHECKS.inc()
+    with STAGE_SECONDS.time(stage="context_check"):
+        context_mismatches = check_context_messages(previous_msgs, mentions)
+        reconciled = reconcile_context_window(mismatches, context_mismatches)
+    log_section_end("CONTEXT WINDOW CHECK")
+
+    if reconciled:
+        log_info(f"Found {len(reconciled)} pronoun mismatch(es) - sending notifications")
+    else:
+        log_info("All pronoun usage is correct!")
+    return reconciled
+
+
+def notify_mismatch(message, result, client):
+    # API stage: DM writer about 1 reconciled mismatch
+    with STAGE_SECONDS.time(stage="notify"):
+        notify_writer_of_mismatch(message, result, client)
@@ -0,0 +1,210 @@
+###############################################################################
+##  `tuner.py`                                                               ##
+##                                                                           ##
+##  Purpose: Picks (processes x torch threads) layout for CPU inference      ##
+###############################################################################
+
+
+import os
+import json
+import time
+import multiprocessing as mp
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from src.config import env_bool, env_int, env_str
+from src.logger import log_info, log_warning, log_section_start, log_section_end, log_divider
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SCENARIOS_PATH = ROOT_DIR / "examples" / "test_scenarios.json"
+
+# Where chosen layout is saved, & read back by bot on startup
+TOPOLOGY_PATH = env_str("BOT_TOPOLOGY_PATH", str(ROOT_DIR / "topology.json"))
+
+# Pin each worker to its own slice of cores (Linux only)
+PIN_CPUS = env_bool("BOT_PIN_CPUS", False)
+
+# Every tuned process loads its own model, so process count is capped by
+# memory (0 = derive cap from available RAM & one loaded process's size)
+TUNE_MAX_PROCESSES = env_int("BOT_TUNE_MAX_PROCESSES", 0)
+
+# Share of available RAM tuned processes may fill (rest left for OS & bot)
+TUNE_MEMORY_FRACTION = 0.8
+
+
+@dataclass(frozen=True)
+class Topology:
+    processes: int
+    threads: int
+    pin_cpus: bool = False
+    docs_per_second: float = 0.0
+    cores: int = 0
+
+
+def available_cpus() -> List[int]:
+    # Cores this process may run on (respects cgroup / taskset limits)
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def candidate_layouts(cores: int, max_processes: Optional[int] = None) -> List[Tuple[int, int]]:
+    # (processes, threads) splits using every core exactly once, up to
+    # `max_processes` (each one holds a full model in memory)
+    limit = min(cores, max_processes) if max_processes else cores
+    return [
+        (processes, cores // processes)
+        for processes in range(1, max(limit, 1) + 1)
+        if cores % processes == 0
+    ]
+
+
+def available_memory_mb() -> Optional[float]:
+    # Memory free for new processes (Linux only; None when unknown)
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def measure_process_mb() -> float:
+    # Footprint of one tuned process: this one's RSS with model loaded
+    from processing.models import get_rss_mb
+    from processing.nlp import get_nlp
+    get_nlp()
+    return get_rss_mb()
+
+
+def max_processes_for_memory(process_mb: float, available_mb: Optional[float], fraction: float = TUNE_MEMORY_FRACTION) -> Optional[int]:
+    if not available_mb or process_mb <= 0:
+        return None
+    return max(int(available_mb * fraction // process_mb), 1)
+
+
+def cpu_slices(cpus: Sequence[int], processes: int, threads: int) -> List[List[int]]:
+    # Contiguous, non-overlapping core sets (one per worker)
+    return [list(cpus[i * threads : (i + 1) * threads]) for i in range(processes)]
+
+
+def apply_worker_threads(threads: int, cpus: Optional[Sequence[int]] = None) -> None:
+    # Must run before first inference in this process
+    for var in ["OMP_NUM_THREADS", "MKL_NUM_THREADS"]:
+        os.environ[var] = str(threads)
+
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, set(cpus))
+
+    import torch
+    torch.set_num_threads(threads)
+    try:
+        # Inter-op pool only configurable before any parallel work has started
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass
+
+
+def load_sample_texts() -> List[str]:
+    with open(SCENARIOS_PATH) as f:
+        scenarios = json.load(f)
+    return [text for entries in scenarios.values() for text in entries.values()]
+
+
+def _init_bench_worker(threads, cpu_sets):
+    # Each pool worker claims one core set, sets threads, & loads model
+    cpus = cpu_sets.get() if cpu_sets is not None else None
+    apply_worker_threads(threads, cpus)
+
+    from processing.nlp import get_nlp
+    get_nlp()
+
+
+def _run_coref(text):
+    # Same inference as `get_clusters_from_text`, minus cache & logging
+    from processing.nlp import apply_nlp, extract_clusters
+    return len(extract_clusters(apply_nlp(text)))
+
+
+def benchmark_layout(processes: int, threads: int, texts: Sequence[str], rounds: int = 3, pin: bool = False) -> float:
+    # Docs per second across all workers (model load excluded from timing)
+    ctx = mp.get_context("spawn")
+
+    cpu_sets = None
+    if pin:
+        cpu_sets = ctx.Queue()
+        for cpus in cpu_slices(available_cpus(), processes, threads):
+            cpu_sets.put(cpus)
+
+    workload = list(texts) * rounds
+    with ctx.Pool(processes, initializer=_init_bench_worker, initargs=(threads, cpu_sets)) as pool:
+        # Warm-up pass (every worker loads model & sees each text shape once)
+        pool.map(_run_coref, list(texts) * processes, chunksize=1)
+
+        start = time.perf_counter()
+        pool.map(_run_coref, workload, chunksize=1)
+        elapsed = time.perf_counter() - start
+
+    return len(workload) / elapsed if elapsed else 0.0
+
+
+def tune(
+    texts: Optional[Sequence[str]] = None,
+    rounds: int = 3,
+    pin: bool = PIN_CPUS,
+    bench: Callable[..., float] = benchmark_layout,
+    max_processes: Optional[int] = TUNE_MAX_PROCESSES or None,
+    measure: Callable[[], float] = measure_process_mb,
+) -> Topology:
+    texts = list(texts) if texts is not None else load_sample_texts()
+    cores = len(available_cpus())
+
+    log_section_start("TOPOLOGY TUNING")
+    log_info(f"{cores} core(s) available, {len(texts)} sample text(s) x {rounds} round(s)")
+
+    if max_processes is None:
+        process_mb = measure()
+        available_mb = available_memory_mb()
+        max_processes = max_processes_for_memory(process_mb, available_mb)
+        if max_processes is not None:
+            log_info(f"~{process_mb:.0f} MB per process, {available_mb:.0f} MB available: at most {max_processes} process(es)")
+        else:
+            log_warning("Available memory unknown, process count not capped (set BOT_TUNE_MAX_PROCESSES)")
+
+    best = None
+    for processes, threads in candidate_layouts(cores, max_processes):
+        docs_per_second = bench(processes, threads, texts, rounds=rounds, pin=pin)
+        log_info(f"  {processes} process(es) x {threads} thread(s): {docs_per_second:.2f} docs/s")
+
+        if best is None or docs_per_second > best.docs_per_second:
+            best = Topology(processes, threads, pin, docs_per_second, cores)
+
+    log_divider()
+    log_info(f"Best: {best.processes} process(es) x {best.threads} thread(s) ({best.docs_per_second:.2f} docs/s)")
+    log_section_end("TOPOLOGY TUNING")
+    return best
+
+
+def save_topology(topology: Topology, path: str = TOPOLOGY_PATH) -> None:
+    with open(path, "w") as f:
+        json.dump(asdict(topology), f, indent=2)
+    log_info(f"Saved topology to {path}")
+
+
+def load_topology(path: str = TOPOLOGY_PATH) -> Optional[Topology]:
+    if not os.path.exists(path):
+        return None
+
+    with open(path) as f:
+        topology = Topology(**json.load(f))
+
+    # Tuned on a different machine size, so layout may not fit here
+    cores = len(available_cpus())
+    if topology.cores and topology.cores != cores:
+        log_warning(f"Topology tuned for {topology.cores} cores but {cores} available, ignoring it")
+        return None
+    return topology
@@ -0,0 +1,108 @@
+###############################################################################
+##  `windowing.py`                                                           ##
+##                                                                           ##
+##  Purpose: Trims long messages down to the region around each mention      ##
+###############################################################################
+
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from src.config import env_bool, env_int
+from processing.nlp import PRONOUN_LEXICON_PATTERN
+
+
+# Windowing only kicks in for long messages (short ones go through untouched)
+WINDOWING_ENABLED = env_bool("COREF_WINDOWING", False)
+WINDOW_MIN_CHARS = env_int("COREF_WINDOW_MIN_CHARS", 2000)
+
+# Sentences kept around every sentence naming a mentioned person (sentences
+# using a pronoun are always kept, with the ones before them)
+WINDOW_SENTENCES_BEFORE = env_int("COREF_WINDOW_SENTENCES_BEFORE", 1)
+WINDOW_SENTENCES_AFTER = env_int("COREF_WINDOW_SENTENCES_AFTER", 3)
+
+# Placed between non-adjacent excerpts so coref sees a paragraph break
+BLOCK_SEPARATOR = "\n\n"
+
+# Sentence = run of text up to terminal punctuation (plus closing quotes) or newline
+SENTENCE_PATTERN = re.compile(r"[^\s][^.!?\n]*(?:[.!?]+[\"')\]]*|\n|$)")
+
+
+@dataclass(frozen=True)
+class Sentence:
+    start: int
+    end: int
+    text: str
+
+
+@dataclass(frozen=True)
+class MentionWindow:
+    # Results carry no offsets (quotes come from full text), so excerpt
+    # text is all coref needs
+    text: str
+
+
+def split_sentences(text: str) -> List[Sentence]:
+    return [
+        Sentence(m.start(), m.end(), m.group(0))
+        for m in SENTENCE_PATTERN.finditer(text)
+    ]
+
+
+def compile_name_pattern(mentions) -> Optional[re.Pattern]:
+    names = set()
+    for mention in mentions:
+        names.add(mention.first_name)
+        names.update(mention.other_names)
+
+    names = [n for n in names if n]
+    if not names:
+        return None
+
+    alternatives = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})\b")
+
+
+def build_mention_window(
+    content: str,
+    mentions,
+    before: int = WINDOW_SENTENCES_BEFORE,
+    after: int = WINDOW_SENTENCES_AFTER,
+    min_chars: int = WINDOW_MIN_CHARS,
+) -> Optional[MentionWindow]:
+    # Returns None when whole message should be analyzed as is
+    if len(content) < min_chars:
+        return None
+
+    name_pattern = compile_name_pattern(mentions)
+    if name_pattern is None:
+        return None
+
+    sentences = split_sentences(content)
+    named = {i for i, s in enumerate(sentences) if name_pattern.search(s.text)}
+    if not named:
+        return None
+
+    # Neighbourhood of every sentence naming someone (pronouns that could
+    # refer to them follow closely, & a sentence before keeps antecedents)
+    keep = set()
+    for i in named:
+        keep.update(range(max(i - before, 0), min(i + after + 1, len(sentences))))
+
+    # Plus every other sentence using a pronoun (& its antecedent sentences),
+    # so no pronoun coref would see in full text is cut from excerpt
+    for i, sentence in enumerate(sentences):
+        if i not in keep and PRONOUN_LEXICON_PATTERN.search(sentence.text):
+            keep.update(range(max(i - before, 0), i + 1))
+
+    # Merge consecutive kept sentences into contiguous blocks of original text
+    blocks = []
+    for i in sorted(keep):
+        if blocks and blocks[-1][1] == i - 1:
+            blocks[-1][1] = i
+        else:
+            blocks.append([i, i])
+
+    pieces = [content[sentences[first].start : sentences[last].end] for first, last in blocks]
+    return MentionWindow(text=BLOCK_SEPARATOR.join(pieces))
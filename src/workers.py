@@ -0,0 +1,227 @@
+###############################################################################
+##  `workers.py`                                                             ##
+##                                                                           ##
+##  Purpose: Pool of inference processes fed by the event listener           ##
+###############################################################################
+
+
+import os
+import time
+import queue
+import signal
+import threading
+import multiprocessing as mp
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import env_int, env_float
+from src.logger import LOG_ASYNC, log_info, log_error, log_warning, start_async_logging, shutdown_logging
+from src.metrics import METRICS_PORT, QUEUE_DEPTH, start_metrics_server
+from src.logsink import LOG_DIR, start_log_sink
+
+
+# 0 keeps scanning inside listener process (original single-process mode)
+WORKER_COUNT = env_int("BOT_WORKERS", 0)
+
+# Events held for workers before listener blocks (back-pressure on Zulip queue)
+WORKER_QUEUE_SIZE = env_int("BOT_WORKER_QUEUE_SIZE", 1000)
+
+# Idle workers still check in this often, & pool reports health this often
+HEARTBEAT_SECONDS = env_float("BOT_WORKER_HEARTBEAT_SECONDS", 5.0)
+HEALTH_CHECK_SECONDS = env_float("BOT_WORKER_HEALTH_SECONDS", 60.0)
+
+
+def default_handle_task(event, client):
+    # Runs inside worker: convert event, then full scan (coref, context, DM)
+    from src.events import event_to_msg
+    from src.reader import scan_for_mentions
+
+    scan_for_mentions(event_to_msg(event, client), client)
+
+
+def default_setup_worker():
+    # Each worker owns its own Zulip client, user directory & loaded pipeline
+    from src.setup import create_client
+    from src.directory import USER_DIRECTORY_ENABLED, enable_user_directory
+    from processing.nlp import get_nlp
+    client = create_client()
+    if USER_DIRECTORY_ENABLED:
+        # Workers never see `realm_user` events, so directory reloads on a timer
+        enable_user_directory(client).start_refresh(client)
+    get_nlp()
+    return client
+
+
+def worker_main(index, tasks, heartbeats, processed, failed, setup_worker, handle_task, threads=None, cpus=None):
+    # Parent coordinates shutdown (via sentinel), so ignore Ctrl-C here
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if LOG_DIR:
+        start_log_sink()
+    if LOG_ASYNC:
+        start_async_logging()
+
+    # Tuned topology: torch threads (& optionally cores) for this worker
+    if threads:
+        from src.tuner import apply_worker_threads
+        apply_worker_threads(threads, cpus)
+
+    # Each worker has own registry, so serves own endpoint next to listener's
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT + 1 + index)
+
+    state = setup_worker()
+    log_info(f"Worker {index} ready (pid {os.getpid()})")
+    heartbeats[index] = time.time()
+
+    while True:
+        try:
+            task = tasks.get(timeout=HEARTBEAT_SECONDS)
+        except queue.Empty:
+            heartbeats[index] = time.time()
+            continue
+
+        if task is None:
+            break
+
+        heartbeats[index] = time.time()
+        try:
+            handle_task(task, state)
+            processed[index] += 1
+        except Exception as e:
+            failed[index] += 1
+            log_error(f"Worker {index} failed on task: {e}")
+        heartbeats[index] = time.time()
+
+    log_info(f"Worker {index} stopped")
+    shutdown_logging()
+
+
+class WorkerPool:
+    def __init__(
+        self,
+        worker_count: int = WORKER_COUNT,
+        queue_size: int = WORKER_QUEUE_SIZE,
+        setup_worker: Callable[[], Any] = default_setup_worker,
+        handle_task: Callable[[Any, Any], None] = default_handle_task,
+        threads: Optional[int] = None,
+        cpu_sets: Optional[List[List[int]]] = None,
+    ):
+        if worker_count < 1:
+            raise ValueError("WorkerPool needs at least 1 worker")
+        if cpu_sets is not None and len(cpu_sets) < worker_count:
+            raise ValueError("Need one CPU set per worker")
+
+        # Spawn (not fork): torch thread pools don't survive fork safely
+        self._ctx = mp.get_context("spawn")
+
+        self.worker_count = worker_count
+        self.setup_worker = setup_worker
+        self.handle_task = handle_task
+        self.threads = threads
+        self.cpu_sets = cpu_sets
+
+        self.tasks = self._ctx.Queue(maxsize=queue_size)
+        self.heartbeats = self._ctx.Array("d", worker_count)
+        self.processed = self._ctx.Array("l", worker_count)
+        self.failed = self._ctx.Array("l", worker_count)
+
+        self._processes: List[Optional[mp.Process]] = [None] * worker_count
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _spawn(self, index: int) -> None:
+        process = self._ctx.Process(
+            target=worker_main,
+            args=(
+                index, self.tasks,
+                self.heartbeats, self.processed, self.failed,
+                self.setup_worker, self.handle_task,
+                self.threads, self.cpu_sets[index] if self.cpu_sets else None,
+            ),
+            name=f"pronoun-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self._processes[index] = process
+
+    def start(self, monitor: bool = True) -> None:
+        log_info(f"Starting {self.worker_count} worker process(es)...")
+        QUEUE_DEPTH.set_function(self.queue_depth, queue="workers")
+        for index in range(self.worker_count):
+            self._spawn(index)
+
+        if monitor:
+            self._monitor = threading.Thread(target=self._monitor_loop, name="worker-monitor", daemon=True)
+            self._monitor.start()
+
+    def submit(self, task, timeout: Optional[float] = None) -> None:
+        # Blocks when queue is full, so listener slows down instead of dropping
+        self.tasks.put(task, timeout=timeout)
+
+    def queue_depth(self) -> int:
+        try:
+            return self.tasks.qsize()
+        except NotImplementedError: # macOS doesn't implement `qsize`
+            return -1
+
+    def health(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        report = []
+        for index, process in enumerate(self._processes):
+            last_beat = self.heartbeats[index]
+            report.append({
+                "worker": index,
+                "pid": process.pid if process else None,
+                "alive": bool(process and process.is_alive()),
+                "ready": last_beat > 0,
+                "seconds_since_heartbeat": now - last_beat if last_beat else None,
+                "processed": self.processed[index],
+                "failed": self.failed[index],
+            })
+        return report
+
+    def restart_dead_workers(self) -> int:
+        restarted = 0
+        for index, process in enumerate(self._processes):
+            if self._stopping.is_set():
+                break
+            if process is not None and not process.is_alive():
+                log_warning(f"Worker {index} (pid {process.pid}) died with code {process.exitcode}, restarting")
+                self.heartbeats[index] = 0
+                self._spawn(index)
+                restarted += 1
+        return restarted
+
+    def _monitor_loop(self) -> None:
+        while not self._stopping.wait(HEALTH_CHECK_SECONDS):
+            self.restart_dead_workers()
+            for w in self.health():
+                since = w["seconds_since_heartbeat"]
+                since_str = f"{since:.0f}s ago" if since is not None else "never"
+                log_info(
+                    f"Worker {w['worker']} (pid {w['pid']}): "
+                    f"{'alive' if w['alive'] else 'DEAD'}, heartbeat {since_str}, "
+                    f"{w['processed']} processed, {w['failed']} failed"
+                )
+            log_info(f"Worker queue depth: {self.queue_depth()}")
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        # Let workers finish queued events, then stop any that don't exit in time
+        self._stopping.set()
+        log_info("Shutting down worker pool...")
+
+        for process in self._processes:
+            if process is not None and process.is_alive():
+                self.tasks.put(None)
+
+        deadline = time.monotonic() + timeout
+        for index, process in enumerate(self._processes):
+            if process is None:
+                continue
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                log_warning(f"Worker {index} did not stop in time, terminating")
+                process.terminate()
+                process.join()
+
+        log_info("Worker pool stopped")
@@ -0,0 +1,175 @@
+###############################################################################
+##  `test_backends.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests coref backend registry & common result type               ##
+###############################################################################
+
+
+import threading
+
+import pytest
+from processing import backends
+
+
+class EchoBackend(backends.BaseBackend):
+    # Clusters every pronoun in text with first mention (test-only backend)
+    name = "test-echo"
+    relative_cost = 0.01
+
+    def _analyze(self, text, mentions):
+        words = [w.strip(".,").lower() for w in text.split()]
+        return {mentions[0].first_name: [w for w in words if w in {"he", "she", "they"}]}, {}
+
+
+class VerdictBackend(backends.BaseBackend):
+    name = "test-verdict"
+
+    def _analyze(self, text, mentions):
+        return {}, {m.name: False for m in mentions}
+
+
+@pytest.fixture(autouse=True)
+def registered_backends():
+    # Registered only while tests in this module run
+    for cls in (EchoBackend, VerdictBackend):
+        backends.register_backend(cls)
+    yield
+    for cls in (EchoBackend, VerdictBackend):
+        backends.unregister_backend(cls.name)
+
+
+class Tag:
+    def __init__(self, name, first_name):
+        self.name = name
+        self.first_name = first_name
+
+
+# -----------------------------
+# Registry
+# -----------------------------
+def test_known_backends_registered():
+    names = backends.available_backends()
+    for name in ["spacy", "spacy-finetuned", "fastcoref", "llm"]:
+        assert name in names
+
+
+def test_get_backend_shares_instance():
+    assert backends.get_backend("test-echo") is backends.get_backend("test-echo")
+
+
+def test_backend_must_implement_analyze():
+    class Incomplete(backends.BaseBackend):
+        name = "test-incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        backends.get_backend("no-such-backend")
+
+
+# -----------------------------
+# Results & cost
+# -----------------------------
+def test_cluster_result_shape():
+    result = backends.get_backend("test-echo").analyze("Alice said she left.", [Tag("Alice Smith", "Alice")])
+
+    assert result.backend == "test-echo"
+    assert result.mappings == {"Alice": ["she"]}
+    assert not result.has_verdicts
+    assert result.seconds >= 0
+
+
+def test_verdict_result_shape():
+    result = backends.get_backend("test-verdict").analyze("text", [Tag("Bob Jones", "Bob")])
+
+    assert result.has_verdicts
+    assert result.verdicts == {"Bob Jones": False}
+
+
+def test_cost_tracks_calls():
+    backend = backends.get_backend("test-echo")
+    before = backend.cost()["calls"]
+
+    backend.analyze("Alice is here.", [Tag("Alice Smith", "Alice")])
+    cost = backends.backend_costs()["test-echo"]
+
+    assert cost["calls"] == before + 1
+    assert cost["relative_cost"] == 0.01
+
+
+# -----------------------------
+# Fastcoref batching
+# -----------------------------
+class FakeFCoref:
+    # Stands in for FCoref: clusters each capitalized word with pronouns after it
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, texts, max_tokens_in_batch=None):
+        self.calls.append(list(texts))
+        return [FakePrediction(text) for text in texts]
+
+
+class FakePrediction:
+    def __init__(self, text):
+        words = [w.strip(".,") for w in text.split()]
+        self.clusters = [[words[0]] + [w for w in words if w.lower() in {"he", "she", "they"}]]
+
+    def get_clusters(self):
+        return self.clusters
+
+
+@pytest.fixture
+def fake_fcoref(monkeypatch):
+    from processing import nlp_coref
+    model = FakeFCoref()
+    monkeypatch.setattr(nlp_coref, "get_fcoref", lambda: model)
+    yield model
+    nlp_coref.stop_batching()
+
+
+FASTCOREF_TEXTS = [
+    ("@**Alice Smith (she/her)**", "Alice said she left."),
+    ("@**Bob Jones (he/him)**", "Bob said they left."),
+    ("@**Sam Lee (they/them)**", "Sam said he left."),
+]
+
+
+def test_fastcoref_batch_uses_one_predict_call(fake_fcoref):
+    from src.mentions import get_mentions
+
+    backend = backends.get_backend("fastcoref")
+    texts = [text for _, text in FASTCOREF_TEXTS]
+    mentions = [get_mentions(tag) for tag, _ in FASTCOREF_TEXTS]
+
+    batched = backend.analyze_batch(texts, mentions)
+    assert fake_fcoref.calls == [texts]
+
+    per_text = [backend.analyze(text, m) for text, m in zip(texts, mentions)]
+    assert [r.mappings for r in batched] == [r.mappings for r in per_text]
+    assert batched[0].mappings == {"Alice_Smith": ["she"]}
+
+
+def test_fastcoref_batching_groups_concurrent_analyze_calls(fake_fcoref):
+    from src.mentions import get_mentions
+
+    backend = backends.get_backend("fastcoref")
+    backend.start_batching(max_batch_size=len(FASTCOREF_TEXTS), window_ms=2000)
+
+    results = {}
+    def analyze(tag, text):
+        results[text] = backend.analyze(text, get_mentions(tag)).mappings
+
+    threads = [threading.Thread(target=analyze, args=pair) for pair in FASTCOREF_TEXTS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    backend.stop_batching()
+
+    assert len(fake_fcoref.calls) == 1
+    assert sorted(fake_fcoref.calls[0]) == sorted(text for _, text in FASTCOREF_TEXTS)
+    assert results["Bob said they left."] == {"Bob_Jones": ["they"]}
@@ -0,0 +1,107 @@
+###############################################################################
+##  `test_batching.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests micro-batching of coref requests through `nlp.pipe`       ##
+###############################################################################
+
+
+import threading
+
+import pytest
+from processing.batching import CorefBatcher
+
+
+class FakeNLP:
+    # Stands in for spaCy pipeline: records each `pipe` call's batch
+    def __init__(self):
+        self.batches = []
+
+    def pipe(self, texts, batch_size=1):
+        texts = list(texts)
+        self.batches.append(texts)
+        return [text.upper() for text in texts]
+
+
+@pytest.fixture
+def fake_nlp():
+    return FakeNLP()
+
+
+# -----------------------------
+# Fan-out of results
+# -----------------------------
+def test_results_returned_to_matching_request(fake_nlp):
+    batcher = CorefBatcher(lambda: fake_nlp, max_batch_size=4, window_ms=20)
+    batcher.start()
+    try:
+        futures = [batcher.submit(t) for t in ["a", "b", "c"]]
+        assert [f.result(timeout=2) for f in futures] == ["A", "B", "C"]
+    finally:
+        batcher.stop()
+
+
+def test_burst_grouped_into_one_pipe_call(fake_nlp):
+    batcher = CorefBatcher(lambda: fake_nlp, max_batch_size=8, window_ms=200)
+    batcher.start()
+    try:
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        for f in futures:
+            f.result(timeout=2)
+    finally:
+        batcher.stop()
+
+    assert fake_nlp.batches == [["0", "1", "2", "3", "4"]]
+    assert batcher.docs_processed == 5
+
+
+def test_batch_size_capped(fake_nlp):
+    batcher = CorefBatcher(lambda: fake_nlp, max_batch_size=2, window_ms=200)
+    batcher.start()
+    try:
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        for f in futures:
+            f.result(timeout=2)
+    finally:
+        batcher.stop()
+
+    assert all(len(batch) <= 2 for batch in fake_nlp.batches)
+    assert sum(len(batch) for batch in fake_nlp.batches) == 5
+
+
+# -----------------------------
+# Errors & shutdown
+# -----------------------------
+def test_pipe_error_propagates_to_every_request():
+    class BrokenNLP:
+        def pipe(self, texts, batch_size=1):
+            raise RuntimeError("model exploded")
+
+    batcher = CorefBatcher(lambda: BrokenNLP(), max_batch_size=4, window_ms=20)
+    batcher.start()
+    try:
+        futures = [batcher.submit(t) for t in ["a", "b"]]
+        for f in futures:
+            with pytest.raises(RuntimeError):
+                f.result(timeout=2)
+    finally:
+        batcher.stop()
+
+
+def test_stop_drains_pending_requests(fake_nlp):
+    gate = threading.Event()
+
+    class SlowNLP(FakeNLP):
+        def pipe(self, texts, batch_size=1):
+            gate.wait(timeout=2)
+            return super().pipe(texts, batch_size)
+
+    slow = SlowNLP()
+    batcher = CorefBatcher(lambda: slow, max_batch_size=1, window_ms=0)
+    batcher.start()
+
+    futures = [batcher.submit(t) for t in ["x", "y", "z"]]
+    gate.set()
+    batcher.stop()
+
+    assert [f.result(timeout=2) for f in futures] == ["X", "Y", "Z"]
+    assert not batcher.running
@@ -0,0 +1,67 @@
+###############################################################################
+##  `test_benchmarks.py`                                                     ##
+##                                                                           ##
+##  Purpose: Tests synthetic message generator & stage benchmark report      ##
+###############################################################################
+
+
+import pytest
+from src.mentions import get_mentions
+from processing import backends
+from benchmarks.synthetic import MessageSpec, generate_messages
+from benchmarks.bench_stages import STAGES, NoCorefBackend, percentile, summarize, run_benchmark
+from benchmarks.bench_mentions import HOSTILE_INPUTS, bench_hostile, bench_typical
+from benchmarks.bench_startup import measure_import
+
+
+def test_generator_is_deterministic():
+    spec = MessageSpec(sentences=10, mentions=2)
+    assert generate_messages(spec, 3, seed=7) == generate_messages(spec, 3, seed=7)
+    assert generate_messages(spec, 3, seed=7) != generate_messages(spec, 3, seed=8)
+
+
+def test_generator_scales_length_and_mentions():
+    short = generate_messages(MessageSpec(sentences=3, mentions=1), 5)
+    long = generate_messages(MessageSpec(sentences=60, mentions=3), 5)
+
+    assert sum(map(len, long)) > 5 * sum(map(len, short))
+    assert all(len(get_mentions(text)) == 1 for text in short)
+    assert all(len(get_mentions(text)) == 3 for text in long)
+
+
+def test_percentiles():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(0.050, abs=0.002)
+    assert percentile(values, 99) == pytest.approx(0.099, abs=0.002)
+    assert percentile([], 95) == 0.0
+
+    summary = summarize(values)
+    assert summary["count"] == 100
+    assert summary["p50_ms"] <= summary["p95_ms"] <= summary["p99_ms"]
+
+
+def test_run_benchmark_without_coref(monkeypatch):
+    monkeypatch.setattr(backends, "DEFAULT_BACKEND", NoCorefBackend.name)
+
+    report = run_benchmark(MessageSpec(sentences=8, mentions=2), messages=4, coref=False)
+    assert report["messages"] == 4
+    assert set(report["stages"]) == set(STAGES)
+    assert all(stage["count"] == 4 for stage in report["stages"].values())
+    assert report["end_to_end"]["throughput_per_s"] > 0
+
+
+def test_mention_benchmark_report():
+    typical = bench_typical(messages=20, mentions=2, seed=0, repeat=1)
+    assert set(typical["us_per_message"]) == {"regex", "scan_uncached", "scan_interned"}
+    assert typical["interned_tags"] > 0
+
+    hostile = bench_hostile([500, 1000], repeat=1, with_regex=True)
+    assert set(hostile) == set(HOSTILE_INPUTS)
+    assert all(len(shape["rows"]) == 2 for shape in hostile.values())
+    assert hostile["fragments_then_tag"]["rows"][-1]["scan_mentions"] == 1
+
+
+def test_bot_import_loads_no_heavy_modules():
+    report = measure_import("bot", repeat=1)
+    assert report["heavy_modules"] == []
+    assert report["import_seconds"] > 0
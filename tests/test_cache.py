@@ -0,0 +1,109 @@
+###############################################################################
+##  `test_cache.py`                                                          ##
+##                                                                           ##
+##  Purpose: Tests content-addressed result cache (LRU, TTL, SQLite tier)    ##
+###############################################################################
+
+
+import pytest
+from processing.cache import ResultCache, make_cache_key
+
+
+CLUSTERS = [["Alice", "She", "her"], ["Bob", "he"]]
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def test_key_depends_on_every_part():
+    base = make_cache_key("model", "1.0", "Alice is here.")
+
+    assert base == make_cache_key("model", "1.0", "Alice is here.")
+    assert base != make_cache_key("model", "1.1", "Alice is here.")
+    assert base != make_cache_key("model", "1.0", "Alice is there.")
+
+
+# -----------------------------
+# In-memory tier
+# -----------------------------
+def test_hit_and_miss_counted():
+    cache = ResultCache(max_entries=4)
+
+    assert cache.get("k") is None
+    cache.set("k", CLUSTERS)
+    assert cache.get("k") == CLUSTERS
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")      # `b` is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("processing.cache.time.time", lambda: now[0])
+
+    cache = ResultCache(max_entries=4, ttl_seconds=10)
+    cache.set("k", CLUSTERS)
+
+    now[0] += 5
+    assert cache.get("k") == CLUSTERS
+
+    now[0] += 10
+    assert cache.get("k") is None
+
+
+# -----------------------------
+# SQLite tier
+# -----------------------------
+def test_disk_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+
+    cache = ResultCache(max_entries=4, db_path=db_path)
+    cache.set("k", CLUSTERS)
+    cache.close()
+
+    restarted = ResultCache(max_entries=4, db_path=db_path)
+    assert restarted.get("k") == CLUSTERS
+    assert restarted.disk_hits == 1
+
+    # Promoted into memory, so second lookup doesn't touch disk
+    assert restarted.get("k") == CLUSTERS
+    assert restarted.hits == 1
+    restarted.close()
+
+
+def test_disk_tier_bounded(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("processing.cache.time.time", lambda: now[0])
+    db_path = str(tmp_path / "cache.sqlite3")
+
+    cache = ResultCache(max_entries=1, db_path=db_path, max_disk_entries=2)
+    for key in ["a", "b", "c"]:
+        now[0] += 1
+        cache.set(key, key.upper())
+    cache.close()
+
+    restarted = ResultCache(max_entries=4, db_path=db_path)
+    assert restarted.get("a") is None
+    assert restarted.get("b") == "B"
+    assert restarted.get("c") == "C"
+    restarted.close()
+
+
+def test_invalid_table_name_rejected():
+    with pytest.raises(ValueError):
+        ResultCache(table="results; DROP TABLE x")
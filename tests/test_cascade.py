@@ -0,0 +1,124 @@
+###############################################################################
+##  `test_cascade.py`                                                        ##
+##                                                                           ##
+##  Purpose: Tests tiered validation cascade & its per-message budget        ##
+###############################################################################
+
+
+import pytest
+from processing import backends
+from src import cascade, mentions
+from src.parser import sanitize_content
+
+
+class WrongCorefBackend(backends.BaseBackend):
+    # Clusters every "he" with each mention (test-only backend)
+    name = "test-cascade-coref"
+    relative_cost = 1.0
+
+    def _analyze(self, text, mentions):
+        words = [w.strip(".,").lower() for w in text.split()]
+        return {m.first_name: [w for w in words if w == "he"] for m in mentions}, {}
+
+
+class ApprovingLLMBackend(backends.BaseBackend):
+    name = "test-cascade-llm"
+    relative_cost = 5.0
+
+    def _analyze(self, text, mentions):
+        return {}, {m.name: True for m in mentions}
+
+
+@pytest.fixture(autouse=True)
+def cascade_backends():
+    # Registered only while tests in this module run
+    for cls in (WrongCorefBackend, ApprovingLLMBackend):
+        backends.register_backend(cls)
+    yield
+    for cls in (WrongCorefBackend, ApprovingLLMBackend):
+        backends.unregister_backend(cls.name)
+
+
+def prepare(content):
+    tags = mentions.get_mentions(content)
+    return sanitize_content(content, tags), tags
+
+
+def run(content, budget=None):
+    text, tags = prepare(content)
+    return cascade.run_cascade(
+        text, tags, budget=budget,
+        coref_backend="test-cascade-coref", llm_backend="test-cascade-llm",
+    )
+
+
+# -----------------------------
+# Heuristic tier
+# -----------------------------
+def test_heuristic_clears_pronoun_near_other_person():
+    text, tags = prepare("@**Alice Smith (she/her)** met @**Bob Jones (he/him)** and Bob said he was late.")
+    settled, pending = cascade.heuristic_tier(text, tags)
+
+    assert set(settled) == {"Alice Smith", "Bob Jones"}
+    assert pending == []
+
+
+def test_heuristic_escalates_wrong_pronoun_next_to_name():
+    text, tags = prepare("@**Alice Smith (she/her)** said he was late.")
+    settled, pending = cascade.heuristic_tier(text, tags)
+
+    assert settled == {}
+    assert [m.name for m in pending] == ["Alice Smith"]
+
+
+def test_heuristic_escalates_pronoun_far_from_any_name():
+    filler = "x " * 150
+    text, tags = prepare(f"@**Alice Smith (she/her)** is here. {filler} Later he left.")
+    _, pending = cascade.heuristic_tier(text, tags)
+
+    assert [m.name for m in pending] == ["Alice Smith"]
+
+
+# -----------------------------
+# Escalation & budget
+# -----------------------------
+def test_clear_message_finishes_at_heuristic():
+    result = run("@**Bob Jones (he/him)** said he was late.")
+
+    assert result.tier == "heuristic"
+    assert result.results[0]["pronouns_match"]
+    assert result.cost == pytest.approx(cascade.HEURISTIC_COST)
+
+
+def test_llm_overrules_coref_mismatch(monkeypatch):
+    monkeypatch.setattr(cascade, "CASCADE_LLM_ENABLED", True)
+    result = run("@**Alice Smith (she/her)** said he was late.")
+
+    assert result.tier == "llm"
+    assert result.results[0]["pronouns_match"]
+
+
+def test_coref_verdict_stands_when_llm_unaffordable(monkeypatch):
+    monkeypatch.setattr(cascade, "CASCADE_LLM_ENABLED", True)
+    result = run("@**Alice Smith (she/her)** said he was late.", cascade.Budget(cost_limit=2.0))
+
+    assert result.tier == "coref"
+    assert result.budget_stops == ["llm"]
+    assert result.results[0]["mismatches"] == ["he"]
+
+
+def test_nothing_flagged_without_coref_budget():
+    result = run("@**Alice Smith (she/her)** said he was late.", cascade.Budget(cost_limit=0.5))
+
+    assert result.tier == "heuristic"
+    assert result.budget_stops == ["coref"]
+    assert result.results[0]["pronouns_match"]
+
+
+def test_results_follow_mention_order(monkeypatch):
+    monkeypatch.setattr(cascade, "CASCADE_LLM_ENABLED", False)
+    text, tags = prepare("@**Alice Smith (she/her)** said he was late, @**Bob Jones (he/him)** agreed.")
+    result = cascade.run_cascade(text, tags, coref_backend="test-cascade-coref")
+
+    assert [r["name"] for r in result.results] == [m.name for m in tags]
+    assert {r["name"]: r["pronouns_match"] for r in result.results} == {"Alice Smith": False, "Bob Jones": True}
@@ -0,0 +1,172 @@
+###############################################################################
+##  `test_directory.py`                                                      ##
+##                                                                           ##
+##  Purpose: Tests realm user directory & mention resolution through it      ##
+###############################################################################
+
+
+import time
+
+import pytest
+from src import directory
+from src.directory import UserDirectory, normalize_name, parse_pronouns
+from src.mentions import get_mentions
+
+
+FIELDS = [
+    {"id": 3, "name": "Batch", "type": 1},
+    {"id": 7, "name": "Pronouns", "type": 8},
+]
+
+
+def person(user_id, full_name, pronouns=None, **extra):
+    profile = {"7": {"value": pronouns}} if pronouns is not None else {}
+    return {"user_id": user_id, "full_name": full_name, "profile_data": profile, **extra}
+
+
+class FakeClient:
+    def __init__(self, members, fields=FIELDS):
+        self.members = members
+        self.fields = fields
+        self.member_calls = 0
+
+    def call_endpoint(self, url, method):
+        return {"result": "success", "custom_fields": self.fields}
+
+    def get_members(self, request):
+        self.member_calls += 1
+        return {"result": "success", "members": self.members}
+
+
+@pytest.fixture
+def users():
+    client = FakeClient([
+        person(1, "Alice Smith", "she/her"),
+        person(2, "Sam Chen (they/them) (S1'25)", ""),
+        person(3, "Jo Park", "he/him"),
+        person(4, "Jo Park", "she/her"),
+        person(5, "Old Account", "he/him", is_active=False),
+        person(6, "Helper Bot", is_bot=True),
+    ])
+    users = UserDirectory()
+    users.load(client)
+    return users
+
+
+def test_parse_pronouns():
+    assert parse_pronouns("She/Her") == (("she", "her"), False)
+    assert parse_pronouns("they/them, he/him") == (("they", "them", "he", "him"), False)
+    assert parse_pronouns("any pronouns") == (("any",), True)
+    assert parse_pronouns("") == ((), False)
+    assert parse_pronouns(None) == ((), False)
+
+
+def test_normalize_name_drops_parentheticals():
+    assert normalize_name("Sam  Chen (they/them) (S1'25)") == "sam chen"
+
+
+def test_load_skips_inactive_and_bots(users):
+    assert len(users) == 4
+    assert users.get(1).pronouns == ("she", "her")
+    assert users.get(5) is None
+    assert users.get(6) is None
+
+
+def test_find_by_name_only_when_unique(users):
+    assert users.find("alice smith").user_id == 1
+    assert users.find("Sam Chen").user_id == 2
+    assert users.find("Jo Park") is None # 2 members share it
+    assert users.stats()["ambiguous_names"] == 1
+
+
+def test_resolve_by_user_id_disambiguates(users):
+    first, second = get_mentions("@**Jo Park|3** & @_**Jo Park|4**")
+
+    assert users.resolve(first).pronouns == ("he", "him")
+    assert users.resolve(second).pronouns == ("she", "her")
+    assert users.resolve(second).silent
+
+
+def test_resolve_fills_missing_pronouns(users):
+    mention = get_mentions("@**Alice Smith** said hi")[0]
+    resolved = users.resolve(mention)
+
+    assert mention.pronouns == ()
+    assert resolved.pronouns == ("she", "her")
+    assert resolved.user_id == 1
+
+
+def test_resolve_keeps_name_tag_pronouns_when_profile_empty(users):
+    mention = get_mentions("@**Sam Chen (they/them) (S1'25)** said hi")[0]
+    assert users.resolve(mention).pronouns == ("they", "them")
+
+
+def test_resolve_prefers_name_tag_pronouns_over_profile(users):
+    # Profile field may lag an edit (or directory may be stale), so pronouns
+    # written in tag are checked against
+    mention = get_mentions("@**Alice Smith (they/them)** said hi")[0]
+    resolved = users.resolve(mention)
+
+    assert resolved.pronouns == ("they", "them")
+    assert resolved.user_id == 1
+
+
+def test_realm_user_events(users):
+    users.observe_event({"type": "realm_user", "op": "add", "person": person(8, "Kai Wu", "xe/xem")})
+    assert users.find("Kai Wu").pronouns == ("xe", "xem")
+
+    users.observe_event({"type": "realm_user", "op": "update", "person": {"user_id": 8, "custom_profile_field": {"id": 7, "value": "they/them"}}})
+    assert users.get(8).pronouns == ("they", "them")
+
+    users.observe_event({"type": "realm_user", "op": "update", "person": {"user_id": 8, "full_name": "Kai Wu-Lee"}})
+    assert users.find("Kai Wu") is None
+    assert users.find("Kai Wu-Lee").pronouns == ("they", "them")
+
+    users.observe_event({"type": "realm_user", "op": "update", "person": {"user_id": 8, "is_active": False}})
+    assert users.get(8) is None
+
+    users.observe_event({"type": "realm_user", "op": "remove", "person": {"user_id": 1}})
+    assert users.find("Alice Smith") is None
+
+
+def test_refresh_only_when_stale():
+    client = FakeClient([person(1, "Alice Smith", "she/her")])
+    users = UserDirectory()
+    users.load(client)
+
+    users.refresh_if_stale(client, max_age=3600)
+    assert client.member_calls == 1
+    users.refresh_if_stale(client, max_age=0)
+    assert client.member_calls == 2
+
+
+def test_background_refresh_reloads_off_message_path():
+    client = FakeClient([person(1, "Alice Smith", "she/her")])
+    users = UserDirectory()
+    users.load(client)
+
+    users.start_refresh(client, interval=0.01)
+    try:
+        deadline = time.monotonic() + 5
+        while client.member_calls < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        users.stop_refresh()
+
+    assert client.member_calls >= 3
+
+
+def test_resolve_mentions_without_directory_is_noop():
+    directory.disable_user_directory()
+    mentions = get_mentions("@**Alice Smith** said hi")
+    assert directory.resolve_mentions(mentions) == mentions
+
+
+def test_enabled_directory_used_by_resolve_mentions():
+    directory.disable_user_directory()
+    try:
+        directory.enable_user_directory(FakeClient([person(1, "Alice Smith", "she/her")]))
+        resolved = directory.resolve_mentions(get_mentions("@**Alice Smith** said hi"))
+        assert resolved[0].pronouns == ("she", "her")
+    finally:
+        directory.disable_user_directory()
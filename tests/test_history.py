@@ -0,0 +1,127 @@
+###############################################################################
+##  `test_history.py`                                                        ##
+##                                                                           ##
+##  Purpose: Tests per-topic message history & context window source         ##
+###############################################################################
+
+
+import pytest
+from src.history import TopicHistory, enable_topic_history, disable_topic_history
+from src.context import get_previous_messages
+
+
+def message_event(message_id, content="hi", stream_id=1, topic="Check-ins"):
+    return {
+        "type": "message",
+        "message": {
+            "type": "stream", "id": message_id, "stream_id": stream_id, "subject": topic,
+            "sender_id": 7, "sender_full_name": "Sam Chen", "content": content,
+        },
+    }
+
+
+class FakeClient:
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = 0
+
+    def get_messages(self, request):
+        self.calls += 1
+        return {"result": "success", "messages": self.messages[-request["num_before"]:]}
+
+
+@pytest.fixture
+def history():
+    return TopicHistory(size=10)
+
+
+def test_cold_until_enough_messages_seen(history):
+    for i in range(1, 5):
+        history.observe_event(message_event(i))
+    assert history.recent(1, "Check-ins", 5) is None
+
+    history.observe_event(message_event(5))
+    assert [m["id"] for m in history.recent(1, "check-ins", 5)] == [1, 2, 3, 4, 5]
+
+
+def test_ring_buffer_keeps_latest(history):
+    for i in range(1, 16):
+        history.observe_event(message_event(i))
+    assert [m["id"] for m in history.recent(1, "Check-ins", 3)] == [13, 14, 15]
+    assert history.stats()["messages"] == 10
+
+
+def test_private_messages_ignored(history):
+    event = message_event(1)
+    event["message"]["type"] = "private"
+    history.observe_event(event)
+    assert len(history) == 0
+
+
+def test_seed_makes_short_topic_warm(history):
+    history.observe_event(message_event(3))
+    history.seed(1, "Check-ins", [{"id": 1, "content": "a"}, {"id": 2, "content": "b"}])
+
+    assert [m["id"] for m in history.recent(1, "Check-ins", 5)] == [1, 2, 3]
+
+
+def test_edit_updates_content(history):
+    for i in range(1, 6):
+        history.observe_event(message_event(i, content=f"old {i}"))
+    history.observe_event({"type": "update_message", "message_id": 3, "message_ids": [3], "content": "new 3"})
+
+    contents = [m["content"] for m in history.recent(1, "Check-ins", 5)]
+    assert contents == ["old 1", "old 2", "new 3", "old 4", "old 5"]
+
+
+def test_delete_removes_message_and_topic_goes_cold(history):
+    for i in range(1, 6):
+        history.observe_event(message_event(i))
+    history.observe_event({"type": "delete_message", "message_id": 4, "stream_id": 1, "topic": "Check-ins"})
+
+    assert history.recent(1, "Check-ins", 5) is None
+    assert [m["id"] for m in history.recent(1, "Check-ins", 4)] == [1, 2, 3, 5]
+
+
+def test_topic_move(history):
+    for i in range(1, 6):
+        history.observe_event(message_event(i))
+        history.observe_event(message_event(10 + i, topic="Other"))
+
+    history.observe_event({
+        "type": "update_message", "message_id": 5, "message_ids": [5],
+        "stream_id": 1, "orig_subject": "Check-ins", "subject": "Other",
+    })
+
+    assert [m["id"] for m in history.recent(1, "Check-ins", 4)] == [1, 2, 3, 4]
+    assert history.recent(1, "Other", 1) is None # order unknown, refetch
+
+
+def test_bounded_by_topics_and_bytes():
+    history = TopicHistory(size=10, max_topics=2, max_bytes=50)
+    for topic in ["a", "b", "c"]:
+        history.observe_event(message_event(hash(topic) % 1000, topic=topic))
+    assert len(history) == 2
+
+    history.observe_event(message_event(5000, content="x" * 60, topic="d"))
+    assert history.stats()["bytes"] <= 50
+
+
+def test_context_uses_history_then_api():
+    client = FakeClient([{"id": i, "content": f"api {i}"} for i in range(1, 6)])
+
+    disable_topic_history()
+    get_previous_messages(client, 1, "Check-ins")
+    assert client.calls == 1
+
+    history = enable_topic_history(size=10)
+    try:
+        # Cold topic: fetched once, then served from memory (incl. new events)
+        get_previous_messages(client, 1, "Check-ins")
+        history.observe_event(message_event(6, content="live 6"))
+        messages = get_previous_messages(client, 1, "Check-ins")
+
+        assert client.calls == 2
+        assert [m["content"] for m in messages] == ["api 2", "api 3", "api 4", "api 5", "live 6"]
+    finally:
+        disable_topic_history()
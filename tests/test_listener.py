@@ -0,0 +1,194 @@
+###############################################################################
+##  `test_listener.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests asyncio event listener (polling, dispatch, concurrency)   ##
+###############################################################################
+
+
+import asyncio
+import threading
+import time
+
+import pytest
+from src.listener import AsyncEventListener
+
+
+def message_event(event_id, content="hello"):
+    return {
+        "id": event_id,
+        "type": "message",
+        "message": {
+            "type": "stream", "stream_id": 1, "subject": "topic",
+            "id": 100 + event_id, "sender_id": 7,
+            "sender_email": "a@example.com", "sender_full_name": "A B",
+            "content": content,
+        },
+    }
+
+
+class FakeClient:
+    # Serves scripted `get_events` responses, then stops listener
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.registrations = 0
+        self.listener = None
+
+    def register(self, event_types=None, **kwargs):
+        self.registrations += 1
+        return {"result": "success", "queue_id": f"q{self.registrations}", "last_event_id": -1}
+
+    def get_events(self, queue_id, last_event_id):
+        if not self.responses:
+            self.listener.stop()
+            return {"result": "success", "events": []}
+        return self.responses.pop(0)
+
+
+def run_listener(client, **kwargs):
+    listener = AsyncEventListener(client, **kwargs)
+    client.listener = listener
+    asyncio.run(listener.run())
+    return listener
+
+
+# -----------------------------
+# Dispatch
+# -----------------------------
+def test_events_scanned_and_heartbeats_skipped():
+    scanned = []
+    client = FakeClient([
+        {"result": "success", "events": [message_event(0, "first"), {"id": 1, "type": "heartbeat"}]},
+        {"result": "success", "events": [message_event(2, "second")]},
+    ])
+
+    listener = run_listener(client, scan=lambda message, c: scanned.append(message["content"]))
+
+    assert sorted(scanned) == ["first", "second"]
+    assert listener.last_event_id == 2
+    assert listener.events_received == 2
+
+
+def test_forward_receives_raw_events():
+    forwarded = []
+    client = FakeClient([{"result": "success", "events": [message_event(0)]}])
+
+    run_listener(client, forward=forwarded.append)
+
+    assert [e["id"] for e in forwarded] == [0]
+
+
+def test_realm_user_events_observed_not_scanned():
+    seen, scanned = [], []
+
+    class Directory:
+        def observe_event(self, event):
+            seen.append(event["type"])
+
+    realm_user = {"id": 1, "type": "realm_user", "op": "update", "person": {"user_id": 3}}
+    client = FakeClient([{"result": "success", "events": [message_event(0), realm_user]}])
+
+    run_listener(client, scan=lambda message, c: scanned.append(message["id"]), directory=Directory())
+
+    assert seen == ["message", "realm_user"]
+    assert scanned == [100]
+
+
+def test_bad_queue_reregisters():
+    client = FakeClient([
+        {"result": "error", "code": "BAD_EVENT_QUEUE_ID", "msg": "Bad event queue id"},
+        {"result": "success", "events": []},
+    ])
+
+    run_listener(client, scan=lambda m, c: None)
+    assert client.registrations == 2
+
+
+def test_scan_failure_does_not_stop_listener():
+    def broken_scan(message, client):
+        raise RuntimeError("coref crashed")
+
+    client = FakeClient([{"result": "success", "events": [message_event(0), message_event(1)]}])
+    listener = run_listener(client, scan=broken_scan)
+
+    assert listener.events_failed == 2
+
+
+# -----------------------------
+# Concurrency
+# -----------------------------
+def test_slow_message_does_not_block_next():
+    release = threading.Event()
+    finished = []
+
+    def scan(message, client):
+        if message["content"] == "slow":
+            release.wait(timeout=5)
+            finished.append("slow")
+        else:
+            # Fast message completes while slow one is still waiting
+            finished.append("fast")
+            release.set()
+
+    client = FakeClient([{"result": "success", "events": [message_event(0, "slow"), message_event(1, "fast")]}])
+
+    start = time.monotonic()
+    run_listener(client, scan=scan, scan_threads=2)
+
+    assert finished == ["fast", "slow"]
+    assert time.monotonic() - start < 5
+
+
+def test_staged_scan_runs_api_calls_off_scan_threads(monkeypatch):
+    # Context fetch & DM go through `call_api` (I/O pool), only coref stages
+    # run on scan pool
+    from src import listener as listener_module
+
+    threads = {}
+
+    def record(stage, result=None):
+        def stage_fn(*args):
+            threads[stage] = threading.current_thread().name
+            return result
+        return stage_fn
+
+    monkeypatch.setattr(listener_module, "find_mismatches", record("find", (["m"], [{"name": "X"}])))
+    monkeypatch.setattr(listener_module, "get_context_messages", record("fetch", []))
+    monkeypatch.setattr(listener_module, "reconcile_with_context", record("reconcile", [{"name": "X"}]))
+    monkeypatch.setattr(listener_module, "notify_mismatch", record("notify"))
+
+    client = FakeClient([{"result": "success", "events": [message_event(0, "@**X (he)** she")]}])
+    listener = run_listener(client)
+
+    assert listener.events_failed == 0
+    assert threads["find"].startswith("scan") and threads["reconcile"].startswith("scan")
+    assert threads["fetch"].startswith("zulip-io") and threads["notify"].startswith("zulip-io")
+
+
+def test_forward_runs_on_own_pool():
+    threads = []
+    client = FakeClient([{"result": "success", "events": [message_event(0)]}])
+
+    run_listener(client, forward=lambda event: threads.append(threading.current_thread().name))
+
+    assert threads[0].startswith("forward")
+
+
+def test_dispatch_waits_when_too_many_events_pending():
+    release = threading.Event()
+    peak, running = [0], [0]
+    lock = threading.Lock()
+
+    def scan(message, client):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(timeout=0.2)
+        with lock:
+            running[0] -= 1
+
+    events = [message_event(i) for i in range(6)]
+    client = FakeClient([{"result": "success", "events": events}])
+    listener = run_listener(client, scan=scan, scan_threads=6, max_pending=2)
+
+    assert peak[0] <= 2
+    assert listener.events_received == 6
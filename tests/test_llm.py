@@ -0,0 +1,151 @@
+###############################################################################
+##  `test_llm.py`                                                            ##
+##                                                                           ##
+##  Purpose: Tests LLM validator fan-out & keep-alive against local server   ##
+###############################################################################
+
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from processing import llm
+from processing.cache import ResultCache
+from src.mentions import get_mentions
+
+
+# Stand-in for LLM endpoint: "false" for Sam, "true" for everyone else
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+    delay = 0.3
+    connections = set()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][0]["content"]
+        FakeLLMHandler.connections.add(self.client_address)
+        FakeLLMHandler.requests += 1
+
+        time.sleep(self.delay)
+        answer = b"false" if "Sam uses" in prompt else b"true"
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(answer)))
+        self.end_headers()
+        self.wfile.write(answer)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    FakeLLMHandler.connections = set()
+    FakeLLMHandler.requests = 0
+    FakeLLMHandler.delay = 0.3
+
+    # Fresh, memory-only verdict cache per test
+    monkeypatch.setattr(llm, "_cache", ResultCache(table="llm_verdicts"))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    monkeypatch.setattr(llm, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/")
+    llm.close_session()
+    yield FakeLLMHandler
+
+    llm.close_session()
+    server.shutdown()
+    server.server_close()
+
+
+MENTIONS = get_mentions(
+    "@**Sam Chen (ze/zir) (S1'25)** @**Maya Ortiz (she/they) (W1'24)** "
+    "@**Lee Grant (he/him) (F2'23)** @**Riley Moss (xe/xem) (S2'25)**"
+)
+
+
+def test_mentions_validated_concurrently(fake_llm):
+    start = time.perf_counter()
+    results = llm.validate_pronouns_with_llm("Some text.", MENTIONS)
+    elapsed = time.perf_counter() - start
+
+    verdicts = {r["name"]: r["pronouns_match"] for r in results}
+    assert verdicts == {"Sam Chen": False, "Maya Ortiz": True, "Lee Grant": True, "Riley Moss": True}
+
+    # 4 prompts x 0.3s would take 1.2s one after another
+    assert elapsed < 4 * fake_llm.delay * 0.75
+
+
+def test_connections_reused_across_messages(fake_llm):
+    for i in range(3):
+        llm.validate_pronouns_with_llm(f"Some text {i}.", MENTIONS)
+
+    # 12 prompts over at most `LLM_MAX_CONCURRENCY` keep-alive connections
+    assert len(fake_llm.connections) <= llm.LLM_MAX_CONCURRENCY
+
+
+def test_deadline_bounds_whole_message(fake_llm):
+    fake_llm.delay = 2.0
+
+    start = time.perf_counter()
+    results = llm.validate_pronouns_with_llm("Some text.", MENTIONS, deadline_seconds=0.5)
+    elapsed = time.perf_counter() - start
+
+    assert results == []
+    assert elapsed < 1.5
+
+
+def test_mentions_without_pronouns_skipped(fake_llm):
+    mentions = get_mentions("@**Alex Doe** @**Lee Grant (he/him) (F2'23)**")
+    results = llm.validate_pronouns_with_llm("Some text.", mentions)
+    assert [r["name"] for r in results] == ["Lee Grant"]
+
+
+def test_repeat_check_served_from_cache(fake_llm):
+    first = llm.validate_pronouns_with_llm("Some text.", MENTIONS)
+    assert fake_llm.requests == 4
+
+    start = time.perf_counter()
+    second = llm.validate_pronouns_with_llm("Some text.", MENTIONS)
+    assert time.perf_counter() - start < fake_llm.delay
+    assert fake_llm.requests == 4
+    assert second == first
+
+    stats = llm.get_llm_cache().stats()
+    assert stats["hits"] == 4
+    assert stats["hit_rate"] == 0.5
+
+    # Different text is a different question
+    llm.validate_pronouns_with_llm("Other text.", MENTIONS)
+    assert fake_llm.requests == 8
+
+
+def test_failed_prompts_not_cached(fake_llm):
+    fake_llm.delay = 2.0
+    llm.validate_pronouns_with_llm("Some text.", MENTIONS, deadline_seconds=0.3)
+    assert llm.get_llm_cache().stats()["entries"] == 0
+
+
+def test_cache_key_parts():
+    key = llm.llm_cache_key("Text", "Sam", ("ze", "zir"))
+    assert key == llm.llm_cache_key("Text", "Sam", ("ze", "zir"))
+    assert key != llm.llm_cache_key("Text", "Sam", ("ze",))
+    assert key != llm.llm_cache_key("Text", "Lee", ("ze", "zir"))
+    assert key != llm.llm_cache_key("Text!", "Sam", ("ze", "zir"))
+
+
+def test_verdicts_persist_in_sqlite(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    key = llm.llm_cache_key("Text", "Sam", ("ze", "zir"))
+
+    ResultCache(db_path=path, table="llm_verdicts").set(key, False)
+    assert ResultCache(db_path=path, table="llm_verdicts").get(key) is False
+
+
+def test_parse_verdict():
+    assert llm.parse_verdict("true") is True
+    assert llm.parse_verdict("false") is False
+    assert llm.parse_verdict("maybe") is None
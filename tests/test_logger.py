@@ -7,6 +7,7 @@
 
 import unittest
 import sys
+import json
 from io import StringIO
 from unittest.mock import patch
 
@@ -14,7 +15,9 @@ from src.logger import (
     log_info, log_debug, log_error, log_warning,
     log_section_start, log_section_end,
     log_original_text, log_nlp_clusters, log_cluster_mapping,
-    log_validation_results, log_mention_info, force_flush
+    log_validation_results, log_mention_info, force_flush,
+    set_log_level, set_log_format, bind_message_id,
+    start_async_logging, stop_async_logging, LogWriter
 )
 
 
@@ -184,6 +187,74 @@ class TestLogger(unittest.TestCase):
             self.assertEqual(calls[1][1]['flush'], False)
 
 
+
+class TestStructuredLogger(unittest.TestCase):
+    def setUp(self):
+        self.original_stdout = sys.stdout
+        self.captured_output = StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        stop_async_logging()
+        set_log_level("DEBUG")
+        set_log_format("text")
+        sys.stdout = self.original_stdout
+
+    def test_level_gating(self):
+        set_log_level("INFO")
+        log_debug("Hidden message")
+        log_info("Shown message")
+
+        output = self.captured_output.getvalue()
+        self.assertNotIn("Hidden message", output)
+        self.assertIn("Shown message", output)
+
+    def test_disabled_debug_skips_document_dumps(self):
+        set_log_level("INFO")
+        log_original_text("Secret body of a very long message")
+        log_nlp_clusters([["John", "he"]])
+
+        output = self.captured_output.getvalue()
+        self.assertNotIn("Secret body", output)
+        self.assertNotIn("John -> he", output)
+        self.assertIn("Length: 34 characters", output)
+
+    def test_unknown_level_rejected(self):
+        with self.assertRaises(ValueError):
+            set_log_level("VERBOSE")
+
+    def test_json_lines_with_message_id(self):
+        set_log_format("json")
+        with bind_message_id(42):
+            log_section_start("MESSAGE SCAN")
+            log_warning("Inside scan")
+        log_info("Outside scan")
+
+        records = [json.loads(line) for line in self.captured_output.getvalue().splitlines()]
+        self.assertEqual([r["msg"] for r in records], ["START: MESSAGE SCAN", "Inside scan", "Outside scan"])
+        self.assertEqual(records[1]["level"], "WARN")
+        self.assertEqual(records[1]["message_id"], 42)
+        self.assertNotIn("message_id", records[2])
+
+    def test_async_writer_flushes_on_stop(self):
+        start_async_logging()
+        with patch("builtins.print") as mock_print:
+            for i in range(100):
+                log_info(f"Queued {i}")
+            mock_print.assert_not_called() # hot path never prints directly
+        stop_async_logging()
+
+        lines = self.captured_output.getvalue().splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertIn("Queued 99", lines[-1])
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        writer = LogWriter(max_queue=1) # never started, so nothing drains
+        writer.put((0.0, "INFO", "first", None))
+        writer.put((0.0, "INFO", "second", None))
+        self.assertEqual(writer.dropped, 1)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,132 @@
+###############################################################################
+##  `test_logsink.py`                                                        ##
+##                                                                           ##
+##  Purpose: Tests compressed log segments, index, rotation, & reader        ##
+###############################################################################
+
+
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+
+import src.logsink as logsink
+from src.logger import add_sink, remove_sink, log_info, bind_message_id
+from src.logsink import SegmentSink, list_segments, read_index, query_logs, main
+
+
+def write_records(sink, count, start=1_000_000.0, message_id=None):
+    for i in range(count):
+        sink.write((start + i, "INFO", f"record {i}", message_id))
+
+
+def test_blocks_are_separate_members_with_index(tmp_path):
+    sink = SegmentSink(tmp_path, block_max_bytes=200, block_max_seconds=3600)
+    write_records(sink, 20)
+    sink.flush()
+
+    [segment] = list_segments(tmp_path)
+    blocks = read_index(segment)
+    assert len(blocks) > 1
+    assert sum(b.count for b in blocks) == 20
+    assert blocks[0].offset == 0
+    assert blocks[-1].offset + blocks[-1].length == os.path.getsize(segment)
+
+
+def test_quiet_block_flushed_without_another_write(tmp_path):
+    sink = SegmentSink(tmp_path, block_max_seconds=0.05)
+    sink.write((1_000_000.0, "INFO", "only record", None))
+
+    deadline = time.monotonic() + 5
+    while not list(query_logs(tmp_path)) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert [r["msg"] for r in query_logs(tmp_path)] == ["only record"]
+    sink.close()
+
+
+def test_layout_lines_not_stored(tmp_path):
+    sink = SegmentSink(tmp_path)
+    sink.write((1.0, None, "=" * 80, None))
+    sink.write((2.0, "INFO", "kept", None))
+    sink.flush()
+
+    assert [r["msg"] for r in query_logs(tmp_path)] == ["kept"]
+
+
+def test_time_range_only_decompresses_matching_blocks(tmp_path, monkeypatch):
+    sink = SegmentSink(tmp_path, block_max_bytes=200, block_max_seconds=3600)
+    write_records(sink, 50)
+    sink.flush()
+
+    decompressed = []
+    real_decompress = logsink.gzip.decompress
+    monkeypatch.setattr(logsink.gzip, "decompress", lambda data: decompressed.append(1) or real_decompress(data))
+
+    records = list(query_logs(tmp_path, since=1_000_010.0, until=1_000_012.0))
+    assert [r["msg"] for r in records] == ["record 10", "record 11", "record 12"]
+
+    [segment] = list_segments(tmp_path)
+    assert len(decompressed) < len(read_index(segment))
+
+
+def test_message_id_lookup(tmp_path):
+    sink = SegmentSink(tmp_path, block_max_bytes=200, block_max_seconds=3600)
+    write_records(sink, 10, start=100.0, message_id=1)
+    write_records(sink, 3, start=200.0, message_id=2)
+    write_records(sink, 10, start=300.0, message_id=3)
+    sink.flush()
+
+    records = list(query_logs(tmp_path, message_id="2"))
+    assert len(records) == 3
+    assert all(r["message_id"] == 2 for r in records)
+
+
+def test_rotates_by_size(tmp_path):
+    sink = SegmentSink(tmp_path, segment_max_bytes=1, block_max_bytes=100, block_max_seconds=3600)
+    write_records(sink, 30)
+    sink.flush()
+
+    segments = list_segments(tmp_path)
+    assert len(segments) > 1
+    assert len(list(query_logs(tmp_path))) == 30
+
+
+def test_expired_segments_deleted(tmp_path):
+    old = tmp_path / "pronoun-proofer-20200101-000000-1.log.gz"
+    old.write_bytes(b"")
+    (tmp_path / (old.name + ".idx")).write_text("")
+    stale = time.time() - 200 * 86400
+    os.utime(old, (stale, stale))
+
+    sink = SegmentSink(tmp_path, retention_days=180)
+    write_records(sink, 1)
+    sink.flush()
+
+    assert not old.exists()
+    assert len(list_segments(tmp_path)) == 1
+
+
+def test_logger_feeds_sink(tmp_path, capsys):
+    sink = SegmentSink(tmp_path)
+    add_sink(sink)
+    try:
+        with bind_message_id(77):
+            log_info("Scanning message")
+    finally:
+        remove_sink(sink)
+
+    [record] = query_logs(tmp_path)
+    assert record["msg"] == "Scanning message"
+    assert record["message_id"] == 77
+
+
+def test_reader_cli(tmp_path):
+    sink = SegmentSink(tmp_path)
+    write_records(sink, 3, start=time.time(), message_id=5)
+    sink.flush()
+
+    result = CliRunner().invoke(main, ["--dir", str(tmp_path), "--message-id", "5"])
+    assert result.exit_code == 0
+    assert "[INFO] [msg 5] record 2" in result.output
@@ -0,0 +1,88 @@
+###############################################################################
+##  `test_mappings.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests coref cluster -> mention matching & mismatch results      ##
+###############################################################################
+
+
+from src.mentions import get_mentions
+from src.parser import results_from_mappings
+from processing.nlp import normalize_name_token, map_names_to_pronouns, build_pronoun_mappings
+
+
+def test_normalize_name_token():
+    assert normalize_name_token("Adrien's") == "adrien"
+    assert normalize_name_token("Adrien’s") == "adrien"
+    assert normalize_name_token("ADRIEN,") == "adrien"
+    assert normalize_name_token("James'") == "james"
+
+
+def test_clusters_keyed_by_mention_id():
+    mentions = get_mentions("@**Alice Smith (she/her)** met @**Bob Jones|42**")
+    clusters = [["Alice", "she", "her"], ["Jones's", "he"], ["the cafe", "it"]]
+
+    mappings = map_names_to_pronouns(clusters, mentions)
+
+    assert mappings["Alice_Smith"] == ["Alice", "she", "her"]
+    assert mappings["Bob_Jones#42"] == ["Jones's", "he"]
+    assert mappings["the cafe"] == ["the cafe", "it"] # unmatched, keyed by first token
+
+
+def test_full_name_span_and_possessive_match():
+    mentions = get_mentions("@**Alice Smith (she/her)**")
+    mappings = build_pronoun_mappings([["Alice Smith", "she"], ["Alice's", "her"]], mentions)
+
+    assert mappings == {"Alice_Smith": ["she", "her"]}
+
+
+def test_shared_first_name_not_attributed_without_other_name():
+    mentions = get_mentions("@**Alex Kim (he/him)** & @**Alex Lee (she/her)**")
+    clusters = [["Alex", "he"], ["Lee", "she"]]
+
+    mappings = map_names_to_pronouns(clusters, mentions)
+
+    assert "Alex_Kim" not in mappings
+    assert mappings["Alex_Lee"] == ["Lee", "she"]
+    assert mappings["Alex"] == ["Alex", "he"]
+
+
+def test_shared_first_name_results_kept_apart():
+    mentions = get_mentions("@**Alex Kim (he/him)** & @**Alex Lee (she/her)**")
+    mappings = build_pronoun_mappings([["Alex Kim", "he"], ["Lee", "he"]], mentions)
+
+    results = {r["name"]: r for r in results_from_mappings(mentions, mappings)}
+
+    assert results["Alex Kim"]["pronouns_match"]
+    assert results["Alex Lee"]["mismatches"] == ["he"]
+
+
+def test_name_keyed_mappings_still_read():
+    # Backends keying by name (not mention id) still work, & a full-name key
+    # without first-name key no longer raises KeyError
+    mentions = get_mentions("@**Alice Smith (she/her)** & @**Bob Jones (he/him)**")
+    results = results_from_mappings(mentions, {"Alice": ["he"], "Bob Jones": ["he"]})
+
+    assert {r["name"]: r["pronouns_match"] for r in results} == {"Alice Smith": False, "Bob Jones": True}
+
+
+def test_first_name_key_ignored_when_shared():
+    mentions = get_mentions("@**Alex Kim (he/him)** & @**Alex Lee (she/her)**")
+    assert results_from_mappings(mentions, {"Alex": ["he"]}) == []
+
+
+def test_coordinated_span_not_merged_into_mention():
+    # "Alice and Bob" refers to both (neither one's pronouns apply to "they")
+    mentions = get_mentions("@**Alice Smith (she/her)** & @**Bob Jones (he/him)**")
+    mappings = build_pronoun_mappings([["Alice and Bob", "they", "them"]], mentions)
+
+    assert mappings == {"Alice and Bob": ["they", "them"]}
+    assert results_from_mappings(mentions, mappings) == []
+
+
+def test_possessive_noun_span_not_merged_into_mention():
+    # "Alice's mom" is someone else, only a lone "Alice's" names Alice
+    mentions = get_mentions("@**Alice Smith (he/him)**")
+    mappings = build_pronoun_mappings([["Alice's mom", "she", "her"]], mentions)
+
+    assert mappings == {"Alice's mom": ["she", "her"]}
+    assert results_from_mappings(mentions, mappings) == []
@@ -0,0 +1,96 @@
+###############################################################################
+##  `test_metrics.py`                                                        ##
+##                                                                           ##
+##  Purpose: Tests metrics registry, exposition format, & HTTP endpoint      ##
+###############################################################################
+
+
+import json
+import urllib.request
+
+import pytest
+from src.metrics import MetricsRegistry, start_metrics_server
+
+
+def test_counter_with_labels():
+    registry = MetricsRegistry()
+    events = registry.counter("events_total", "Events", ["type"])
+
+    events.inc(type="message")
+    events.inc(2, type="message")
+    events.inc(type="update_message")
+
+    assert events.value(type="message") == 3
+    assert events.value(type="update_message") == 1
+    assert 'events_total{type="message"} 3' in registry.render()
+
+
+def test_wrong_labels_rejected():
+    registry = MetricsRegistry()
+    events = registry.counter("events_total", "Events", ["type"])
+
+    with pytest.raises(ValueError):
+        events.inc(kind="message")
+
+
+def test_same_name_returns_same_metric():
+    registry = MetricsRegistry()
+    assert registry.counter("dms_total") is registry.counter("dms_total")
+
+    with pytest.raises(ValueError):
+        registry.gauge("dms_total")
+
+
+def test_gauge_reads_function_at_scrape_time():
+    registry = MetricsRegistry()
+    depth = registry.gauge("queue_depth", "Depth", ["queue"])
+
+    pending = [1, 2, 3]
+    depth.set_function(lambda: len(pending), queue="workers")
+    assert depth.value(queue="workers") == 3
+
+    pending.clear()
+    assert 'queue_depth{queue="workers"} 0' in registry.render()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Latency", ["stage"], buckets=[0.1, 1.0])
+
+    for value in [0.05, 0.5, 0.5, 5.0]:
+        latency.observe(value, stage="coref")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="coref",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="coref",le="1.0"} 3' in text
+    assert 'stage_seconds_bucket{stage="coref",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="coref"} 4' in text
+    assert latency.count(stage="coref") == 4
+
+
+def test_histogram_timer():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Latency", ["stage"])
+
+    with latency.time(stage="get_mentions"):
+        pass
+
+    assert latency.count(stage="get_mentions") == 1
+
+
+def test_http_endpoint():
+    registry = MetricsRegistry()
+    registry.counter("dms_total", "DMs sent").inc()
+
+    server = start_metrics_server(port=0, registry=registry)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert "dms_total 1" in response.read().decode()
+
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            assert json.load(response)["dms_total"] == {"": 1}
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,86 @@
+###############################################################################
+##  `test_models.py`                                                         ##
+##                                                                           ##
+##  Purpose: Tests process-wide model registry (load once, share instance)   ##
+###############################################################################
+
+
+import threading
+
+import pytest
+from processing import models
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    models.clear_models()
+    yield
+    models.clear_models()
+
+
+# -----------------------------
+# Shared instance
+# -----------------------------
+def test_get_model_loads_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return object()
+
+    first = models.get_model("fake", loader)
+    second = models.get_model("fake", loader)
+
+    assert first is second
+    assert len(calls) == 1
+
+
+def test_get_model_separate_keys():
+    a = models.get_model("a", lambda: ["a"])
+    b = models.get_model("b", lambda: ["b"])
+
+    assert a == ["a"]
+    assert b == ["b"]
+
+
+def test_get_model_concurrent_callers_load_once():
+    calls = []
+    gate = threading.Event()
+
+    def slow_loader():
+        gate.wait(timeout=1)
+        calls.append(1)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(models.get_model("slow", slow_loader)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+# -----------------------------
+# Stats
+# -----------------------------
+def test_model_stats_recorded():
+    models.get_model("fake", lambda: object())
+    stats = models.get_model_stats()["fake"]
+
+    assert stats["load_seconds"] >= 0
+    assert stats["rss_total_mb"] > 0
+
+
+def test_clear_models_forces_reload():
+    first = models.get_model("fake", lambda: object())
+    models.clear_models()
+    second = models.get_model("fake", lambda: object())
+
+    assert first is not second
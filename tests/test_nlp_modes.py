@@ -0,0 +1,42 @@
+###############################################################################
+##  `test_nlp_modes.py`                                                      ##
+##                                                                           ##
+##  Purpose: Tests heads-only serving mode agrees with full coref pipeline   ##
+###############################################################################
+
+
+import pytest
+from src.mentions import get_mentions
+from src.parser import sanitize_content
+from processing import nlp
+from examples.compare_pipelines import load_scenarios, normalize_mappings
+
+
+def mappings_for(text, heads_only):
+    mentions = get_mentions(text)
+    doc = nlp.get_nlp(heads_only)(sanitize_content(text, mentions))
+    clusters = nlp.extract_clusters(doc, heads_only)
+    return normalize_mappings(nlp.build_pronoun_mappings(clusters, mentions))
+
+
+# -----------------------------
+# Pipeline assembly
+# -----------------------------
+def test_heads_only_pipeline_drops_span_resolver():
+    pipe_names = nlp.get_nlp(heads_only=True).pipe_names
+
+    assert "coref" in pipe_names
+    assert not set(nlp.SPAN_RESOLVER_COMPONENTS) & set(pipe_names)
+
+
+def test_heads_only_reads_head_clusters():
+    doc = nlp.get_nlp(heads_only=True)("Sarah said she would call.")
+    assert all(key.startswith(nlp.HEAD_CLUSTER_PREFIX) for key in doc.spans)
+
+
+# -----------------------------
+# Parity on example scenarios
+# -----------------------------
+@pytest.mark.parametrize("label,text", load_scenarios())
+def test_heads_only_matches_full_pipeline(label, text):
+    assert mappings_for(text, heads_only=True) == mappings_for(text, heads_only=False)
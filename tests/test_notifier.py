@@ -84,3 +84,36 @@ def test_notify_writer_of_mismatch_no_pm_when_all_match(monkeypatch):
 
     mock_client.send_message.assert_not_called()
 
+
+
+# -----------------------------
+# Flagged phrase quoted in PM
+# -----------------------------
+def test_notify_quotes_only_flagged_phrases(monkeypatch):
+    monkeypatch.setenv("ZULIP_SITE", "https://zulip.example.com")
+
+    content = {
+        "id": 103,
+        "sender_id": 9,
+        "sender_email": "alice@example.com",
+        "sender_full_name": "Alice Smith",
+        "message_type": "stream",
+        "stream_id": 42,
+        "subject": "Team Updates"
+    }
+
+    # Context check narrowed mismatches to "she", so only its quote is sent
+    result = {
+        "name": "Bob Jones",
+        "pronouns": "he/him",
+        "pronouns_match": False,
+        "mismatches": ["she"],
+        "quotes": {"she": "@_**Bob Jones** said **she** was late.", "her": "ask **her**"},
+    }
+
+    mock_client = MagicMock()
+    notifier.notify_writer_of_mismatch(content, result, mock_client)
+
+    sent = mock_client.send_message.call_args[0][0]["content"]
+    assert "> @_**Bob Jones** said **she** was late." in sent
+    assert "ask **her**" not in sent
@@ -127,3 +127,58 @@ def test_any_pronouns_matches():
     assert all(r["pronouns_match"] for r in results)
 
 
+
+
+# -----------------------------
+# Pre-coref filter
+# -----------------------------
+def test_prefilter_skips_without_pronouns_in_text():
+    nametags = mentions.get_mentions("@**Alice Smith (she/her) (SP1'25)** ")
+
+    needed, reason = parser.check_coref_needed("Alice is coding today.", nametags)
+    assert not needed
+    assert reason == "no pronouns in text"
+
+
+def test_prefilter_skips_when_no_specific_pronouns():
+    nametags = mentions.get_mentions(
+        "@**Frank Liu (W1'19)** @**Jordan Z (any) (W2'15)** "
+    )
+
+    needed, _ = parser.check_coref_needed("Frank said he would help Jordan.", nametags)
+    assert not needed
+
+
+def test_prefilter_skips_when_all_pronouns_valid():
+    nametags = mentions.get_mentions("@**Dana Lee (she/they) (F1'24)** ")
+
+    needed, _ = parser.check_coref_needed("Dana shared her notes. They were great.", nametags)
+    assert not needed
+
+
+def test_prefilter_runs_coref_on_possible_mismatch():
+    nametags = mentions.get_mentions("@**Charlie (they/them) (Faculty)** ")
+
+    needed, reason = parser.check_coref_needed("Charlie said she is busy.", nametags)
+    assert needed
+    assert reason is None
+
+
+def test_prefilter_ignores_pronoun_substrings():
+    nametags = mentions.get_mentions("@**Bob Jones (he/him) (F2'24)** ")
+
+    needed, _ = parser.check_coref_needed("Bob hid the theme in the shell.", nametags)
+    assert not needed
+
+
+def test_prefilter_skip_returns_passing_results():
+    content = "Alice is coding today."
+    nametags = mentions.get_mentions("@**Alice Smith (she/her) (SP1'25)** ")
+
+    results = parser.validate_mentions_in_text(content, nametags)
+    assert results == [{
+        "name": "Alice Smith",
+        "pronouns": "she/her",
+        "pronouns_match": True,
+        "mismatches": []
+    }]
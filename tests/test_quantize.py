@@ -0,0 +1,70 @@
+###############################################################################
+##  `test_quantize.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests int8 dynamic quantization of pipeline PyTorch models      ##
+###############################################################################
+
+
+import pytest
+
+torch = pytest.importorskip("torch")
+thinc_api = pytest.importorskip("thinc.api")
+numpy = pytest.importorskip("numpy")
+
+from processing.quantize import quantize_pipeline
+
+
+class Pipe:
+    def __init__(self, model):
+        self.model = model
+
+
+class Pipeline:
+    # Just enough of spaCy `Language` for `quantize_pipeline` (`.pipeline`)
+    def __init__(self, *models):
+        self.pipeline = [(f"pipe{i}", Pipe(model)) for i, model in enumerate(models)]
+
+
+def linear_model(seed=0):
+    torch.manual_seed(seed)
+    layers = torch.nn.Sequential(torch.nn.Linear(32, 16), torch.nn.ReLU(), torch.nn.Linear(16, 4))
+    return thinc_api.PyTorchWrapper(layers)
+
+
+def is_dynamic_quantized(layer):
+    return "quantized.dynamic" in type(layer).__module__
+
+
+def test_linear_layers_become_dynamic_int8():
+    model = linear_model()
+    quantize_pipeline(Pipeline(model))
+
+    layers = model.shims[0]._model
+    assert is_dynamic_quantized(layers[0])
+    assert is_dynamic_quantized(layers[2])
+    assert not is_dynamic_quantized(layers[1]) # ReLU left as is
+
+
+def test_outputs_match_within_tolerance():
+    model = linear_model()
+    X = numpy.random.default_rng(0).random((8, 32), dtype="float32")
+
+    before = model.predict(X)
+    quantize_pipeline(Pipeline(model))
+    after = model.predict(X)
+
+    numpy.testing.assert_allclose(after, before, atol=0.05)
+
+
+def test_shared_shim_quantized_once(monkeypatch):
+    # Listeners reuse upstream transformer's shim, which must only be
+    # converted once
+    quantization = getattr(torch, "ao", torch).quantization
+    real_quantize, calls = quantization.quantize_dynamic, []
+    monkeypatch.setattr(quantization, "quantize_dynamic", lambda *a, **kw: calls.append(1) or real_quantize(*a, **kw))
+
+    model = linear_model()
+    quantize_pipeline(Pipeline(model, model))
+
+    assert len(calls) == 1
+    assert is_dynamic_quantized(model.shims[0]._model[0])
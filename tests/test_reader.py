@@ -108,3 +108,45 @@ def test_indifferent_pronouns():
     assert mentions[0].pronouns == ("indifferent",)
 
 
+# -----------------------------
+# Ordering, interning & hostile input
+# -----------------------------
+def test_mentions_keep_first_appearance_order():
+    content = "@**Bob Jones (he/him)** then @**Alice Smith (she/her)** then @**Bob Jones (he/him)**"
+    mentions = reader.get_mentions(content)
+
+    assert [m.name for m in mentions] == ["Bob Jones", "Alice Smith"]
+
+
+def test_repeated_tag_is_interned():
+    first = reader.get_mentions("@**Alice Smith (she/her)** is here")[0]
+    second = reader.get_mentions("later, @**Alice Smith (she/her)** left")[0]
+
+    assert first is second
+    assert not hasattr(first, "__dict__")
+
+
+def test_stray_openers_are_not_mentions():
+    content = "@**x " * 2000 + "@**Alice Smith (she/her)**"
+    mentions = reader.get_mentions(content)
+
+    assert [m.name for m in mentions] == ["Alice Smith"]
+
+
+def test_unterminated_and_oversized_tags_ignored():
+    content = "@**" + "a" * 100000 + "\n@**" + "b" * 1000 + "** and @**Alice Smith**"
+    mentions = reader.get_mentions(content)
+
+    assert [m.name for m in mentions] == ["Alice Smith"]
+
+
+def test_empty_tag_ignored():
+    assert reader.get_mentions("@**** hi") == []
+
+
+def test_tags_do_not_span_lines():
+    content = "@**Alice\nSmith** said hi to @**Bob Jones**"
+    mentions = reader.get_mentions(content)
+
+    assert [m.name for m in mentions] == ["Bob Jones"]
+
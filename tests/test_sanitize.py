@@ -0,0 +1,77 @@
+###############################################################################
+##  `test_sanitize.py`                                                       ##
+##                                                                           ##
+##  Purpose: Tests single-pass sanitizer, offset map & mismatch quoting      ##
+###############################################################################
+
+
+from src.mentions import get_mentions
+from src.parser import sanitize_content, sanitize_with_offsets, quote_mismatches
+
+
+MESSAGE = (
+    "Yesterday I met @**Alice Smith (she/her)** at the cafe. "
+    "Then @**Bob Jones (he/him)** said he saw her. "
+    "Later @**Alice Smith (she/her)** said he was late!"
+)
+
+
+def mismatch(name, *pronouns):
+    return {"name": name, "pronouns": "", "pronouns_match": False, "mismatches": list(pronouns)}
+
+
+def test_every_tag_replaced_in_one_pass():
+    mentions = get_mentions(MESSAGE)
+    assert sanitize_content(MESSAGE, mentions) == (
+        "Yesterday I met Alice at the cafe. Then Bob said he saw her. Later Alice said he was late!"
+    )
+
+
+def test_unknown_tags_left_alone():
+    content = "@**Alice Smith** & @**Bob Jones** left"
+    mentions = [m for m in get_mentions(content) if m.first_name == "Alice"]
+
+    assert sanitize_content(content, mentions) == "Alice & @**Bob Jones** left"
+
+
+def test_offsets_map_back_to_original():
+    sanitized = sanitize_with_offsets(MESSAGE, get_mentions(MESSAGE))
+    text = sanitized.text
+
+    cafe = text.index("cafe")
+    start, end = sanitized.to_original(cafe, cafe + 4)
+    assert MESSAGE[start:end] == "cafe"
+
+    # Replaced name maps to whole tag
+    bob = text.index("Bob")
+    start, end = sanitized.to_original(bob, bob + 3)
+    assert MESSAGE[start:end] == "@**Bob Jones (he/him)**"
+
+    last = len(text)
+    assert sanitized.to_original(last - 1, last) == (len(MESSAGE) - 1, len(MESSAGE))
+
+
+def test_quote_picks_pronoun_after_persons_tag():
+    sanitized = sanitize_with_offsets(MESSAGE, get_mentions(MESSAGE))
+    results = quote_mismatches(sanitized, [mismatch("Alice Smith", "he"), mismatch("Bob Jones", "her")])
+
+    # Mentions in quotes are silent, so DM doesn't ping anyone
+    assert results[0]["quotes"] == {"he": "Later @_**Alice Smith (she/her)** said **he** was late!"}
+    assert results[1]["quotes"] == {"her": "Then @_**Bob Jones (he/him)** said he saw **her**."}
+
+
+def test_long_sentence_quote_is_clipped():
+    content = "@**Alice Smith (she/her)** " + "very " * 100 + "he " + "much " * 100
+    sanitized = sanitize_with_offsets(content, get_mentions(content))
+    quote = quote_mismatches(sanitized, [mismatch("Alice Smith", "he")])[0]["quotes"]["he"]
+
+    assert quote.startswith("…") and quote.endswith("…")
+    assert "**he**" in quote
+    assert len(quote) < 200
+
+
+def test_passing_results_get_no_quotes():
+    sanitized = sanitize_with_offsets(MESSAGE, get_mentions(MESSAGE))
+    result = {"name": "Bob Jones", "pronouns": "he/him", "pronouns_match": True, "mismatches": []}
+
+    assert "quotes" not in quote_mismatches(sanitized, [result])[0]
@@ -0,0 +1,95 @@
+###############################################################################
+##  `test_tuner.py`                                                          ##
+##                                                                           ##
+##  Purpose: Tests worker topology layouts, selection, & persistence         ##
+###############################################################################
+
+
+import json
+
+import pytest
+import src.tuner as tuner
+from src.tuner import (
+    Topology, candidate_layouts, cpu_slices, max_processes_for_memory,
+    tune, save_topology, load_topology,
+)
+
+
+def test_candidate_layouts_never_oversubscribe():
+    layouts = candidate_layouts(8)
+    assert (1, 8) in layouts
+    assert (2, 4) in layouts
+    assert (8, 1) in layouts
+    assert all(processes * threads <= 8 for processes, threads in layouts)
+
+
+def test_candidate_layouts_use_every_core():
+    assert candidate_layouts(16) == [(1, 16), (2, 8), (4, 4), (8, 2), (16, 1)]
+    assert candidate_layouts(6) == [(1, 6), (2, 3), (3, 2), (6, 1)]
+
+
+def test_candidate_layouts_capped_by_max_processes():
+    assert candidate_layouts(16, max_processes=5) == [(1, 16), (2, 8), (4, 4)]
+
+
+def test_max_processes_for_memory():
+    assert max_processes_for_memory(1500, 8000) == 4 # 80% of 8000 MB
+    assert max_processes_for_memory(1500, 1000) == 1 # always at least 1
+    assert max_processes_for_memory(1500, None) is None
+
+
+def test_candidate_layouts_single_core():
+    assert candidate_layouts(1) == [(1, 1)]
+
+
+def test_cpu_slices_are_disjoint():
+    slices = cpu_slices([0, 1, 2, 3, 4, 5], processes=3, threads=2)
+    assert slices == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_tune_picks_fastest_layout(monkeypatch):
+    monkeypatch.setattr(tuner, "available_cpus", lambda: [0, 1, 2, 3])
+
+    # Pretend 2 x 2 is sweet spot
+    def fake_bench(processes, threads, texts, rounds, pin):
+        return 10.0 if (processes, threads) == (2, 2) else 1.0
+
+    best = tune(texts=["Sam said she would come."], rounds=1, pin=False, bench=fake_bench, max_processes=4)
+    assert (best.processes, best.threads) == (2, 2)
+    assert best.docs_per_second == 10.0
+    assert best.cores == 4
+
+
+def test_tune_caps_processes_by_measured_memory(monkeypatch):
+    monkeypatch.setattr(tuner, "available_cpus", lambda: list(range(8)))
+    monkeypatch.setattr(tuner, "available_memory_mb", lambda: 5000.0)
+
+    benched = []
+    def fake_bench(processes, threads, texts, rounds, pin):
+        benched.append((processes, threads))
+        return float(processes)
+
+    best = tune(texts=["Sam said she would come."], rounds=1, pin=False, bench=fake_bench, max_processes=None, measure=lambda: 1900.0)
+    assert benched == [(1, 8), (2, 4)] # 80% of 5000 MB fits 2 x 1900 MB
+    assert best.processes == 2
+
+
+def test_topology_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setattr(tuner, "available_cpus", lambda: [0, 1, 2, 3])
+    path = str(tmp_path / "topology.json")
+
+    topology = Topology(processes=2, threads=2, pin_cpus=True, docs_per_second=3.5, cores=4)
+    save_topology(topology, path)
+    assert load_topology(path) == topology
+
+
+def test_topology_ignored_on_different_core_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(tuner, "available_cpus", lambda: [0, 1])
+    path = tmp_path / "topology.json"
+    path.write_text(json.dumps({"processes": 4, "threads": 2, "cores": 8}))
+
+    assert load_topology(str(path)) is None
+
+
+def test_missing_topology_file(tmp_path):
+    assert load_topology(str(tmp_path / "nope.json")) is None
@@ -0,0 +1,92 @@
+###############################################################################
+##  `test_windowing.py`                                                      ##
+##                                                                           ##
+##  Purpose: Tests mention-local windowing of long messages                  ##
+###############################################################################
+
+
+import json
+from pathlib import Path
+
+import pytest
+from src import mentions
+from src import windowing
+from src.parser import sanitize_content
+
+
+SCENARIOS_PATH = Path(__file__).parent.parent / "examples" / "test_scenarios.json"
+
+FILLER = "The weather was mild and the build was green. " * 40
+
+
+def nametags(content):
+    return mentions.get_mentions(content)
+
+
+# -----------------------------
+# Sentence splitting
+# -----------------------------
+def test_split_sentences_keeps_offsets():
+    text = "Alice is here. She codes!\nBob waves"
+    sentences = windowing.split_sentences(text)
+
+    assert [s.text for s in sentences] == ["Alice is here.", "She codes!", "Bob waves"]
+    assert all(text[s.start:s.end] == s.text for s in sentences)
+
+
+# -----------------------------
+# Window construction
+# -----------------------------
+def test_short_content_not_windowed():
+    tags = nametags("@**Alice Smith (she/her) (SP1'25)**")
+    assert windowing.build_mention_window("Alice codes. She is fast.", tags) is None
+
+
+def test_window_keeps_mention_neighbourhood_only():
+    tags = nametags("@**Alice Smith (she/her) (SP1'25)**")
+    content = FILLER + "Alice paired today. She wrote tests. She is fast. " + FILLER
+
+    window = windowing.build_mention_window(content, tags, before=0, after=2, min_chars=0)
+
+    assert window is not None
+    assert window.text == "Alice paired today. She wrote tests. She is fast."
+    assert len(window.text) < len(content) / 10
+
+
+def test_window_keeps_pronoun_far_from_name():
+    # Coref on full text could tie "he" back to Alice, so it must stay
+    tags = nametags("@**Alice Smith (she/her) (SP1'25)**")
+    content = "Alice paired today. " + FILLER + "Later he pushed the fix. " + FILLER
+
+    window = windowing.build_mention_window(content, tags, before=0, after=1, min_chars=0)
+
+    assert "Later he pushed the fix." in window.text
+    assert len(window.text) < len(content) / 10
+
+
+def test_window_matches_other_names():
+    tags = nametags("@**Alice Smith (she/her) (SP1'25)**")
+    content = FILLER + "Smith joined later. She was busy. " + FILLER
+
+    window = windowing.build_mention_window(content, tags, before=0, after=1, min_chars=0)
+    assert window.text.startswith("Smith joined later.")
+
+
+def test_no_named_sentences_not_windowed():
+    tags = nametags("@**Alice Smith (she/her) (SP1'25)**")
+    assert windowing.build_mention_window(FILLER, tags, min_chars=0) is None
+
+
+# -----------------------------
+# Parity on example scenarios
+# -----------------------------
+def test_example_scenarios_unchanged_by_window():
+    # Short scenarios fit inside one neighbourhood, so excerpt is whole text
+    scenarios = json.loads(SCENARIOS_PATH.read_text())
+
+    for text in scenarios["with_mentions"].values():
+        tags = nametags(text)
+        sanitized = sanitize_content(text, tags)
+
+        window = windowing.build_mention_window(sanitized, tags, min_chars=0)
+        assert window.text == sanitized.strip()
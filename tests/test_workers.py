@@ -0,0 +1,114 @@
+###############################################################################
+##  `test_workers.py`                                                        ##
+##                                                                           ##
+##  Purpose: Tests inference worker pool (dispatch, health, shutdown)        ##
+###############################################################################
+
+
+import os
+import time
+
+import pytest
+from src.workers import WorkerPool
+
+
+# Worker hooks must be module-level so spawned processes can import them
+def setup_fake_worker():
+    return {"pid": os.getpid()}
+
+
+def record_task(task, state):
+    # Each task names a file for worker to write its pid into
+    path, payload = task
+    if payload == "boom":
+        raise RuntimeError("task failed")
+    with open(path, "w") as f:
+        f.write(f"{payload}:{state['pid']}")
+
+
+def wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(
+        worker_count=2, queue_size=10,
+        setup_worker=setup_fake_worker, handle_task=record_task,
+    )
+    pool.start(monitor=False)
+    yield pool
+    pool.shutdown(timeout=10)
+
+
+# -----------------------------
+# Dispatch
+# -----------------------------
+def test_tasks_processed_in_worker_processes(pool, tmp_path):
+    paths = [tmp_path / f"task_{i}.txt" for i in range(4)]
+    for i, path in enumerate(paths):
+        pool.submit((str(path), f"event{i}"))
+
+    assert wait_for(lambda: all(p.exists() for p in paths))
+
+    for i, path in enumerate(paths):
+        payload, pid = path.read_text().split(":")
+        assert payload == f"event{i}"
+        assert int(pid) != os.getpid()
+
+
+# -----------------------------
+# Health
+# -----------------------------
+def test_health_reports_counts(pool, tmp_path):
+    pool.submit((str(tmp_path / "ok.txt"), "ok"))
+    pool.submit((str(tmp_path / "bad.txt"), "boom"))
+
+    assert wait_for(lambda: sum(w["processed"] + w["failed"] for w in pool.health()) == 2)
+
+    health = pool.health()
+    assert len(health) == 2
+    assert all(w["alive"] and w["ready"] for w in health)
+    assert sum(w["processed"] for w in health) == 1
+    assert sum(w["failed"] for w in health) == 1
+
+
+def test_dead_worker_restarted(pool):
+    assert wait_for(lambda: all(w["ready"] for w in pool.health()))
+    dead_pid = pool.health()[0]["pid"]
+
+    pool._processes[0].kill()
+    pool._processes[0].join()
+
+    assert pool.restart_dead_workers() == 1
+    assert wait_for(lambda: pool.health()[0]["alive"])
+    assert pool.health()[0]["pid"] != dead_pid
+
+
+# -----------------------------
+# Shutdown
+# -----------------------------
+def test_shutdown_drains_queue(tmp_path):
+    pool = WorkerPool(
+        worker_count=1, queue_size=10,
+        setup_worker=setup_fake_worker, handle_task=record_task,
+    )
+    pool.start(monitor=False)
+
+    paths = [tmp_path / f"task_{i}.txt" for i in range(3)]
+    for i, path in enumerate(paths):
+        pool.submit((str(path), f"event{i}"))
+    pool.shutdown(timeout=20)
+
+    assert all(p.exists() for p in paths)
+    assert not any(w["alive"] for w in pool.health())
+
+
+def test_pool_needs_workers():
+    with pytest.raises(ValueError):
+        WorkerPool(worker_count=0)
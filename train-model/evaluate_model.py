@@ -300,7 +300,7 @@ if __name__ == "__main__":
     
     # Load test data and model
     test_data = load_training_data(json_file=THEY_THEM_DATA)[:10]  # Small sample
-    nlp = load_base_model()
+    nlp = load_base_model(shared=True)
     
     if nlp and test_data:
         print("Testing evaluation system...")
@@ -40,7 +40,7 @@ def comprehensive_optimization():
     combined_data = they_them_data + neopronoun_data * 3  # 3x neopronouns for emphasis
     print(f"Total training examples: {len(combined_data)} (includes 3x neopronoun repetition)")
     
-    base_nlp = load_base_model()
+    base_nlp = load_base_model(shared=True)
     if not base_nlp:
         print("Failed to load base model")
         return
@@ -9,12 +9,15 @@ import warnings
 warnings.filterwarnings("ignore")
 
 import os
+import sys
 import json
-import spacy
 
 from spacy.training import Example
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from processing.models import get_pipeline, load_pipeline
+
 
 BASE_MODEL = "en_coreference_web_trf"
 NEW_MODELS_PREFIX = "coref_"
@@ -168,11 +171,12 @@ def create_batch_training_examples(nlp, training_data_batch):
     return examples
 
 
-def load_base_model():
+def load_base_model(shared = False):
     # Load base coreference model (spaCy experimental default)
+    # Training mutates weights, so only read-only callers should use `shared`
     print(f"Loading base model: {BASE_MODEL}")
     try:
-        nlp = spacy.load(BASE_MODEL)
+        nlp = get_pipeline(BASE_MODEL) if shared else load_pipeline(BASE_MODEL)
         print(f"Successfully loaded {BASE_MODEL}\n")
         return nlp
     except OSError as e:
@@ -198,7 +202,7 @@ def get_latest_model():
     model_path = os.path.join(models_dir, latest_model)
     
     try:
-        nlp = spacy.load(model_path)
+        nlp = load_pipeline(model_path)
         print(f"Continuing from latest model: {latest_model}\n")
         return nlp
     except: